@@ -0,0 +1,59 @@
+"""
+Spectrum CVE lookup latency against a synthetic database.
+
+    python -m benchmarks.bench_cve [--entries 200000]
+"""
+import argparse
+import random
+import time
+
+from phantom.utils.cvedb import CveIndex
+
+
+def build_db(entries, products=2000, seed=3):
+    rng = random.Random(seed)
+    names = [f"product{i}" for i in range(products)] + ['Apache', 'nginx', 'OpenSSL', 'PHP']
+    db = {}
+    while len(db) < entries:
+        name = rng.choice(names)
+        major, minor = rng.randint(0, 9), rng.randint(0, 30)
+        if rng.random() < 0.5:
+            key = f"{name}/{major}.{minor}.{rng.randint(0, 60)}"
+        else:
+            key = f"{name}/>={major}.{minor}.0,<{major}.{minor}.{rng.randint(1, 60)}"
+        db[key] = [f"CVE-{rng.randint(1999, 2026)}-{rng.randint(1000, 99999)}"]
+    return db
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--entries', type=int, default=200000)
+    parser.add_argument('--lookups', type=int, default=20000)
+    args = parser.parse_args()
+
+    db = build_db(args.entries)
+    start = time.perf_counter()
+    index = CveIndex(db)
+    print(f"index build: {time.perf_counter() - start:.2f}s for {len(index)} entries")
+
+    headers = {
+        'Server': 'Apache/2.4.49 (Unix) OpenSSL/1.0.1e',
+        'X-Powered-By': 'PHP/7.4.0',
+    }
+    start = time.perf_counter()
+    for _ in range(args.lookups):
+        index.match_headers(headers)
+    per_call = (time.perf_counter() - start) / args.lookups
+    print(f"match_headers: {per_call * 1e6:.1f} us per response")
+
+    start = time.perf_counter()
+    for _ in range(20):
+        for software, cves in db.items():
+            if software in headers['Server']:
+                pass
+    per_call = (time.perf_counter() - start) / 20
+    print(f"legacy substring loop: {per_call * 1e6:.1f} us per response")
+
+
+if __name__ == '__main__':
+    main()
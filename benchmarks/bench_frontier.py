@@ -0,0 +1,63 @@
+"""
+Frontier throughput and memory per URL against a plain set of URL strings.
+
+    python -m benchmarks.bench_frontier [--urls 200000]
+
+Every URL is offered twice, once in a variant form (host case, fragment,
+query order, trailing slash) that the frontier must recognise as a duplicate.
+"""
+import argparse
+import time
+import tracemalloc
+
+from phantom.utils.frontier import Frontier, canonicalize
+
+
+def urls(count):
+    for i in range(count):
+        yield f"https://example.com/section{i % 100}/page{i}?id={i}&ref=nav"
+        yield f"https://EXAMPLE.com:443/section{i % 100}/page{i}/?ref=nav&id={i}#top"
+
+
+def run_frontier(count):
+    frontier = Frontier()
+    added = 0
+    for url in urls(count):
+        url = canonicalize(url)
+        if frontier.add(url, 1):
+            frontier.push(url, 1)
+            added += 1
+    return frontier, added
+
+
+def run_set(count):
+    seen = set()
+    for url in urls(count):
+        seen.add(url)
+    return seen, len(seen)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--urls', type=int, default=200000)
+    args = parser.parse_args()
+
+    print(f"{args.urls} URLs, each offered twice")
+    for name, fn in (('frontier', run_frontier), ('set[str]', run_set)):
+        start = time.perf_counter()
+        fn(args.urls)
+        elapsed = time.perf_counter() - start
+
+        # Memory in a separate pass; tracemalloc slows everything down
+        tracemalloc.start()
+        kept, unique = fn(args.urls)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del kept
+
+        print(f"{name:<9} unique {unique:>9}  {elapsed:6.2f}s  {2 * args.urls / elapsed:>10,.0f} URLs/s  "
+              f"{current / unique:6.1f} bytes/URL held  (peak {peak / 1024 / 1024:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
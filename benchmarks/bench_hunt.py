@@ -0,0 +1,68 @@
+"""
+Offline sweep throughput (phantom hunt) by worker count over a generated tree.
+
+    python -m benchmarks.bench_hunt [--mb 200] [--files 2000]
+
+Most files are small source-like text; a few are large enough to be
+memory-mapped. Worker counts run from 1 up to the CPU count.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from phantom.modules.hunt import TreeHunter, load_pack
+from phantom.utils.ui import PhantomUI
+from benchmarks.bench_entropy import WORDS
+
+
+def build_tree(root, mb, files, seed=7):
+    rng = random.Random(seed)
+    # Code-like words: random characters would be one long run of entropy hits
+    block = ''.join(rng.choice(WORDS) + rng.choice(' ;(){}=.,\n') for _ in range(1 << 13)).encode()
+    big = max(files // 100, 1)
+    small_size = (mb << 20) // 2 // files
+    big_size = (mb << 20) // 2 // big
+
+    for i in range(files + big):
+        directory = os.path.join(root, f"pkg{i % 50}", f"mod{i % 7}")
+        os.makedirs(directory, exist_ok=True)
+        size = big_size if i >= files else small_size
+        with open(os.path.join(directory, f"file{i}.txt"), 'wb') as f:
+            written = 0
+            while written < size:
+                f.write(block)
+                written += len(block)
+            if i % 10 == 0:
+                f.write(b'\nkey = "AKIA' + b'ABCDEFGHIJKLMNOP' + b'"\n')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--mb', type=int, default=200)
+    parser.add_argument('--files', type=int, default=2000)
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    pack = load_pack()
+    with tempfile.TemporaryDirectory() as root:
+        build_tree(root, args.mb, args.files)
+        print(f"~{args.mb} MB over {args.files} small + {max(args.files // 100, 1)} large files, {cpus} CPUs")
+
+        workers = 1
+        while True:
+            hunter = TreeHunter(workers=workers)
+            start = time.perf_counter()
+            with PhantomUI.capture([]):
+                hunter.hunt(root, pack)
+            elapsed = time.perf_counter() - start
+            mb = hunter.stats['bytes'] / 1024 / 1024
+            print(f"{workers:>3} workers  {elapsed:7.2f}s  {mb / elapsed:8.1f} MB/s  {hunter.hits} hits")
+            if workers >= cpus:
+                break
+            workers = min(workers * 2, cpus)
+
+
+if __name__ == '__main__':
+    main()
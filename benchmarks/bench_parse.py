@@ -0,0 +1,55 @@
+"""
+HTML parse time and peak memory per backend on a large generated page.
+
+    python -m benchmarks.bench_parse [--mb 5]
+"""
+import argparse
+import time
+import tracemalloc
+
+from phantom.utils.html import BACKENDS, lxml_available, parse_html
+
+
+def build_page(mb):
+    rows = []
+    size = 0
+    i = 0
+    while size < mb * 1024 * 1024:
+        row = (
+            f'<div class="row"><a href="/item/{i}?ref=list">Item {i}</a>'
+            f'<span>Lorem ipsum dolor sit amet &amp; more text {i}</span>'
+            f'<script src="/static/chunk{i % 50}.js"></script></div>\n'
+        )
+        rows.append(row)
+        size += len(row)
+        i += 1
+    return '<html><head><title>bench</title></head><body>' + ''.join(rows) + '</body></html>'
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--mb', type=int, default=5)
+    args = parser.parse_args()
+
+    page = build_page(args.mb)
+    print(f"page: {len(page) / 1e6:.1f} MB")
+
+    for backend in BACKENDS[1:]:
+        if backend == 'lxml' and not lxml_available():
+            print(f"{backend:<6} (not installed)")
+            continue
+        start = time.perf_counter()
+        doc = parse_html(page, backend)
+        elapsed = time.perf_counter() - start
+
+        # Separate pass: tracemalloc itself slows parsing down considerably
+        tracemalloc.start()
+        parse_html(page, backend)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{backend:<6} {elapsed:7.3f}s  peak {peak / 1e6:7.1f} MB  "
+              f"{len(doc.links)} links, {len(doc.scripts)} scripts")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Lines per second PhantomUI can push into a pipe, against one print() per line.
+
+    python -m benchmarks.bench_render [--lines 100000]
+
+Each case runs in a child process whose stdout is a pipe drained by this one,
+so the numbers include the real write syscalls (the target is 100k lines/s).
+"""
+import argparse
+import subprocess
+import sys
+import time
+
+CASES = ('print', 'write', 'report', 'report_many')
+
+
+def child(case, lines):
+    from phantom.utils.ui import PhantomUI
+    from phantom.utils.findings import Finding
+
+    PhantomUI.setup_console()   # stdout is a pipe: plain, no-color path
+    urls = [f"https://example.com/section{i % 40}/page{i}.html" for i in range(lines)]
+
+    start = time.perf_counter()
+    if case == 'print':
+        # What PhantomUI did before: one print (and one write) per line
+        for url in urls:
+            print(f"  {PhantomUI.DATA_WHITE}- {url}{PhantomUI.RESET}")
+        sys.stdout.flush()
+    elif case == 'write':
+        for url in urls:
+            PhantomUI.write(f"  {PhantomUI.DATA_WHITE}- {url}{PhantomUI.RESET}")
+    elif case == 'report':
+        for url in urls:
+            PhantomUI.report(Finding('arachnid', 'link', 'https://example.com/', "Internal Link", url, depth=1))
+    else:
+        PhantomUI.report_many(
+            [Finding('arachnid', 'link', 'https://example.com/', "Internal Link", url, depth=1) for url in urls],
+            top=100
+        )
+    PhantomUI.flush()
+    sys.stderr.write(f"{time.perf_counter() - start}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--lines', type=int, default=100000)
+    parser.add_argument('--child', choices=CASES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.lines)
+        return
+
+    print(f"{args.lines} lines to a pipe")
+    for case in CASES:
+        proc = subprocess.Popen(
+            [sys.executable, '-m', 'benchmarks.bench_render', '--child', case, '--lines', str(args.lines)],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+        received = 0
+        for chunk in iter(lambda: proc.stdout.read(1 << 16), b''):
+            received += chunk.count(b'\n')
+        elapsed = float(proc.stderr.read())
+        proc.wait()
+        print(f"{case:<12} {elapsed * 1000:8.1f} ms  {args.lines / elapsed:>12,.0f} lines/s  ({received} lines out)")
+
+
+if __name__ == '__main__':
+    main()
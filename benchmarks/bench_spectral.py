@@ -0,0 +1,98 @@
+"""
+WiFi scan parsing: nmcli and netsh fixtures with thousands of BSSIDs,
+parsed into AccessPoint records and fed through one watch-mode update.
+
+    python -m benchmarks.bench_spectral [--bssids 5000] [--repeat 5]
+
+SSIDs include escaped colons and backslashes, hidden networks and open
+ones, so both tokenizers take their slow paths too.
+"""
+import argparse
+import random
+import time
+
+from phantom.modules.spectral import SpectralMonitor, parse_nmcli, parse_netsh
+from phantom.utils.ui import PhantomUI
+
+SSIDS = ['HomeNet', 'Cafe:Guest', 'eduroam', 'DIRECT-7f-HP', 'a\\b', '', 'Office 5G', 'FreeWiFi']
+SECURITY = ['WPA2', 'WPA1 WPA2', 'WPA3', '', 'WEP']
+
+
+def bssid(i):
+    return ':'.join(f"{(i >> shift) & 0xff:02X}" for shift in (40, 32, 24, 16, 8, 0))
+
+
+def build_nmcli(count, seed=7):
+    rng = random.Random(seed)
+    lines = []
+    for i in range(count):
+        ssid = rng.choice(SSIDS).replace('\\', '\\\\').replace(':', '\\:')
+        freq = rng.choice(('2437 MHz', '5180 MHz', '5955 MHz'))
+        lines.append(f"{ssid}:{bssid(i).replace(':', chr(92) + ':')}:{rng.randint(5, 99)}:"
+                     f"{rng.choice(SECURITY)}:{rng.randint(1, 165)}:{freq}")
+    return '\n'.join(lines) + '\n'
+
+
+def build_netsh(count, seed=7):
+    rng = random.Random(seed)
+    lines = ["Interface name : Wi-Fi", f"There are {count // 4} networks currently visible.", ""]
+    i = 0
+    network = 1
+    while i < count:
+        lines += [f"SSID {network} : {rng.choice(SSIDS)}", "    Network type            : Infrastructure",
+                  f"    Authentication          : {rng.choice(('WPA2-Personal', 'Open', 'WPA3-Personal'))}",
+                  "    Encryption              : CCMP"]
+        for n in range(1, min(4, count - i) + 1):
+            lines += [f"    BSSID {n}                 : {bssid(i).lower()}",
+                      f"         Signal             : {rng.randint(5, 99)}%",
+                      "         Radio type         : 802.11ax",
+                      "         Band               : 5 GHz",
+                      f"         Channel            : {rng.randint(1, 165)}",
+                      "         Channel Utilization: 12 (4 %)",
+                      "         Basic rates (Mbps) : 6 12 24", ""]
+            i += 1
+        network += 1
+    return '\n'.join(lines) + '\n'
+
+
+class Null:
+    def append(self, line):
+        pass
+
+
+def timed(label, parse, text, repeat, count):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        records = list(parse(text.splitlines()))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    assert len(records) == count, (label, len(records))
+    print(f"{label:<8} {best * 1000:8.2f} ms  {count / best:12,.0f} BSSIDs/s  {len(text) / 1e6:6.2f} MB")
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--bssids', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{args.bssids} BSSIDs per scan, best of {args.repeat}")
+    records = timed("nmcli", parse_nmcli, build_nmcli(args.bssids), args.repeat, args.bssids)
+    timed("netsh", parse_netsh, build_netsh(args.bssids), args.repeat, args.bssids)
+
+    # Watch mode: every BSSID appears on the first update, then nothing changes
+    monitor = SpectralMonitor()
+    with PhantomUI.capture(Null()):
+        start = time.perf_counter()
+        monitor.update(records)
+        first = time.perf_counter() - start
+        start = time.perf_counter()
+        monitor.update(records)
+        steady = time.perf_counter() - start
+    print(f"watch    {first * 1000:8.2f} ms first poll, {steady * 1000:.2f} ms steady poll")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Time to first output and total wall time per subcommand, run the way a
+script would run them (stdout is a pipe, so no animations or colors).
+
+    python -m benchmarks.bench_startup [--runs 5]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# A closed local port: analyze fails fast without touching the network
+DEAD_URL = 'http://127.0.0.1:9/'
+
+
+def commands(tmp_dir):
+    return [
+        ('--help', ['--help'], None),
+        ('shell', [], b'exit\n'),
+        ('wifi', ['wifi'], None),
+        ('analyze', ['analyze', DEAD_URL, '-retries', '0'], None),
+        ('db build', ['db', 'build', '--out', os.path.join(tmp_dir, 'bench.idx')], None),
+    ]
+
+
+def run_once(args, stdin):
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'phantom.main'] + args,
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+    )
+    if stdin:
+        proc.stdin.write(stdin)
+    proc.stdin.close()
+
+    proc.stdout.read(1)
+    first = time.perf_counter() - start
+    proc.stdout.read()
+    proc.wait()
+    return first, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'command':<10} {'first output':>14} {'total':>10}   (median of {args.runs})")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, argv, stdin in commands(tmp_dir):
+            firsts, totals = [], []
+            for _ in range(args.runs):
+                first, total = run_once(argv, stdin)
+                firsts.append(first)
+                totals.append(total)
+            print(f"{name:<10} {statistics.median(firsts) * 1000:>11.1f} ms {statistics.median(totals) * 1000:>7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,31 @@
 import argparse
+import os
 import sys
+import threading
 import time
+from functools import partial
 from phantom.utils.ui import PhantomUI
-from phantom.modules.wraith import WraithAnalyzer
-from phantom.modules.spectral import SpectralScanner
+from phantom.utils.html import BACKENDS
+from phantom.utils.findings import OUTPUT_MODES
+
+# Module imports (requests, sqlite3, the CVE index...) are deferred to the
+# command that needs them, so `phantom wifi` or `--help` never pays for them
+
+def _int_option(parts, name, default):
+    """Reads an integer option like '-depth 3' from a shell command line."""
+    if name in parts:
+        idx = parts.index(name)
+        if idx + 1 < len(parts) and parts[idx + 1].isdigit():
+            return int(parts[idx + 1])
+    return default
+
+def _str_option(parts, name, default):
+    """Reads a string option like '-parser sax' from a shell command line."""
+    if name in parts:
+        idx = parts.index(name)
+        if idx + 1 < len(parts):
+            return parts[idx + 1]
+    return default
 
 def interactive_mode():
     # Startup: Show Sheathed Sword (Covered)
@@ -14,8 +36,20 @@ def interactive_mode():
     # State tracking
     is_unsheathed = False
 
+    # One connection pool and analyzer for the whole session, made on first use
+    pool = None
+    wraith = None
+
+    # analyze/wifi run in the background; the prompt stays responsive
+    from phantom.utils.jobs import JobManager
+    jobs = JobManager()
+
     while True:
         try:
+            for job in jobs.newly_finished():
+                PhantomUI.info(f"Job {job.id} {job.state} after {job.elapsed():.1f}s: {job.command} (results {job.id})")
+
+            PhantomUI.flush()
             cmd_input = input(f"{PhantomUI.NEON_GREEN}ghost@phantom:~${PhantomUI.RESET} ").strip()
             
             if not cmd_input:
@@ -28,6 +62,9 @@ def interactive_mode():
                 if is_unsheathed:
                     PhantomUI.animate_sheathe()
                 print(f"{PhantomUI.ALERT_RED}Terminating session...{PhantomUI.RESET}")
+                jobs.shutdown()
+                if pool is not None:
+                    pool.close()
                 break
             
             elif cmd == "help":
@@ -35,14 +72,28 @@ def interactive_mode():
                 # Detailed help as requested
                 print("  analyze <url> [flags]    : Web Reconnaissance Module")
                 print("    -spider                : Spider/Crawler - recursively finds internal links (max depth 2)")
+                print("      -depth <n>           : Crawl depth (default 2)")
+                print("      -max-pages <n>       : Page budget for the crawl (default 500)")
+                print("      -inflight <n>        : Concurrent requests while crawling (default 16)")
+                print("      -parser <name>       : HTML backend: auto, sax, lxml, soup (default auto)")
+                print("      -verbose             : List each page that failed to fetch, with the reason")
+                print("    -top <n>               : Show the first n results of large sets, counts for the rest (default 100, 0 = all)")
                 print("    -vortex                : API Discovery - scans HTML/JS for patterns like /api/v1, /graphql")
                 print("    -hunter                : Secrets Scanner - looks for accidentally leaked keys/tokens")
                 print("    -droid                 : Robots.txt Analyzer - parses for Disallow entries")
-                print("    -complete              : FULL AUDIT - Executes all modules sequentially")
+                print("    -assets                : Fetches linked same-site JS bundles (of every crawled page with -spider) and runs Vortex + Hunter on them")
+                print("    -complete              : FULL AUDIT - Runs every module, each starting as soon as its inputs are fetched")
                 print("")
                 print("  wifi                     : WiFi Spectral Scanner")
                 print("                             Passive scan of local wireless networks.")
                 print("                             Displays SSID, Signal, Channel, Band, and Security.")
+                print("    -rescan no             : List nmcli's cached results instead of rescanning (Linux)")
+                print("    -scan-timeout <n>      : Kill the scan after n seconds (default 10)")
+                print("")
+                print("  jobs                     : List background jobs and their state")
+                print("  wait [id]                : Block until a job (or every job) finishes, then show its output")
+                print("  cancel <id>              : Stop a queued or running job")
+                print("  results <id>             : Show a job's output so far")
                 print("")
                 print("  clear                    : Reset screen")
                 print("  exit                     : Terminate session")
@@ -53,9 +104,16 @@ def interactive_mode():
                     PhantomUI.animate_unsheathe()
                     is_unsheathed = True
                 
-                print("")
-                tool = SpectralScanner()
-                tool.scan()
+                from phantom.modules.spectral import SpectralScanner, RESCAN_MODES
+                rescan = _str_option(parts, '-rescan', 'auto')
+                if rescan not in RESCAN_MODES:
+                    PhantomUI.alert(f"-rescan must be one of: {', '.join(RESCAN_MODES)}")
+                    continue
+                # `cancel <id>` kills the scan command instead of waiting it out
+                cancel = threading.Event()
+                scanner = SpectralScanner(timeout=_int_option(parts, '-scan-timeout', 10), rescan=rescan, cancel=cancel)
+                job = jobs.submit(cmd_input, scanner.scan, cancel_event=cancel)
+                PhantomUI.info(f"Job {job.id} started: {cmd_input}")
             
             elif cmd == "analyze":
                 if len(parts) < 2:
@@ -72,11 +130,60 @@ def interactive_mode():
                     'vortex': '-vortex' in parts or '-complete' in parts,
                     'hunter': '-hunter' in parts or '-complete' in parts,
                     'droid': '-droid' in parts or '-complete' in parts,
-                    'complete': '-complete' in parts
+                    'assets': '-assets' in parts or '-complete' in parts,
+                    'complete': '-complete' in parts,
+                    'depth': _int_option(parts, '-depth', 2),
+                    'max_pages': _int_option(parts, '-max-pages', 500),
+                    'inflight': _int_option(parts, '-inflight', 16),
+                    'parser': _str_option(parts, '-parser', 'auto'),
+                    'top': _int_option(parts, '-top', 100),
+                    'verbose': '-verbose' in parts
                 }
                 
-                tool = WraithAnalyzer()
-                tool.analyze(url, flags)
+                if wraith is None:
+                    from phantom.modules.wraith import WraithAnalyzer
+                    from phantom.utils.http import HttpPool
+                    pool = HttpPool()
+                    wraith = WraithAnalyzer(pool=pool)
+                # `cancel <id>` stops the crawl and any module not yet started
+                cancel = threading.Event()
+                job = jobs.submit(cmd_input, partial(wraith.analyze, url, flags, cancel=cancel), cancel_event=cancel)
+                PhantomUI.info(f"Job {job.id} started: {cmd_input}")
+
+            elif cmd == "jobs":
+                if not jobs.jobs:
+                    PhantomUI.info("No jobs.")
+                for job in jobs.jobs.values():
+                    PhantomUI.data(f"[{job.id}] {job.state:<9} {job.elapsed():6.1f}s", job.command)
+
+            elif cmd in ("wait", "results", "cancel"):
+                if len(parts) < 2 and cmd != "wait":
+                    PhantomUI.alert(f"Usage: {cmd} <id>")
+                    continue
+                if len(parts) < 2:
+                    selected = list(jobs.jobs.values())
+                else:
+                    selected = [jobs.get(parts[1])]
+                if None in selected:
+                    PhantomUI.alert(f"No such job: {parts[1]}")
+                    continue
+
+                if cmd == "cancel":
+                    jobs.cancel(selected[0])
+                    PhantomUI.info(f"Job {selected[0].id} cancelling.")
+                    continue
+                if cmd == "wait":
+                    try:
+                        jobs.wait(selected)
+                    except KeyboardInterrupt:
+                        # Stop waiting, not the shell; the jobs keep running
+                        print("")
+                        continue
+                for job in selected:
+                    job.announced = True
+                    PhantomUI.info(f"Job {job.id} [{job.state}]: {job.command}")
+                    for line in list(job.lines):
+                        PhantomUI.emit(line)
                 
             elif cmd == "clear":
                 print("\033[H\033[J", end="")
@@ -90,6 +197,9 @@ def interactive_mode():
 
         except KeyboardInterrupt:
             print("\nTerminating...")
+            jobs.shutdown()
+            if pool is not None:
+                pool.close()
             break
 
 def main():
@@ -98,15 +208,72 @@ def main():
 
     # Analyze Command
     analyze_parser = subparsers.add_parser("analyze", help="Web Reconnaissance")
-    analyze_parser.add_argument("url", help="Target URL")
+    analyze_parser.add_argument("url", nargs="?", help="Target URL")
+    analyze_parser.add_argument("-targets", "--targets", help="File of targets, one per line ('-' for stdin)")
+    analyze_parser.add_argument("-workers", type=int, default=16, help="Targets analyzed concurrently in bulk mode")
+    analyze_parser.add_argument("-per-host", dest="per_host", type=int, default=2, help="Concurrent targets per host in bulk mode")
     analyze_parser.add_argument("-spider", action="store_true", help="Run Arachnid Spider")
     analyze_parser.add_argument("-vortex", action="store_true", help="Run Vortex API Discovery")
     analyze_parser.add_argument("-hunter", action="store_true", help="Run Hunter Secret Scanner")
     analyze_parser.add_argument("-droid", action="store_true", help="Run Droid Robots.txt Analyzer")
+    analyze_parser.add_argument("-assets", action="store_true", help="Scan linked JS bundles with Vortex and Hunter")
     analyze_parser.add_argument("-complete", action="store_true", help="Run ALL modules")
+    analyze_parser.add_argument("-depth", type=int, default=2, help="Spider crawl depth")
+    analyze_parser.add_argument("-max-pages", dest="max_pages", type=int, default=500, help="Spider page budget")
+    analyze_parser.add_argument("-inflight", type=int, default=16, help="Spider concurrent requests")
+    analyze_parser.add_argument("-parser", choices=BACKENDS, default="auto", help="HTML parser backend")
+    analyze_parser.add_argument("-top", type=int, default=100, help="Results shown per large set before collapsing into counts (0 = all)")
+    analyze_parser.add_argument("-verbose", "--verbose", action="store_true", help="List each page the spider failed to fetch")
+    analyze_parser.add_argument("-pool-size", dest="pool_size", type=int, default=16, help="Keep-alive connections per host")
+    analyze_parser.add_argument("-retries", type=int, default=2, help="Retries on connection errors and 429/502/503/504")
+    analyze_parser.add_argument("-timeout", type=float, default=10, help="Request timeout in seconds (slow responses also lower a host's concurrency)")
+    analyze_parser.add_argument("-rate", type=float, default=0, help="Max requests per second per host (0 = unlimited; concurrency still adapts)")
+    analyze_parser.add_argument("-cache", nargs="?", const=True, metavar="DIR",
+                                help="Cache responses on disk and revalidate with ETag/Last-Modified (default dir: ~/.cache/phantom)")
+    analyze_parser.add_argument("-cache-size", dest="cache_size", type=int, default=512, help="Cache size limit in MB (LRU eviction)")
+    analyze_parser.add_argument("-incremental", "--incremental", nargs="?", const=True, metavar="DIR",
+                                help="Skip targets whose URLs are unchanged since the last run and report only URL and finding changes (state in ~/.cache/phantom)")
+    analyze_parser.add_argument("-no-keepalive", dest="keepalive", action="store_false", help="Close connections after each request")
+    analyze_parser.add_argument("-output", "--output", choices=OUTPUT_MODES, default="text",
+                                help="Findings format: text, or json/ndjson streamed to stdout as they are found")
 
     # WiFi Command
     wifi_parser = subparsers.add_parser("wifi", help="WiFi Sniffer")
+    wifi_parser.add_argument("-output", "--output", choices=OUTPUT_MODES, default="text", help="Findings format")
+    wifi_parser.add_argument("-watch", "--watch", type=float, metavar="SECONDS",
+                             help="Poll every SECONDS and report only appear/disappear/change events")
+    wifi_parser.add_argument("-history", type=int, default=60, help="Signal samples kept per BSSID in watch mode")
+    wifi_parser.add_argument("-delta", type=int, default=15, help="Signal change (points) reported in watch mode")
+    wifi_parser.add_argument("-polls", type=int, default=0, help="Stop watching after this many polls (0 = until Ctrl+C)")
+    wifi_parser.add_argument("-scan-timeout", dest="scan_timeout", type=float, default=10.0,
+                             help="Kill a scan still running after this many seconds")
+    wifi_parser.add_argument("-rescan", "--rescan", choices=("auto", "yes", "no"), default="auto",
+                             help="nmcli rescan mode; 'no' lists cached results in well under a second (Linux)")
+    wifi_parser.add_argument("-replay", metavar="FILE",
+                             help="Report a saved 'nmcli -t' or 'netsh ... mode=bssid' scan instead of scanning")
+
+    # Hunt Command
+    hunt_parser = subparsers.add_parser("hunt", help="Offline secret scan of a local directory tree")
+    hunt_parser.add_argument("path", help="Directory (or file) to scan")
+    hunt_parser.add_argument("-workers", type=int, default=0, help="Worker processes (default: one per CPU)")
+    hunt_parser.add_argument("-max-size", dest="max_size", type=int, default=0, help="Skip files larger than this many MB (0 = no limit)")
+    hunt_parser.add_argument("-no-ignore", dest="ignore", action="store_false", help="Also scan .gitignore'd files")
+    hunt_parser.add_argument("-no-entropy", dest="entropy", action="store_false", help="Regex rules only, no high-entropy detector")
+    hunt_parser.add_argument("-output", "--output", choices=OUTPUT_MODES, default="text", help="Findings format")
+
+    # DB Command
+    db_parser = subparsers.add_parser("db", help="CVE/Signature Database")
+    db_sub = db_parser.add_subparsers(dest="db_command")
+    build_parser = db_sub.add_parser("build", help="Compile JSON sources into a memory-mapped index")
+    build_parser.add_argument("--cve", action="append", help="CVE source: cve_db.json format or NVD JSON feed, .gz ok (repeatable)")
+    build_parser.add_argument("--secrets", help="Secrets pattern pack (default: bundled secrets_patterns.json)")
+    build_parser.add_argument("--out", help="Index path (default: $PHANTOM_DB or phantom/data/phantom.idx)")
+    profile_parser = db_sub.add_parser("profile", help="Time every rule of a secrets pattern pack")
+    profile_parser.add_argument("--secrets", help="Secrets pattern pack (default: bundled secrets_patterns.json)")
+    profile_parser.add_argument("--sample", action="append", help="File to scan as sample traffic (repeatable; default: 1 MB of random text)")
+    profile_parser.add_argument("--budget", type=float, help="Seconds a rule may spend per 64K characters (default: 0.25)")
+
+    PhantomUI.setup_console()
 
     # If no arguments, run interactive
     if len(sys.argv) == 1:
@@ -116,24 +283,164 @@ def main():
     args = parser.parse_args()
 
     if args.command == "analyze":
+        if not args.url and not args.targets:
+            # Allow piping targets: cat hosts.txt | phantom analyze -hunter
+            if sys.stdin.isatty():
+                analyze_parser.error("a target URL or --targets is required")
+            args.targets = "-"
+
         # Convert args to dict for the analyzer
         flags = {
             'spider': args.spider,
             'vortex': args.vortex,
             'hunter': args.hunter,
             'droid': args.droid,
-            'complete': args.complete
+            'assets': args.assets,
+            'complete': args.complete,
+            'depth': args.depth,
+            'max_pages': args.max_pages,
+            'inflight': args.inflight,
+            'parser': args.parser,
+            'top': args.top,
+            'verbose': args.verbose
         }
         
-        # Show Unsheathed Sword for CLI commands
-        PhantomUI.show_unsheathed()
-        tool = WraithAnalyzer()
-        tool.analyze(args.url, flags)
+        # Show Unsheathed Sword for CLI commands (not when stdout is a JSON stream)
+        PhantomUI.set_output(args.output)
+        if not PhantomUI.structured():
+            PhantomUI.show_unsheathed()
+        from phantom.modules.wraith import WraithAnalyzer
+        from phantom.modules.swarm import SwarmRunner, read_targets
+        from phantom.utils.http import HttpPool
+        from phantom.utils.cache import ResponseCache
+
+        cache = None
+        if args.cache:
+            # Bare -cache means the default directory
+            directory = None if args.cache is True else args.cache
+            cache = ResponseCache(directory, max_bytes=args.cache_size * 1024 * 1024)
+        pool = HttpPool(pool_size=args.pool_size, keep_alive=args.keepalive, retries=args.retries, cache=cache,
+                        timeout=args.timeout, rate=args.rate)
+        state = None
+        if args.incremental:
+            from phantom.utils.state import StateStore
+            state = StateStore(None if args.incremental is True else args.incremental)
+        tool = WraithAnalyzer(pool=pool, state=state)
+        if args.targets:
+            swarm = SwarmRunner(tool, workers=args.workers, per_host=args.per_host)
+            swarm.run(read_targets(args.targets), flags)
+        else:
+            tool.analyze(args.url, flags)
+        pool.close()
+        if state is not None:
+            state.close()
+        PhantomUI.finish_output()
+
+    elif args.command == "hunt":
+        PhantomUI.set_output(args.output)
+        if not PhantomUI.structured():
+            PhantomUI.show_unsheathed()
+        from phantom.modules.hunt import TreeHunter
+        tool = TreeHunter(workers=args.workers or None, entropy=args.entropy, respect_ignore=args.ignore,
+                          max_size=args.max_size * 1024 * 1024)
+        tool.hunt(args.path)
+        PhantomUI.finish_output()
+
+    elif args.command == "db":
+        if args.db_command == "build":
+            run_db_build(args)
+        elif args.db_command == "profile":
+            run_db_profile(args)
+        else:
+            db_parser.print_help()
 
     elif args.command == "wifi":
-        PhantomUI.show_unsheathed()
-        tool = SpectralScanner()
-        tool.scan()
+        PhantomUI.set_output(args.output)
+        if not PhantomUI.structured():
+            PhantomUI.show_unsheathed()
+        from phantom.modules.spectral import SpectralScanner, SpectralMonitor
+        tool = SpectralScanner(timeout=args.scan_timeout, rescan=args.rescan)
+        if args.replay:
+            tool.replay(args.replay)
+        elif args.watch:
+            SpectralMonitor(tool, interval=args.watch, history=args.history, delta=args.delta).watch(args.polls)
+        else:
+            tool.scan()
+        PhantomUI.finish_output()
+
+def run_db_build(args):
+    from phantom.utils.store import build_index, default_index_path
+    data_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+    cve_paths = args.cve or [os.path.join(data_path, 'cve_db.json')]
+    secrets_path = args.secrets or os.path.join(data_path, 'secrets_patterns.json')
+    out_path = args.out or default_index_path()
+
+    PhantomUI.section("Building Phantom Index")
+    start = time.time()
+    stats = build_index(cve_paths, secrets_path, out_path)
+    PhantomUI.data("Products", stats['products'])
+    PhantomUI.data("CVE Entries", stats['entries'])
+    PhantomUI.data("Index Size", f"{stats['bytes'] / 1024:.1f} KB")
+    PhantomUI.data("Build Time", f"{time.time() - start:.2f}s")
+    PhantomUI.info(f"Index written to {out_path}")
+    PhantomUI.flush()
+
+def run_db_profile(args):
+    import json
+    import random
+    import string
+    from phantom.modules.hunter import SecretMatcher, RULE_BUDGET, BUDGET_WINDOW, MIN_PREFIX
+    data_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+    secrets_path = args.secrets or os.path.join(data_path, 'secrets_patterns.json')
+
+    with open(secrets_path, 'r') as f:
+        pack = json.load(f)
+    matcher = SecretMatcher(pack, budget=args.budget or RULE_BUDGET)
+
+    if args.sample:
+        samples = []
+        for path in args.sample:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                samples.append(f.read())
+    else:
+        rng = random.Random(0)
+        samples = [''.join(rng.choice(string.printable) for _ in range(1 << 20))]
+    size = sum(len(text) for text in samples)
+
+    PhantomUI.section("Secrets Pack Profile")
+    PhantomUI.data("Pack", f"{secrets_path} ({len(matcher.rules)} rules, {matcher.engine.__name__} engine)")
+
+    # Sample traffic, in the same windows Hunter scans responses in
+    start = time.time()
+    for text in samples:
+        chunks = (text[i:i + BUDGET_WINDOW] for i in range(0, len(text), BUDGET_WINDOW))
+        for _ in matcher.scan_stream(chunks):
+            pass
+    sample = {rule: (calls, seconds, hits) for rule, calls, seconds, hits in matcher.profile()}
+    PhantomUI.data("Sample", f"{size / 1024 / 1024:.1f} MB in {time.time() - start:.2f}s "
+                             f"(anchor prefilter {matcher.prefilter_seconds * 1000:.1f} ms)")
+
+    # Worst-case inputs: every anchor followed by a long unterminated run
+    matcher.reset_profile()
+    for text in matcher.stress_texts():
+        matcher.scan(text)
+    stress = {rule: seconds for rule, calls, seconds, hits in matcher.profile()}
+
+    PhantomUI.write(f"  {'Rule':<32} {'Kind':<9} {'Calls':>8} {'Sample ms':>10} {'us/call':>9} {'Hits':>7} "
+                    f"{'Stress ms':>10}  Status")
+    for rule, (calls, seconds, hits) in sorted(sample.items(), key=lambda item: item[1][1] + stress[item[0]],
+                                               reverse=True):
+        # Anchored rules only run where the prefilter found their literal
+        kind = 'anchored' if len(rule.prefix) >= MIN_PREFIX else 'full'
+        per_call = f"{seconds / calls * 1e6:9.1f}" if calls else f"{'-':>9}"
+        status = f"DISABLED: {rule.disabled}" if rule.disabled else "ok"
+        PhantomUI.write(f"  {rule.name[:32]:<32} {kind:<9} {calls:>8} {seconds * 1000:>10.1f} {per_call} {hits:>7} "
+                        f"{stress[rule] * 1000:>10.1f}  {status}")
+
+    disabled = matcher.take_disabled()
+    if disabled:
+        PhantomUI.alert(f"{len(disabled)} rule(s) would be disabled at scan time")
+    PhantomUI.flush()
 
 def entry_point():
     """
@@ -0,0 +1,198 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from urllib.parse import urljoin
+from phantom.utils.http import HttpPool
+from phantom.utils.html import parse_html
+from phantom.utils.frontier import Frontier, canonicalize
+from phantom.utils.sitemap import SitemapReader
+from phantom.modules.assets import scoped_urls
+
+
+class CrawlError(Exception):
+    """A page answered with an HTTP error status."""
+
+
+class ArachnidCrawler:
+    """
+    Concurrent breadth-first crawler behind the -spider flag.
+
+    URLs are canonicalized and deduplicated by a disk-backed Frontier; the
+    blocking fetches through the shared HttpPool are pushed onto a thread
+    pool so up to `max_inflight` overlap. Sitemaps, when given, are read
+    alongside the crawl on a thread of their own, so blocked page fetches
+    cannot starve them, and their URLs join the frontier at depth 1 until
+    the page budget is spent.
+    Once the optional `cancel` event is set no new page is fetched; the
+    crawl returns what it found when the fetches in flight finish. With a
+    `baseline` (incremental runs) a page unchanged since the last run is
+    not fetched: its stored links are followed instead. The same-site
+    <script src> URLs of every crawled page are kept in `scripts`.
+    """
+
+    # URLs taken from the sitemap stream per step of the crawl loop
+    SITEMAP_BATCH = 1000
+
+    # Failed pages kept with their reason (all of them are counted)
+    MAX_FAILURES_KEPT = 1000
+
+    def __init__(self, max_depth=2, max_pages=500, max_inflight=16, timeout=None, pool=None, parser='auto',
+                 cancel=None, baseline=None):
+        self.parser = parser
+        self.cancel = cancel
+        self.baseline = baseline
+        self.pool = pool or HttpPool(pool_size=max_inflight)
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.max_inflight = max_inflight
+        # None uses the pool's timeout
+        self.timeout = timeout
+
+        # (url, depth) for every link found, depth of first discovery
+        self.discovered = None
+        self.pages_fetched = 0
+        self.pages_reused = 0    # unchanged since the last incremental run, not fetched
+        self.errors = 0
+        self.failures = []    # (url, reason) for the first MAX_FAILURES_KEPT errors
+        self.scripts = {}     # same-site script URL -> first crawled page linking it
+        self.sitemap = None
+
+    def crawl(self, start_url, seed_links=None, sitemaps=None):
+        """
+        Crawl from start_url and return the discovered links (a LinkLog whose
+        items() yields (url, depth), start page at depth 0).
+        If the start page was already fetched, pass its hrefs to skip refetching it.
+        `sitemaps` (e.g. from robots.txt) seed the frontier with the pages they list.
+        """
+        return asyncio.run(self._crawl(start_url, seed_links, sitemaps))
+
+    async def _crawl(self, start_url, seed_links, sitemaps):
+        frontier = Frontier()
+        start_url = canonicalize(start_url)
+        netloc = start_url.partition('://')[2].split('/', 1)[0]
+        # Canonical URLs always have a path, so the prefix ends at the host
+        self._scope = (f"http://{netloc}/", f"https://{netloc}/")
+        frontier.add(start_url, 0)
+        self.discovered = frontier.discovered
+        self._scheduled = 0
+
+        loop = asyncio.get_running_loop()
+        inflight = {}   # future -> (url, depth)
+
+        # Sitemap URLs arrive in batches from a worker thread; at most one batch is pending
+        batches = None
+        if sitemaps:
+            self.sitemap = SitemapReader(self.pool, baseline=self.baseline)
+            stream = self.sitemap.urls(sitemaps)
+            batches = lambda: list(islice(stream, self.SITEMAP_BATCH))
+        batch_future = None
+
+        with ThreadPoolExecutor(max_workers=self.max_inflight) as executor, \
+                ThreadPoolExecutor(max_workers=1) as reader:
+            if seed_links is not None:
+                # Depth 0 is the page analyze() already has in hand
+                self._scheduled += 1
+                self.pages_fetched += 1
+                self._enqueue_links(frontier, start_url, seed_links, 1)
+            else:
+                self._schedule(frontier, start_url, 0)
+
+            if batches:
+                batch_future = loop.run_in_executor(reader, batches)
+
+            while True:
+                # Once cancelled, only what is in flight is drained
+                cancelled = self.cancel is not None and self.cancel.is_set()
+                while not cancelled and len(inflight) < self.max_inflight and len(frontier):
+                    url, depth = frontier.pop()
+                    inflight[loop.run_in_executor(executor, self._fetch_links, url)] = (url, depth)
+                if not inflight and (batch_future is None or cancelled):
+                    break
+
+                waiting = list(inflight) + ([batch_future] if batch_future else [])
+                done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    if future is batch_future:
+                        batch = future.result()
+                        self._enqueue_links(frontier, start_url, batch, 1)
+                        # An empty batch means every sitemap has been read; once the
+                        # budget is spent, more URLs would never be fetched
+                        more = batch and not cancelled and self._scheduled < self.max_pages
+                        batch_future = loop.run_in_executor(reader, batches) if more else None
+                        continue
+                    url, depth = inflight.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        self.errors += 1
+                        if len(self.failures) < self.MAX_FAILURES_KEPT:
+                            self.failures.append((url, str(e) or type(e).__name__))
+                        continue
+                    if result is None:
+                        continue
+                    final_url, links, scripts = result
+                    if final_url != url:
+                        # Redirected: don't fetch the target again if it is linked later
+                        frontier.mark(final_url)
+                    self.pages_fetched += 1
+                    self._enqueue_links(frontier, final_url, links, depth + 1)
+                    for script_url in scoped_urls(final_url, scripts):
+                        self.scripts.setdefault(script_url, final_url)
+
+        if batches:
+            # Stopped early (budget, cancel): drop the open sitemap response
+            stream.close()
+        frontier.close()
+        return self.discovered
+
+    def _fetch_links(self, url):
+        """(final url, links, scripts) of a page, or None if it is not HTML."""
+        if self.baseline is not None:
+            state = self.baseline.get(url)
+            if state is not None and (state.status >= 400 or state.data is not None):
+                self.baseline.keep(url, state)
+                self.pages_reused += 1
+                return self._replay(state)
+
+        res = self.pool.get(url, **({'timeout': self.timeout} if self.timeout else {}))
+        if res.status_code >= 400:
+            # Error pages are not part of the site; their links are not followed
+            raise CrawlError(f"HTTP {res.status_code}")
+        if 'html' not in res.headers.get('Content-Type', ''):
+            if self.baseline is not None:
+                self.baseline.note(url, {})
+            return None
+        doc = parse_html(res.text, self.parser)
+        final_url = canonicalize(res.url or url)
+        if self.baseline is not None:
+            self.baseline.note(url, {'url': final_url, 'links': doc.links, 'scripts': doc.scripts})
+        return final_url, doc.links, doc.scripts
+
+    def _replay(self, state):
+        if state.status >= 400:
+            raise CrawlError(f"HTTP {state.status}")
+        if 'links' not in state.data:
+            return None
+        return state.data['url'], state.data['links'], state.data['scripts']
+
+    def _enqueue_links(self, frontier, page_url, hrefs, depth):
+        for href in hrefs:
+            try:
+                full_url = canonicalize(urljoin(page_url, href))
+            except ValueError:
+                # Malformed href (e.g. a bad IPv6 literal)
+                continue
+            # Only internal links
+            if not full_url.startswith(self._scope):
+                continue
+            previous = frontier.offer(full_url, depth)
+            # Links at max depth are reported but not followed; one seen there first
+            # (e.g. a sitemap URL arriving mid-crawl) is followed once found shallower
+            if depth < self.max_depth and (previous is None or previous >= self.max_depth):
+                self._schedule(frontier, full_url, depth)
+
+    def _schedule(self, frontier, url, depth):
+        if self._scheduled >= self.max_pages:
+            return
+        self._scheduled += 1
+        frontier.push(url, depth)
@@ -0,0 +1,80 @@
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urljoin, urlparse, urldefrag
+
+
+def scoped_urls(base_url, srcs):
+    """Resolves script srcs against the page and keeps those on the target's host."""
+    scope = urlparse(base_url).netloc.lower()
+    urls = []
+    seen = set()
+    for src in srcs:
+        full_url = urldefrag(urljoin(base_url, src))[0]
+        parsed = urlparse(full_url)
+        if parsed.scheme not in ('http', 'https') or parsed.netloc.lower() != scope:
+            continue
+        if full_url not in seen:
+            seen.add(full_url)
+            urls.append(full_url)
+    return urls
+
+
+class AssetFetcher:
+    """
+    Fetches linked JavaScript bundles concurrently through the shared HttpPool.
+
+    Bodies are deduplicated by SHA-256 for the lifetime of the fetcher (one
+    analyze run), so a bundle served under several URLs is handed out for
+    scanning only once.
+    """
+
+    # Failed bundles kept with their reason (all of them are counted)
+    MAX_FAILURES_KEPT = 1000
+
+    def __init__(self, pool, max_inflight=8, timeout=None):
+        self.pool = pool
+        self.max_inflight = max_inflight
+        self.timeout = timeout
+
+        self._seen = set()
+        self._lock = threading.Lock()
+        self.fetched = 0
+        self.duplicates = 0
+        self.errors = 0
+        self.failures = []    # (url, reason) for the first MAX_FAILURES_KEPT errors
+
+    def fetch(self, urls):
+        """Yields (url, text) for every asset with content not seen before, as each arrives."""
+        if not urls:
+            return
+
+        with ThreadPoolExecutor(max_workers=min(self.max_inflight, len(urls))) as executor:
+            futures = {executor.submit(self._get, url): url for url in urls}
+            for future in as_completed(futures):
+                try:
+                    res = future.result()
+                except Exception as e:
+                    self._fail(futures[future], str(e) or type(e).__name__)
+                    continue
+                if res.status_code != 200:
+                    self._fail(futures[future], f"HTTP {res.status_code}")
+                    continue
+
+                digest = hashlib.sha256(res.content).digest()
+                with self._lock:
+                    self.fetched += 1
+                    if digest in self._seen:
+                        self.duplicates += 1
+                        continue
+                    self._seen.add(digest)
+
+                yield futures[future], res.text
+
+    def _fail(self, url, reason):
+        self.errors += 1
+        if len(self.failures) < self.MAX_FAILURES_KEPT:
+            self.failures.append((url, reason))
+
+    def _get(self, url):
+        return self.pool.get(url, **({'timeout': self.timeout} if self.timeout else {}))
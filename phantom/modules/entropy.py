@@ -0,0 +1,296 @@
+import math
+import re
+from collections import Counter
+
+# Characters a token may contain: base64 (standard and URL-safe) plus padding
+TOKEN_CHARS = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/=_-')
+HEX_CHARS = frozenset('0123456789abcdefABCDEF')
+
+# Minimum Shannon entropy in bits per character (the maximum is 4 for hex, 6 for base64)
+DEFAULT_THRESHOLDS = {'hex': 3.0, 'base64': 4.5}
+
+# Rule names the detector reports under, per charset
+RULE_NAMES = {'hex': "High Entropy String (hex)", 'base64': "High Entropy String (base64)"}
+
+# Character classes for the vectorized path (0 is punctuation: + / = _ -)
+DIGIT, HEX_LOWER, HEX_UPPER, LOWER, UPPER = range(1, 6)
+CLASSES = 6
+
+_RUN = re.compile(r'[A-Za-z0-9+/=_\-]*')
+
+# PEM blocks holding public material (certificate bundles such as cacert.pem);
+# their base64 lines are random-looking but not secrets
+_PEM = re.compile(r'-----(BEGIN|END) ([A-Z0-9 ]+)-----')
+PUBLIC_PEM = frozenset(('CERTIFICATE', 'TRUSTED CERTIFICATE', 'X509 CRL', 'PUBLIC KEY',
+                        'RSA PUBLIC KEY', 'CERTIFICATE REQUEST', 'NEW CERTIFICATE REQUEST', 'PKCS7'))
+
+# Consecutive characters (e.g. 'abcdef', '012345') that mark a token as an alphabet, not a key
+SEQUENCE_RUN = 6
+
+# A hex token (git hash, checksum, color table...) only counts with one of these
+# words shortly before it on its line
+_KEY_CONTEXT = re.compile(r'(?i)key|secret|token|passw|pwd|auth|credential|signature|private')
+CONTEXT = 64
+
+
+def numpy_available():
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def shannon_entropy(token):
+    """Bits per character of a single string."""
+    length = len(token)
+    return math.log2(length) - sum(c * math.log2(c) for c in Counter(token).values()) / length
+
+
+def sequential(token, run=SEQUENCE_RUN):
+    """True if `run` characters in a row each follow the previous one ('abcdef')."""
+    length = 1
+    for a, b in zip(token, token[1:]):
+        length = length + 1 if ord(b) == ord(a) + 1 else 1
+        if length >= run:
+            return True
+    return False
+
+
+class _TextContext:
+    """
+    What the filters need from text before the part being scanned: the
+    last CONTEXT characters and whether a public PEM block is still open.
+    """
+
+    __slots__ = ('tail', 'pem_open')
+
+    def __init__(self):
+        self.tail = ''
+        self.pem_open = False
+
+    def skip(self, text):
+        """Text passed over without scanning (it holds no line break or PEM marker)."""
+        self.tail = (self.tail + text)[-CONTEXT:]
+
+
+class EntropyScanner:
+    """
+    Flags random-looking tokens that no regex rule describes: runs of
+    base64/hex characters between `min_length` and `max_length` long whose
+    Shannon entropy clears the threshold for their charset. Hex tokens must
+    mix digits and letters, base64 tokens digits and both cases, which
+    leaves out most identifiers and words.
+
+    Hits are then dropped inside public PEM blocks (certificates), when they
+    contain an alphabet run ('ABCDEF', '012345'), and, for hex, unless a
+    word like key, secret or token precedes them on their line: hex hashes
+    in comments and lock files are everywhere, hex keys come labelled.
+
+    With NumPy installed a whole text is tokenized and scored in a few
+    array operations (character classes by table lookup, runs from the
+    mask edges, per-token symbol counts from one sort); without it the same
+    rules run token by token.
+    """
+
+    def __init__(self, thresholds=None, min_length=20, max_length=128, vectorized=None):
+        self.thresholds = dict(DEFAULT_THRESHOLDS, **(thresholds or {}))
+        self.min_length = min_length
+        self.max_length = max_length
+        if vectorized is None:
+            vectorized = numpy_available()
+        self.vectorized = vectorized
+        self._tables = self._build_tables() if vectorized else None
+        self._token = re.compile(r'[A-Za-z0-9+/=_\-]{%d,}' % min_length)
+
+    def scan(self, text):
+        """Returns (rule_name, value, offset) for every high-entropy token in text."""
+        return self._scan(text, 0, False, _TextContext())
+
+    def stream(self):
+        """Scanner state for text that arrives in chunks (see EntropyStream)."""
+        return EntropyStream(self)
+
+    def _scan(self, text, base, open_end, context):
+        # open_end: the run touching the end of text continues past it and is not a token;
+        # context: what preceded text (text must continue it directly)
+        if self.vectorized:
+            hits = self._scan_numpy(text, base, open_end)
+        else:
+            hits = self._scan_python(text, base, open_end)
+        return self._filter(hits, text, base, context)
+
+    def _filter(self, hits, text, base, context):
+        buf = context.tail + text
+        buf_base = base - len(context.tail)
+
+        # Public PEM bodies in text, as absolute [start, end) offsets
+        spans = []
+        start = base if context.pem_open else None
+        for match in (_PEM.finditer(buf) if '-----' in buf else ()):
+            if match.end() <= len(context.tail):
+                continue    # seen with the previous text
+            if match.group(1) == 'BEGIN':
+                if start is None and match.group(2) in PUBLIC_PEM:
+                    start = buf_base + match.end()
+            elif start is not None:
+                spans.append((start, buf_base + match.start()))
+                start = None
+        context.pem_open = start is not None
+        if context.pem_open:
+            spans.append((start, base + len(text)))
+        context.tail = buf[-CONTEXT:]
+
+        kept = []
+        for hit in hits:
+            name, token, offset = hit
+            if any(a <= offset < b for a, b in spans) or sequential(token):
+                continue
+            if name == RULE_NAMES['hex']:
+                i = offset - buf_base
+                line_start = buf.rfind('\n', 0, i) + 1
+                if not _KEY_CONTEXT.search(buf, max(line_start, i - CONTEXT), i):
+                    continue
+            kept.append(hit)
+        return kept
+
+    def _scan_python(self, text, base, open_end):
+        hits = []
+        for match in self._token.finditer(text):
+            token = match.group()
+            if len(token) > self.max_length or (open_end and match.end() == len(text)):
+                continue
+            charset = self._charset(token)
+            if charset and shannon_entropy(token) >= self.thresholds[charset]:
+                hits.append((RULE_NAMES[charset], token, base + match.start()))
+        return hits
+
+    def _charset(self, token):
+        """'hex' or 'base64' if the token's character mix qualifies, else None."""
+        digits = sum(c.isdigit() for c in token)
+        if not digits:
+            return None
+        if HEX_CHARS.issuperset(token):
+            return 'hex' if digits < len(token) else None
+        if any(c.isupper() for c in token) and any(c.islower() for c in token):
+            return 'base64'
+        return None
+
+    def _build_tables(self):
+        import numpy as np
+
+        token = np.zeros(128, dtype=bool)
+        token[[ord(c) for c in TOKEN_CHARS]] = True
+
+        # Character class per code, counted per token in a single bincount
+        classes = np.zeros(128, dtype=np.intp)
+        for c in TOKEN_CHARS:
+            if c.isdigit():
+                classes[ord(c)] = DIGIT
+            elif c in HEX_CHARS:
+                classes[ord(c)] = HEX_UPPER if c.isupper() else HEX_LOWER
+            elif c.isalpha():
+                classes[ord(c)] = UPPER if c.isupper() else LOWER
+        return {'token': token, 'classes': classes}
+
+    def _scan_numpy(self, text, base, open_end):
+        import numpy as np
+        tables = self._tables
+
+        if text.isascii():
+            codes = np.frombuffer(text.encode('ascii'), dtype=np.uint8)
+        else:
+            # One code per character keeps offsets in characters; non-ASCII never joins a token
+            codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+            codes = np.where(codes < 128, codes, 0).astype(np.uint8)
+        if not len(codes):
+            return []
+
+        # Token runs from the edges of the character mask
+        mask = np.concatenate(([False], tables['token'][codes], [False]))
+        edges = np.flatnonzero(mask[1:] != mask[:-1])
+        starts, ends = edges[0::2], edges[1::2]
+        lengths = ends - starts
+        keep = (lengths >= self.min_length) & (lengths <= self.max_length)
+        if open_end:
+            keep &= ends != len(codes)
+        starts, lengths = starts[keep], lengths[keep]
+        if not len(starts):
+            return []
+
+        # Characters of every kept token, with the index of the token they belong to
+        ids = np.repeat(np.arange(len(starts)), lengths)
+        firsts = np.cumsum(lengths) - lengths
+        chars = codes[starts[ids] + np.arange(len(ids)) - firsts[ids]]
+
+        per_class = np.bincount(ids * CLASSES + tables['classes'][chars], minlength=len(starts) * CLASSES)
+        per_class = per_class.reshape(len(starts), CLASSES)
+        digits = per_class[:, DIGIT]
+        is_hex = digits + per_class[:, HEX_LOWER] + per_class[:, HEX_UPPER] == lengths
+        has_upper = per_class[:, HEX_UPPER] + per_class[:, UPPER] > 0
+        has_lower = per_class[:, HEX_LOWER] + per_class[:, LOWER] > 0
+        charset_ok = (digits > 0) & np.where(is_hex, digits < lengths, has_upper & has_lower)
+
+        # H = log2(n) - sum(c * log2(c)) / n over each token's symbol counts; only
+        # tokens with the right character mix are worth the sort
+        scored = charset_ok[ids]
+        pairs, counts = np.unique(ids[scored] * 128 + chars[scored], return_counts=True)
+        weighted = np.bincount(pairs >> 7, weights=counts * np.log2(counts), minlength=len(starts))
+        entropy = np.log2(lengths) - weighted / lengths
+
+        threshold = np.where(is_hex, self.thresholds['hex'], self.thresholds['base64'])
+        hits = []
+        for i in np.flatnonzero(charset_ok & (entropy >= threshold)):
+            start = int(starts[i])
+            charset = 'hex' if is_hex[i] else 'base64'
+            hits.append((RULE_NAMES[charset], text[start:start + int(lengths[i])], base + start))
+        return hits
+
+
+class EntropyStream:
+    """
+    Feeds chunks of one text through an EntropyScanner. A token cut by a
+    chunk boundary is carried into the next chunk; a run that grows past
+    max_length is skipped to its end without being buffered.
+    """
+
+    def __init__(self, scanner):
+        self.scanner = scanner
+        self.carry = ''
+        self.base = 0         # offset of carry[0] in the whole text
+        self.skipping = False
+        self.context = _TextContext()
+
+    def feed(self, chunk):
+        """Returns the hits settled by this chunk."""
+        if self.skipping:
+            skip = _RUN.match(chunk).end()
+            self.context.skip(chunk[:skip])
+            self.base += skip
+            chunk = chunk[skip:]
+            if not chunk:
+                return []
+            self.skipping = False
+
+        window = self.carry + chunk
+        limit = self.scanner.max_length
+        cut = len(window)
+        while cut and window[cut - 1] in TOKEN_CHARS and len(window) - cut <= limit:
+            cut -= 1
+
+        if len(window) - cut > limit:
+            # Too long to be a token, however it ends
+            hits = self.scanner._scan(window, self.base, True, self.context)
+            self.base += len(window)
+            self.carry = ''
+            self.skipping = True
+        else:
+            hits = self.scanner._scan(window[:cut], self.base, False, self.context)
+            self.base += cut
+            self.carry = window[cut:]
+        return hits
+
+    def close(self):
+        hits = [] if self.skipping else self.scanner._scan(self.carry, self.base, False, self.context)
+        self.carry = ''
+        return hits
@@ -0,0 +1,237 @@
+import json
+import mmap
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from phantom.utils.ui import PhantomUI
+from phantom.utils.findings import Finding
+from phantom.utils.ignore import IgnoreRules
+from phantom.utils.store import open_index
+from phantom.modules.hunter import SecretMatcher
+from phantom.modules.entropy import EntropyScanner, RULE_NAMES as ENTROPY_RULES
+
+# Files at least this big are memory-mapped and scanned in windows
+MMAP_THRESHOLD = 1 << 20
+WINDOW = 1 << 20
+
+# Bytes sniffed for a NUL to call a file binary
+SNIFF = 8192
+
+# Work sent to a worker at once: many small files, or one big one
+BATCH_BYTES = 8 << 20
+BATCH_FILES = 256
+
+# Hits kept per file; minified bundles can otherwise return thousands
+MAX_FILE_HITS = 200
+
+
+def load_pack():
+    """The secrets pack Wraith uses: the compiled index if built and current, else the bundled JSON."""
+    store, stale = open_index()
+    if store is not None:
+        pack = store.secrets()
+        store.close()
+        return pack
+    if stale:
+        PhantomUI.alert(f"Index out of date ({', '.join(stale)}); using the JSON files. Run `phantom db build` to refresh it.")
+    base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with open(os.path.join(base_path, 'data', 'secrets_patterns.json'), 'r') as f:
+        return json.load(f)
+
+
+# Per-process matcher, built once by the pool initializer
+_matcher = None
+
+
+def _init_worker(pack, entropy):
+    global _matcher
+    _matcher = SecretMatcher(pack, entropy=EntropyScanner() if entropy else None)
+
+
+def _scan_batch(paths):
+    """Worker: scans a batch of files. Returns (stats, [(path, hits, dropped)], disabled rules)."""
+    stats = {'files': 0, 'bytes': 0, 'binary': 0, 'errors': 0}
+    results = []
+    for path in paths:
+        try:
+            found = _scan_file(path, stats)
+        except (OSError, ValueError):
+            stats['errors'] += 1
+            continue
+        if found:
+            results.append((path,) + found)
+    return stats, results, _matcher.take_disabled()
+
+
+def _scan_file(path, stats):
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            stats['files'] += 1
+            return None
+        if size < MMAP_THRESHOLD:
+            data = f.read()
+            if b'\0' in data[:SNIFF]:
+                stats['binary'] += 1
+                return None
+            # latin-1 keeps one character per byte, so offsets are byte offsets;
+            # every rule and the entropy charset are ASCII
+            hits = _matcher.scan(data.decode('latin-1'))
+            buf = data
+        else:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if b'\0' in buf[:SNIFF]:
+                buf.close()
+                stats['binary'] += 1
+                return None
+            chunks = (buf[i:i + WINDOW].decode('latin-1') for i in range(0, size, WINDOW))
+            hits = []
+            for hit in _matcher.scan_stream(chunks):
+                hits.append(hit)
+                if len(hits) > MAX_FILE_HITS * 10:
+                    break
+    stats['files'] += 1
+    stats['bytes'] += size
+    if not hits:
+        if isinstance(buf, mmap.mmap):
+            buf.close()
+        return None
+
+    hits.sort(key=lambda hit: hit[2])
+    dropped = max(len(hits) - MAX_FILE_HITS, 0)
+    hits = hits[:MAX_FILE_HITS]
+
+    # Line numbers counted forward from hit to hit, so each byte is counted once
+    line, last = 1, 0
+    numbered = []
+    for name, value, offset in hits:
+        line += buf[last:offset].count(b'\n')
+        last = offset
+        numbered.append((name, value[:4] + "...", line, offset))
+    if isinstance(buf, mmap.mmap):
+        buf.close()
+    return numbered, dropped
+
+
+class TreeHunter:
+    """
+    Offline Hunter: runs the secrets pack (and the entropy detector) over
+    a directory tree. The walk skips .gitignore'd paths and VCS metadata;
+    workers skip binary files (a NUL in the first 8 KB), read small files
+    whole and memory-map large ones. Files go to a process pool in batches
+    of about 8 MB, with a bounded number in flight, so every core is busy
+    and memory stays flat however large the tree.
+    """
+
+    def __init__(self, workers=None, entropy=True, respect_ignore=True, max_size=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.entropy = entropy
+        self.respect_ignore = respect_ignore
+        self.max_size = max_size
+
+        self.stats = {'files': 0, 'bytes': 0, 'binary': 0, 'errors': 0, 'ignored': 0, 'too_large': 0}
+        self.hits = 0
+
+    def walk(self, root):
+        """Yields (path, size) for every file to scan under root."""
+        root = os.path.normpath(root)
+        if os.path.isfile(root):
+            yield root, os.path.getsize(root)
+            return
+
+        stack = [(root, IgnoreRules().descend(root) if self.respect_ignore else IgnoreRules())]
+        while stack:
+            directory, rules = stack.pop()
+            try:
+                entries = sorted(os.scandir(directory), key=lambda entry: entry.name, reverse=True)
+            except OSError:
+                self.stats['errors'] += 1
+                continue
+            subdirs = []
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    if not is_dir and not entry.is_file(follow_symlinks=False):
+                        continue
+                except OSError:
+                    continue
+                if rules.ignored(entry.path, is_dir):
+                    self.stats['ignored'] += 1
+                    continue
+                if is_dir:
+                    subdirs.append(entry.path)
+                    continue
+                size = entry.stat(follow_symlinks=False).st_size
+                if self.max_size and size > self.max_size:
+                    self.stats['too_large'] += 1
+                    continue
+                yield entry.path, size
+            for path in subdirs:
+                stack.append((path, rules.descend(path) if self.respect_ignore else rules))
+
+    def batches(self, files):
+        batch, batch_bytes = [], 0
+        for path, size in files:
+            batch.append(path)
+            batch_bytes += size
+            if batch_bytes >= BATCH_BYTES or len(batch) >= BATCH_FILES:
+                yield batch
+                batch, batch_bytes = [], 0
+        if batch:
+            yield batch
+
+    def hunt(self, root, pack=None):
+        PhantomUI.section(f"Hunter Sweep: {root}")
+        PhantomUI.info(f"Scanning with {self.workers} worker process(es)...")
+        pack = pack if pack is not None else load_pack()
+        started = time.time()
+        disabled = set()
+
+        batches = self.batches(self.walk(root))
+        pending = set()
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(pack, self.entropy)) as executor:
+            while True:
+                # A few batches per worker keeps them busy without reading the whole tree ahead
+                while len(pending) < self.workers * 3:
+                    batch = next(batches, None)
+                    if batch is None:
+                        break
+                    pending.add(executor.submit(_scan_batch, batch))
+                if not pending:
+                    break
+
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stats, results, rules = future.result()
+                    for key, value in stats.items():
+                        self.stats[key] += value
+                    for path, hits, dropped in results:
+                        self._report(path, hits, dropped)
+                    for name, reason in rules:
+                        if name not in disabled:
+                            disabled.add(name)
+                            PhantomUI.report(Finding('hunter', 'rule_disabled', root, f"Rule Disabled: {name}",
+                                                     reason, severity='medium'))
+
+        self._summary(time.time() - started)
+
+    def _report(self, path, hits, dropped):
+        for name, value, line, offset in hits:
+            self.hits += 1
+            PhantomUI.report(Finding(
+                'hunter', 'file_secret', path, name, value,
+                severity='medium' if name in ENTROPY_RULES.values() else 'high', line=line, offset=offset
+            ))
+        if dropped:
+            PhantomUI.data(f"{path}", f"{dropped} more hits not shown")
+
+    def _summary(self, elapsed):
+        s = self.stats
+        PhantomUI.section("Sweep Summary")
+        PhantomUI.data("Files Scanned", s['files'])
+        PhantomUI.data("Data Scanned", f"{s['bytes'] / 1024 / 1024:.1f} MB in {elapsed:.2f}s "
+                                       f"({s['bytes'] / 1024 / 1024 / max(elapsed, 1e-6):.1f} MB/s)")
+        PhantomUI.data("Skipped", f"{s['binary']} binary, {s['ignored']} ignored, {s['too_large']} too large, "
+                                  f"{s['errors']} unreadable")
+        PhantomUI.data("Potential Leaks", self.hits)
@@ -0,0 +1,361 @@
+import re
+import threading
+import time
+
+try:
+    import re._parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+# Shorter literal anchors would fire on too much ordinary text to be worth it
+MIN_PREFIX = 3
+
+# Characters carried between streamed chunks; bounds the longest secret
+# that can straddle a chunk boundary
+OVERLAP = 4096
+
+# Seconds one rule may spend per 64K characters of text before it is
+# disabled for the rest of the run
+RULE_BUDGET = 0.25
+BUDGET_WINDOW = 65536
+
+
+# Characters repeated after each rule's anchor to build backtracking stress inputs
+STRESS_CHARS = 'aA0 "\'=_-/.\t'
+
+
+def regex_available():
+    try:
+        import regex  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def backtracking_prone(pattern):
+    """
+    True if an unbounded repeat sits inside another one, e.g. (a+)+ or
+    (x*y?)*, or repeats an alternation, e.g. (a|aa)*: the shapes behind
+    catastrophic backtracking.
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except re.error:
+        return False
+
+    repeats = {sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT}
+    unbounded_max = sre_parse.MAXREPEAT
+
+    def walk(items, inside):
+        for op, av in items:
+            if op in repeats:
+                low, high, sub = av
+                unbounded = high == unbounded_max
+                if unbounded and inside:
+                    return True
+                if walk(sub, inside or unbounded):
+                    return True
+            elif op is sre_parse.SUBPATTERN:
+                if walk(av[-1], inside):
+                    return True
+            elif op is sre_parse.BRANCH:
+                if inside:
+                    return True
+                if any(walk(branch, inside) for branch in av[1]):
+                    return True
+            elif op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+                if walk(av[1], inside):
+                    return True
+        return False
+
+    return walk(parsed, False)
+
+
+def literal_prefix(pattern):
+    """
+    Returns the fixed literal a regex must start with ('AKIA' for 'AKIA[0-9A-Z]{16}'),
+    or '' if the pattern has no usable anchor.
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except re.error:
+        return ''
+
+    if parsed.state.flags & re.IGNORECASE:
+        return ''
+
+    prefix = []
+    for op, av in parsed:
+        if op is not sre_parse.LITERAL:
+            break
+        prefix.append(chr(av))
+    return ''.join(prefix)
+
+
+def trie_pattern(literals):
+    """
+    Builds one regex matching any of `literals`, factored into a trie
+    (xox|xoxb|AKIA -> (?:xox(?:b)?|AKIA)) so the engine tests each shared
+    prefix once instead of trying every alternative at every offset.
+    """
+    trie = {}
+    for literal in literals:
+        node = trie
+        for char in literal:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def render(node):
+        ends_here = '' in node
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        if len(branches) == 1 and not ends_here:
+            return branches[0]
+        body = '(?:' + '|'.join(branches) + ')'
+        return body + '?' if ends_here else body
+
+    return render(trie)
+
+
+class SecretRule:
+    """
+    One compiled rule plus its running cost. With the `regex` module the
+    match runs under a hard timeout; with `re` the cost is checked after
+    each call.
+    """
+    __slots__ = ('name', 'pattern', 'regex', 'prefix', 'timeout', 'disabled', 'calls', 'seconds', 'hits')
+
+    def __init__(self, name, pattern, engine=re, timeout=None):
+        self.name = name
+        self.pattern = pattern
+        self.regex = engine.compile(pattern)
+        self.prefix = literal_prefix(pattern)
+        self.timeout = timeout if engine is not re else None
+        self.disabled = None     # reason, once the rule is switched off
+
+        # Profile counters
+        self.calls = 0
+        self.seconds = 0.0
+        self.hits = 0
+
+    def match(self, text, pos, budget):
+        if self.timeout:
+            return self.regex.match(text, pos, timeout=budget)
+        return self.regex.match(text, pos)
+
+    def finditer(self, text, pos, budget):
+        if self.timeout:
+            return list(self.regex.finditer(text, pos, timeout=budget))
+        return list(self.regex.finditer(text, pos))
+
+    def value(self, match):
+        # Mirror re.findall: report the first group when the rule captures one
+        if self.regex.groups:
+            return match.group(1) or ''
+        return match.group(0)
+
+
+class SecretMatcher:
+    """
+    Hunter's pattern engine. Every rule in the pack is compiled once; rules with
+    a literal anchor (AKIA, AIza, xox, -----BEGIN ...) are folded into a single
+    trie-shaped alternation that finds candidate offsets in one pass over the
+    text, and only the rules sharing that anchor are tried at each offset.
+    Rules without an anchor fall back to a regular finditer. An optional
+    EntropyScanner adds its high-entropy token hits to the regex ones.
+
+    Each rule gets `budget` seconds per 64K characters it looks at. A rule
+    that goes over (a pathological page, or a bad custom rule backtracking
+    catastrophically) is disabled for the rest of the run and listed by
+    take_disabled(). The `regex` module (an install requirement) enforces
+    the budget as a timeout. Plain `re`, used only when `regex` is missing
+    (e.g. a bare source checkout), cannot be interrupted, so there rules
+    with nested or alternating unbounded repeats are refused up front.
+    """
+
+    def __init__(self, patterns, entropy=None, budget=RULE_BUDGET, engine=None):
+        self.entropy = entropy
+        self.budget = budget
+        self.rules = []
+        self.anchored = {}    # matched literal -> rules whose prefix it starts with
+        self.unanchored = []
+        self.prefilter_seconds = 0.0
+
+        self.disabled = []    # rules switched off, not yet reported
+        self._disabled_lock = threading.Lock()
+
+        if engine is None:
+            if regex_available():
+                import regex as engine
+            else:
+                engine = re
+        self.engine = engine
+
+        prefixes = set()
+        for name, pattern in patterns.items():
+            try:
+                rule = SecretRule(name, pattern, engine, timeout=budget)
+            except (re.error, getattr(engine, 'error', re.error)):
+                # A broken rule in a custom pack should not take the whole scan down
+                continue
+            self.rules.append(rule)
+            if engine is re and backtracking_prone(pattern):
+                self._disable(rule, "unbounded repeat prone to backtracking (install `regex` to run it under a timeout)")
+                continue
+            if len(rule.prefix) >= MIN_PREFIX:
+                prefixes.add(rule.prefix)
+            else:
+                self.unanchored.append(rule)
+
+        for literal in prefixes:
+            self.anchored[literal] = [
+                rule for rule in self.rules
+                if len(rule.prefix) >= MIN_PREFIX and literal.startswith(rule.prefix) and not rule.disabled
+            ]
+        # Greedy trie alternation: the longest anchor present at an offset wins
+        self.prefilter = re.compile(trie_pattern(prefixes)) if prefixes else None
+
+    def scan(self, text):
+        """
+        Returns every rule hit in text as (rule_name, value, offset), ordered by offset.
+        Hits of a single rule never overlap, matching re.findall.
+        """
+        hits = [(rule.name, rule.value(match), match.start()) for rule, match in self._matches(text, {})]
+        if self.entropy is not None:
+            hits.extend(self._entropy_hits(self.entropy.scan(text)))
+            hits.sort(key=lambda hit: hit[2])
+        return hits
+
+    def _entropy_hits(self, hits):
+        # A token carrying a rule's anchor (AIza..., xoxb-...) is that rule's to report
+        for hit in hits:
+            if self.prefilter is None or not self.prefilter.search(hit[1]):
+                yield hit
+
+    def scan_stream(self, chunks, overlap=OVERLAP):
+        """
+        Scans an iterable of text chunks with bounded memory, yielding
+        (rule_name, value, offset) as soon as each hit is settled.
+
+        The last `overlap` characters of every window are carried into the next
+        one and any hit starting there is deferred to it, so secrets split across
+        a chunk boundary are still found (and never reported twice). Matches
+        longer than `overlap` may be cut short at a boundary.
+        """
+        carry = ''
+        base = 0        # absolute offset of carry[0]
+        last_end = {}   # rule name -> absolute end of its last hit
+        entropy = self.entropy.stream() if self.entropy is not None else None
+
+        for chunk in chunks:
+            if not chunk:
+                continue
+            window = carry + chunk
+            cutoff = max(len(window) - overlap, 0)
+            yield from self._settled(window, base, cutoff, last_end)
+            if entropy is not None:
+                yield from self._entropy_hits(entropy.feed(chunk))
+            carry = window[cutoff:]
+            base += cutoff
+
+        if carry:
+            yield from self._settled(carry, base, len(carry), last_end)
+        if entropy is not None:
+            yield from self._entropy_hits(entropy.close())
+
+    def _settled(self, window, base, cutoff, last_end):
+        # last_end is kept in absolute offsets across windows
+        local_end = {name: end - base for name, end in last_end.items()}
+        for rule, match in self._matches(window, local_end):
+            if match.start() >= cutoff:
+                continue
+            last_end[rule.name] = base + match.end()
+            yield rule.name, rule.value(match), base + match.start()
+
+    def _matches(self, text, last_end):
+        """Returns (rule, match) pairs in offset order."""
+        found = []
+        budget = self.budget * max(1.0, len(text) / BUDGET_WINDOW)
+        clock = time.perf_counter
+
+        if self.prefilter is not None:
+            spent = {}    # rule -> seconds on this text
+            start = clock()
+            for candidate in self.prefilter.finditer(text):
+                pos = candidate.start()
+                for rule in self.anchored[candidate.group()]:
+                    if rule.disabled or pos < last_end.get(rule.name, 0):
+                        continue
+                    begin = clock()
+                    try:
+                        match = rule.match(text, pos, budget - spent.get(rule, 0.0))
+                    except TimeoutError:
+                        match = None
+                        spent[rule] = budget
+                    elapsed = clock() - begin
+                    rule.calls += 1
+                    rule.seconds += elapsed
+                    spent[rule] = spent.get(rule, 0.0) + elapsed
+                    if spent[rule] >= budget:
+                        self._disable(rule, f"over {budget:.2f}s on {len(text)} characters")
+                        continue
+                    if match:
+                        rule.hits += 1
+                        last_end[rule.name] = match.end() or pos + 1
+                        found.append((rule, match))
+            self.prefilter_seconds += clock() - start - sum(spent.values())
+
+        for rule in self.unanchored:
+            if rule.disabled:
+                continue
+            begin = clock()
+            try:
+                matches = rule.finditer(text, max(last_end.get(rule.name, 0), 0), budget)
+            except TimeoutError:
+                matches = None
+            elapsed = clock() - begin
+            rule.calls += 1
+            rule.seconds += elapsed
+            if matches is None or elapsed >= budget:
+                self._disable(rule, f"over {budget:.2f}s on {len(text)} characters")
+                continue
+            rule.hits += len(matches)
+            found.extend((rule, match) for match in matches)
+
+        if self.unanchored:
+            found.sort(key=lambda hit: hit[1].start())
+        return found
+
+    def _disable(self, rule, reason):
+        with self._disabled_lock:
+            if rule.disabled:
+                return
+            rule.disabled = reason
+            self.disabled.append(rule)
+
+    def profile(self):
+        """Per-rule cost so far as (rule, calls, seconds, hits), most expensive first."""
+        rows = [(rule, rule.calls, rule.seconds, rule.hits) for rule in self.rules]
+        return sorted(rows, key=lambda row: row[2], reverse=True)
+
+    def reset_profile(self):
+        self.prefilter_seconds = 0.0
+        for rule in self.rules:
+            rule.calls, rule.seconds, rule.hits = 0, 0.0, 0
+
+    def stress_texts(self, length=2000):
+        """
+        Inputs meant to make a bad rule backtrack: each rule's anchor (so
+        anchored rules are actually tried) followed by a long run of one
+        character, with no terminator.
+        """
+        for rule in self.rules:
+            for char in STRESS_CHARS:
+                yield rule.prefix + char * length
+
+    def take_disabled(self):
+        """Rules disabled since the last call, as (name, reason); each is returned once."""
+        with self._disabled_lock:
+            rules, self.disabled = self.disabled, []
+        return [(rule.name, rule.disabled) for rule in rules]
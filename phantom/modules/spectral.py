@@ -1,36 +1,284 @@
+import os
+import re
+import signal
 import subprocess
 import platform
 import shutil
+import time
+import itertools
+from array import array
 from phantom.utils.ui import PhantomUI
+from phantom.utils.findings import Finding
+
+# A scan command still running after this many seconds is killed
+SCAN_TIMEOUT = 10.0
+
+# How often a running scan command is checked for timeout or cancellation
+SCAN_POLL = 0.1
+
+# nmcli --rescan: 'auto' rescans when its cached list is stale, 'no' answers from the cache
+RESCAN_MODES = ('auto', 'yes', 'no')
+
+
+class ScanCancelled(Exception):
+    """Raised when a running scan command is cancelled."""
+
+
+# One nmcli -t field: escaped characters (\: and \\) or anything but a separator
+_NMCLI_FIELD = r'((?:\\.|[^\\:])*)'
+# SSID:BSSID:SIGNAL:SECURITY:CHAN:FREQ, the fields _scan_linux asks for
+_NMCLI_LINE = re.compile(':'.join([_NMCLI_FIELD] * 5) + r':(.*)')
+_NMCLI_ESCAPE = re.compile(r'\\(.)')
+
+
+def _signal_value(signal):
+    """Signal strength as a 0-100 int ('70' from nmcli, '85%' from netsh), or None."""
+    try:
+        value = int(signal.rstrip('%'))
+    except ValueError:
+        return None
+    return 0 if value < 0 else 100 if value > 100 else value
+
+
+def _int_or_none(text):
+    try:
+        return int(text)
+    except ValueError:
+        return None
+
+
+def _or_unknown(value):
+    return "?" if value is None else value
+
+
+class AccessPoint:
+    """
+    One BSSID from a scan. `signal` (0-100) and `channel` are ints, or
+    None when the tool did not report them; `band` is None when unknown.
+    """
+    __slots__ = ('ssid', 'bssid', 'signal', 'security', 'channel', 'band')
+
+    def __init__(self, ssid, bssid, signal=None, security="Unknown", channel=None, band=None):
+        self.ssid = ssid
+        self.bssid = bssid
+        self.signal = signal
+        self.security = security
+        self.channel = channel
+        self.band = band
+
+    def __repr__(self):
+        return f"AccessPoint({self.ssid!r}, {self.bssid!r}, {self.signal}, {self.security!r}, {self.channel}, {self.band!r})"
+
+
+def parse_nmcli(lines):
+    """
+    Yields an AccessPoint per line of `nmcli -t -f SSID,BSSID,SIGNAL,SECURITY,CHAN,FREQ`
+    output (any iterable of lines, e.g. an open file). Terse mode escapes
+    ':' and '\\' inside values, so every BSSID arrives as AA\:BB\:...
+    """
+    for line in lines:
+        line = line.rstrip('\r\n')
+        # The last four fields never hold a colon and an escaped BSSID is 22
+        # characters, so most lines split without the regex
+        head, *tail = line.rsplit(':', 4)
+        if len(tail) == 4 and len(head) >= 23 and head[-23] == ':' and head[-20] == '\\':
+            ssid, bssid = head[:-23], head[-22:]
+            signal, security, channel, freq = tail
+        else:
+            match = _NMCLI_LINE.match(line)
+            if match is None:
+                continue
+            ssid, bssid, signal, security, channel, freq = match.groups()
+        if '\\' in ssid:
+            ssid = _NMCLI_ESCAPE.sub(r'\1', ssid)
+        if freq.startswith('2'):
+            band = "2.4GHz"
+        elif freq.startswith('5'):
+            band = "5GHz"
+        else:
+            band = freq or None
+        yield AccessPoint(
+            ssid, bssid.replace('\\:', ':'), _signal_value(signal),
+            # nmcli leaves SECURITY empty for open networks; netsh says "Open"
+            security or "Open", _int_or_none(channel), band
+        )
+
+
+def parse_netsh(lines):
+    """
+    Yields an AccessPoint per BSSID block of `netsh wlan show networks
+    mode=bssid` output. SSID and Authentication lines apply to every BSSID
+    listed under them; a record is yielded when the next block starts.
+    """
+    ssid = "Unknown"
+    auth = "Unknown"
+    pending = None
+    for line in lines:
+        key, sep, value = line.partition(':')
+        if not sep:
+            continue
+        key = key.strip()
+        value = value.strip()
+
+        if key.startswith("BSSID"):
+            if pending is not None:
+                yield pending
+            pending = AccessPoint(ssid, value or "Unknown", security=auth)
+        elif key.startswith("SSID"):
+            # New SSID block implies end of previous BSSIDs
+            if pending is not None:
+                yield pending
+                pending = None
+            ssid = value or "Hidden Network"
+            auth = "Unknown"
+        elif key == "Authentication":
+            auth = value
+        elif pending is None:
+            continue
+        elif key == "Signal":
+            pending.signal = _signal_value(value)
+        elif key == "Channel":
+            pending.channel = _int_or_none(value)
+        elif key == "Radio type":
+            pending.band = value
+        elif key == "Band":
+            # Newer Windows builds list the band itself after the radio type
+            pending.band = value
+    if pending is not None:
+        yield pending
+
+
+def detect_format(line):
+    """'netsh' or 'nmcli' for the first non-blank line of a saved scan."""
+    return 'netsh' if ' : ' in line or line.startswith('There are') else 'nmcli'
+
 
 class SpectralScanner:
+    """
+    WiFi scan through the OS tool (netsh on Windows, nmcli on Linux). The
+    command runs as a child process polled against `timeout` and the
+    optional `cancel` event, and is killed on either (or Ctrl+C), so a
+    hung radio never blocks the caller. `rescan='no'` makes nmcli answer
+    from its cached list in well under a second instead of rescanning;
+    netsh always answers from the cache.
+    """
+
+    def __init__(self, timeout=SCAN_TIMEOUT, rescan='auto', cancel=None):
+        self.timeout = timeout
+        self.rescan = rescan
+        self.cancel = cancel          # threading.Event, e.g. a shell job's
+        self.last_duration = None     # seconds taken by the last scan command
+        self._warned_wsl = False
+
     def scan(self):
         PhantomUI.section("Spectral Protocol Initiated: WiFi Scan")
-        
+
+        networks = self.snapshot()
+        if networks is None:
+            return
+        for network in networks:
+            self._report_network(network)
+        if not networks:
+            PhantomUI.info("No networks found. Ensure WiFi is enabled.")
+        PhantomUI.info(f"Scan took {self.last_duration:.2f}s ({len(networks)} BSSIDs).")
+
+    def snapshot(self):
+        """
+        One scan as a list of AccessPoint records, or None if the scan
+        could not run (the reason has been printed).
+        """
         os_type = platform.system()
-        
+        self.last_duration = None
+
         if os_type == "Windows":
-            self._scan_windows()
+            return self._scan_windows()
         elif os_type == "Linux":
-            self._scan_linux()
+            return self._scan_linux()
         else:
             PhantomUI.alert(f"Unsupported OS: {os_type}")
+            return None
+
+    def _run(self, cmd):
+        """
+        Runs a scan command and returns its stdout. Raises
+        subprocess.TimeoutExpired, ScanCancelled or CalledProcessError; the
+        child is killed on any of them, and on Ctrl+C.
+        """
+        started = time.monotonic()
+        deadline = started + self.timeout
+        # Own process group on POSIX, so a kill also reaches anything the tool spawned
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+                                start_new_session=os.name == 'posix')
+        try:
+            while True:
+                try:
+                    stdout, stderr = proc.communicate(timeout=SCAN_POLL)
+                    break
+                except subprocess.TimeoutExpired:
+                    if self.cancel is not None and self.cancel.is_set():
+                        raise ScanCancelled()
+                    if time.monotonic() >= deadline:
+                        raise subprocess.TimeoutExpired(cmd, self.timeout)
+        finally:
+            if proc.returncode is None:
+                try:
+                    if os.name == 'posix':
+                        os.killpg(proc.pid, signal.SIGKILL)
+                    else:
+                        proc.kill()
+                except ProcessLookupError:
+                    pass
+                proc.communicate()
+            self.last_duration = time.monotonic() - started
+        if proc.returncode:
+            raise subprocess.CalledProcessError(proc.returncode, cmd, stdout, stderr)
+        return stdout
+
+    def _run_failed(self, error):
+        """Prints why a scan command failed; returns None for the snapshot."""
+        if isinstance(error, subprocess.TimeoutExpired):
+            PhantomUI.alert(f"WiFi scan timed out after {self.timeout:g}s.")
+        elif isinstance(error, ScanCancelled):
+            PhantomUI.info("WiFi scan cancelled.")
+        else:
+            PhantomUI.alert("Failed to execute WiFi scan.")
+        return None
+
+    def replay(self, path):
+        """Reports the networks in a saved nmcli -t or netsh scan, streamed from disk."""
+        PhantomUI.section(f"Spectral Replay: {path}")
+        started = time.perf_counter()
+        count = 0
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            first = ''
+            for first in f:
+                if first.strip():
+                    break
+            parse = parse_netsh if detect_format(first) == 'netsh' else parse_nmcli
+            for network in parse(itertools.chain((first,), f)):
+                self._report_network(network)
+                count += 1
+        PhantomUI.info(f"Replayed {count} BSSIDs in {time.perf_counter() - started:.2f}s.")
+
+    def _report_network(self, ap):
+        # Open and WEP networks are the ones worth flagging
+        severity = 'medium' if ("Open" in ap.security or "WEP" in ap.security) else 'info'
+        PhantomUI.report(Finding(
+            'spectral', 'wifi_network', ap.bssid, ap.ssid, ap.security, severity=severity,
+            ssid=ap.ssid, bssid=ap.bssid, signal=ap.signal, security=ap.security, channel=ap.channel, band=ap.band
+        ))
 
     def _scan_windows(self):
         try:
             # We use 'netsh wlan show networks mode=bssid' to see all neighbors
-            result = subprocess.run(
-                ['netsh', 'wlan', 'show', 'networks', 'mode=bssid'],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            self._parse_netsh(result.stdout)
+            output = self._run(['netsh', 'wlan', 'show', 'networks', 'mode=bssid'])
+            return list(parse_netsh(output.splitlines()))
             
-        except subprocess.CalledProcessError:
-             PhantomUI.alert("Failed to execute WiFi scan.")
+        except (subprocess.SubprocessError, ScanCancelled) as e:
+             return self._run_failed(e)
         except Exception as e:
              PhantomUI.alert(f"Spectral Error: {e}")
+        return None
 
     def _scan_linux(self):
         # Check for WSL
@@ -42,7 +290,8 @@ class SpectralScanner:
         except:
             pass
 
-        if is_wsl:
+        if is_wsl and not self._warned_wsl:
+            self._warned_wsl = True
             PhantomUI.alert("WSL Environment Detected!")
             PhantomUI.info("WSL is a Virtual Machine and cannot access physical WiFi cards directly.")
             PhantomUI.info("Scanning will fail unless you use USB Passthrough (usbipd).")
@@ -51,195 +300,167 @@ class SpectralScanner:
         # Check for nmcli
         if not shutil.which("nmcli"):
             PhantomUI.alert("nmcli (NetworkManager) not found. Cannot scan.")
-            return
+            return None
 
         try:
             # -t: Terse (colon separated)
             # -f: Fields
-            cmd = ['nmcli', '-t', '-f', 'SSID,BSSID,SIGNAL,SECURITY,CHAN,FREQ', 'dev', 'wifi']
-            
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                check=True
-            )
+            # --rescan no: list what NetworkManager already knows instead of waiting on the radio
+            cmd = ['nmcli', '-t', '-f', 'SSID,BSSID,SIGNAL,SECURITY,CHAN,FREQ',
+                   'dev', 'wifi', 'list', '--rescan', self.rescan]
             
-            lines = result.stdout.strip().split('\n')
-            found = False
-            
-            for line in lines:
-                if not line: continue
-                # SSID:BSSID:SIGNAL:SECURITY:CHAN:FREQ
-                # NOTE: SSID might contain colons, but usually nmcli escapes or handles it.
-                # simpler split for now.
-                parts = line.split(':')
-                # We expect at least 6 parts, but SSID could have colons. 
-                # nmcli terse mode usually escapes colons with backslash.
-                # For robust parsing we'd need a complex regex. 
-                # For this MVP, let's assume standard SSIDs or grab from back.
-                
-                # However, nmcli output is strictly ordered by fields.
-                # If we assume SSID is parts[0], BSSID is parts[1]... this fails if SSID has colon.
-                # Proper way: nmcli escapes ':' as '\:'.
-                
-                # Let's try to map generic columns.
-                # If we assume BSSID format xx:xx:xx:xx:xx:xx (5 colons).
-                
-                # Let's just do a simple split and hope. Or use a cleaner library?
-                # No external libs allowed besides requirements.txt.
-                
-                # Let's rely on standard split for now.
-                # SSID, BSSID, SIGNAL, SECURITY, CHAN, FREQ
-                
-                # BSSID is index 1? No, SSID is index 0.
-                
-                # A trick: use different delimiter if possible? nmcli doesn't support custom delim easily in -t mode.
-                # Actually, we can just print it raw? No, we need UI formatting.
-                
-                # Let's assume SSID is everything before the BSSID pattern?
-                # BSSID is 17 chars long usually.
-                
-                # Let's keep it simple:
-                # parts[0] = SSID
-                # ...
-                
-                # Re-constructing based on fields requested: SSID,BSSID,SIGNAL,SECURITY,CHAN,FREQ
-                # But BSSID itself has colons! 00:11:22...
-                # So splitting by ':' is dangerous for BSSID.
-                
-                # Better approach: Don't use -t. Use table and fixed width? Hard to parse.
-                # Better: nmcli -g (get) ?
-                
-                # Alternative: iwlist? "sudo iwlist scan" -> needs sudo.
-                
-                # Let's stick to nmcli but be careful.
-                # In terse mode, BSSID colons are escaped as \:
-                # wait, really? Let's check docs. 
-                # "Colons in values are escaped with backslash"
-                
-                # So we can split by `(?<!\\):` (negative lookbehind)
-                
-                import re
-                # pattern: colon not preceded by backslash
-                parts = re.split(r'(?<!\\):', line)
-                
-                # Unescape parts
-                parts = [p.replace(r'\:', ':') for p in parts]
-                
-                if len(parts) >= 6:
-                    ssid = parts[0]
-                    bssid = parts[1]
-                    sig = parts[2]
-                    sec = parts[3]
-                    chan = parts[4]
-                    freq = parts[5] # Band hint
-                    
-                    band = "2.4GHz" if freq.startswith("2") else "5GHz" if freq.startswith("5") else freq
-                    
-                    PhantomUI.wifi_entry(ssid, bssid, sig, sec, chan, band)
-                    found = True
-            
-            if not found:
-                PhantomUI.info("No networks found.")
+            output = self._run(cmd)
+            return list(parse_nmcli(output.splitlines()))
 
+        except (subprocess.SubprocessError, ScanCancelled) as e:
+            return self._run_failed(e)
         except Exception as e:
             PhantomUI.alert(f"Linux Scan Error: {e}")
+        return None
 
-    def _parse_netsh(self, output):
-        """
-        Parses the raw text output from netsh into structured data.
-        Buffering approach to handle field ordering.
-        """
-        lines = output.split('\n')
-        
-        # State
-        current_ssid = "Unknown"
-        current_auth = "Unknown" # Auth is usually per SSID in netsh output
-        
-        # Pending BSSID data
-        pending_entry = None
-
-        def flush():
-            nonlocal pending_entry
-            if pending_entry:
-                # We have a BSSID to print
-                PhantomUI.wifi_entry(
-                   ssid=pending_entry.get('ssid', 'Unknown'),
-                   bssid=pending_entry.get('bssid', 'Unknown'),
-                   signal=pending_entry.get('signal', '?'),
-                   security=pending_entry.get('auth', 'Unknown'),
-                   channel=pending_entry.get('channel', '?'),
-                   band=pending_entry.get('band', '?')
-                )
-                pending_entry = None
-                return True
-            return False
-
-        found_any = False
-        
-        for line in lines:
-            line = line.strip()
-            
-            if line.startswith("SSID"):
-                # New SSID block implies end of previous BSSIDs
-                if flush(): found_any = True
-                
-                parts = line.split(":", 1)
-                if len(parts) > 1:
-                    val = parts[1].strip()
-                    if val:
-                        current_ssid = val
-                    else:
-                        current_ssid = "Hidden Network"
-                current_auth = "Unknown" # Reset until found
-
-            elif line.startswith("Authentication"):
-                parts = line.split(":", 1)
-                if len(parts) > 1:
-                    current_auth = parts[1].strip()
-                    # If we have a pending entry that belongs to this SSID (rare in netsh structure, 
-                    # usually Auth is above BSSID), update it.
-                    # Actually Auth is under SSID, BSSID is under SSID. 
-                    # So Auth applies to all subsequent BSSIDs until new SSID.
-
-            elif line.startswith("BSSID"):
-                # New BSSID block
-                if flush(): found_any = True
-                
-                parts = line.split(":", 1)
-                if len(parts) > 1:
-                    bssid_val = parts[1].strip()
+
+class SignalHistory:
+    """
+    One BSSID under watch: its last `size` signal samples in a fixed ring
+    buffer (one byte each), and the attributes and signal last reported.
+    """
+    __slots__ = ('ssid', 'security', 'channel', 'band', 'samples', 'next', 'count', 'reported', 'missed')
+
+    def __init__(self, size, ssid, security, channel, band):
+        self.ssid = ssid
+        self.security = security
+        self.channel = channel
+        self.band = band
+        self.samples = array('B', bytes(size))
+        self.next = 0
+        self.count = 0
+        self.reported = None    # signal at the last event
+        self.missed = 0         # consecutive polls without this BSSID
+
+    def add(self, signal):
+        self.samples[self.next] = signal
+        self.next = (self.next + 1) % len(self.samples)
+        if self.count < len(self.samples):
+            self.count += 1
+
+    def summary(self):
+        values = self.samples[:self.count] if self.count < len(self.samples) else self.samples
+        if not values:
+            return "no samples"
+        return f"avg {sum(values) / len(values):.0f}%, min {min(values)}%, max {max(values)}% over {len(values)} samples"
+
+
+class SpectralMonitor:
+    """
+    Site-survey mode: polls a SpectralScanner every `interval` seconds and
+    reports only events. A BSSID appears, disappears after `grace` polls
+    without it (so one missed scan does not flap), or changes SSID,
+    security or channel, or its signal moves `delta` points from the value
+    last reported. Work per poll is linear in the BSSIDs in range, and an
+    entry (with its ring of `history` samples) is dropped when its BSSID
+    disappears, so CPU and memory stay flat over long runs.
+    """
+
+    def __init__(self, scanner=None, interval=5.0, history=60, delta=15, grace=2):
+        self.scanner = scanner or SpectralScanner()
+        self.interval = interval
+        self.history = history
+        self.delta = delta
+        self.grace = grace
+
+        self.entries = {}    # bssid -> SignalHistory
+        self.polls = 0
+        self.failures = 0
+        self.scan_seconds = 0.0
+        self.slowest = 0.0
+
+    def watch(self, polls=0):
+        """Polls until interrupted, or `polls` times if given."""
+        PhantomUI.section(f"Spectral Watch: every {self.interval:g}s (Ctrl+C to stop)")
+        next_poll = time.monotonic()
+        try:
+            while not polls or self.polls < polls:
+                networks = self.scanner.snapshot()
+                self.polls += 1
+                if self.scanner.last_duration is not None:
+                    self.scan_seconds += self.scanner.last_duration
+                    self.slowest = max(self.slowest, self.scanner.last_duration)
+                if networks is None:
+                    self.failures += 1
                 else:
-                    bssid_val = "Unknown"
-                
-                # Start new entry
-                pending_entry = {
-                    'ssid': current_ssid,
-                    'auth': current_auth,
-                    'bssid': bssid_val,
-                    'channel': '?',
-                    'band': '?',
-                    'signal': '?'
-                }
-
-            elif line.startswith("Signal"):
-                parts = line.split(":", 1)
-                if len(parts) > 1 and pending_entry:
-                    pending_entry['signal'] = parts[1].strip()
-
-            elif line.startswith("Channel") and "Utilization" not in line:
-                parts = line.split(":", 1)
-                if len(parts) > 1 and pending_entry:
-                    pending_entry['channel'] = parts[1].strip()
-
-            elif line.startswith("Radio type"):
-                 parts = line.split(":", 1)
-                 if len(parts) > 1 and pending_entry:
-                    pending_entry['band'] = parts[1].strip()
-        
-        # Final flush
-        if flush(): found_any = True
-
-        if not found_any:
-            PhantomUI.info("No networks found. Ensure WiFi is enabled.")
+                    self.update(networks)
+                PhantomUI.flush()
+
+                if polls and self.polls >= polls:
+                    break
+                next_poll += self.interval
+                delay = next_poll - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    # A slow scan overran the interval: poll again now, without catching up
+                    next_poll = time.monotonic()
+        except KeyboardInterrupt:
+            pass
+
+        PhantomUI.info(f"Watch stopped after {self.polls} polls ({self.failures} failed), "
+                       f"{len(self.entries)} BSSIDs in range.")
+        if self.polls:
+            PhantomUI.info(f"Scans took {self.scan_seconds / self.polls:.2f}s on average, "
+                           f"{self.slowest:.2f}s at most.")
+
+    def update(self, networks):
+        now = time.time()
+        seen = set()
+        for ap in networks:
+            bssid = ap.bssid
+            if bssid in seen:
+                continue
+            seen.add(bssid)
+            value = ap.signal
+
+            entry = self.entries.get(bssid)
+            if entry is None:
+                entry = SignalHistory(self.history, ap.ssid, ap.security, ap.channel, ap.band)
+                self.entries[bssid] = entry
+                if value is not None:
+                    entry.add(value)
+                entry.reported = value
+                self._event('appear', bssid, entry, now,
+                            f"{_or_unknown(value)}% | Ch: {_or_unknown(ap.channel)} | {ap.security}")
+                continue
+
+            entry.missed = 0
+            if value is not None:
+                entry.add(value)
+
+            changes = []
+            for field, new in (('ssid', ap.ssid), ('security', ap.security), ('channel', ap.channel)):
+                old = getattr(entry, field)
+                if new != old:
+                    changes.append(f"{field} {old} -> {new}")
+                    setattr(entry, field, new)
+            if value is not None and entry.reported is not None and abs(value - entry.reported) >= self.delta:
+                changes.append(f"signal {entry.reported}% -> {value}% ({entry.summary()})")
+                entry.reported = value
+            elif value is not None and entry.reported is None:
+                entry.reported = value
+            if changes:
+                self._event('change', bssid, entry, now, "; ".join(changes))
+
+        for bssid in [b for b in self.entries if b not in seen]:
+            entry = self.entries[bssid]
+            entry.missed += 1
+            if entry.missed >= self.grace:
+                del self.entries[bssid]
+                self._event('disappear', bssid, entry, now, f"last seen {entry.summary()}")
+
+    def _event(self, event, bssid, entry, now, detail):
+        # Open/WEP networks coming into range are the ones worth flagging
+        risky = "Open" in entry.security or "WEP" in entry.security
+        severity = 'medium' if risky and event != 'disappear' else 'info'
+        PhantomUI.report(Finding(
+            'spectral', 'wifi_event', bssid, entry.ssid, detail, severity=severity,
+            event=event, time=round(now, 3), signal=entry.reported, security=entry.security,
+            channel=entry.channel, band=entry.band
+        ))
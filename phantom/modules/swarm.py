@@ -0,0 +1,120 @@
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urlparse
+from phantom.utils.ui import PhantomUI
+
+
+def read_targets(source):
+    """
+    Yields target URLs from a hosts file, or stdin when source is '-'.
+    Blank lines and '#' comments are skipped; bare hostnames get https://.
+    """
+    stream = sys.stdin if source == '-' else open(source, 'r')
+    try:
+        for line in stream:
+            target = line.strip()
+            if not target or target.startswith('#'):
+                continue
+            if '://' not in target:
+                target = 'https://' + target
+            yield target
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+class SwarmRunner:
+    """
+    Runs a WraithAnalyzer over many targets through a worker pool.
+
+    At most `workers` targets run at once overall and at most `per_host` per
+    host. Each target's output is captured and printed as one block the
+    moment it finishes, so results stream in completion order.
+    """
+
+    def __init__(self, analyzer, workers=16, per_host=2):
+        self.analyzer = analyzer
+        self.workers = workers
+        self.per_host = per_host
+
+        self.completed = 0
+        self.failed = 0
+
+    def run(self, targets, flags):
+        targets = iter(targets)
+        deferred = deque()   # targets waiting on a busy host
+        active = {}          # host -> running count
+        running = {}         # future -> (target, host)
+        exhausted = False
+        started = time.time()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while True:
+                # Fill free worker slots, skipping hosts that are at their limit
+                skipped = 0
+                while len(running) < self.workers and skipped < len(deferred):
+                    target = deferred.popleft()
+                    if not self._submit(executor, target, flags, active, running):
+                        deferred.append(target)
+                        skipped += 1
+
+                while len(running) < self.workers and not exhausted:
+                    target = next(targets, None)
+                    if target is None:
+                        exhausted = True
+                    elif not self._submit(executor, target, flags, active, running):
+                        deferred.append(target)
+                        # Stop reading ahead once plenty of targets are parked
+                        if len(deferred) >= self.workers * 4:
+                            break
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    target, host = running.pop(future)
+                    active[host] -= 1
+                    if not active[host]:
+                        del active[host]
+                    self._flush(target, future)
+
+        self._summary(time.time() - started)
+
+    def _submit(self, executor, target, flags, active, running):
+        host = urlparse(target).netloc.lower()
+        if active.get(host, 0) >= self.per_host:
+            return False
+        active[host] = active.get(host, 0) + 1
+        running[executor.submit(self._run_one, target, flags)] = (target, host)
+        return True
+
+    def _run_one(self, target, flags):
+        with PhantomUI.capture() as lines:
+            reached = self.analyzer.analyze(target, flags, summary=False)
+        return reached, lines
+
+    def _flush(self, target, future):
+        # A target that could not be fetched is reported by analyze() as an
+        # error finding rather than raised, so both count as failed
+        try:
+            reached, lines = future.result()
+        except Exception as e:
+            reached = False
+            lines = [f"{PhantomUI.ALERT_RED}[!] CRITICAL: {target} aborted: {e}{PhantomUI.RESET}"]
+        if reached:
+            self.completed += 1
+        else:
+            self.failed += 1
+        PhantomUI.write("\n".join(lines))
+
+    def _summary(self, elapsed):
+        PhantomUI.section("Swarm Summary")
+        PhantomUI.data("Targets Completed", self.completed)
+        PhantomUI.data("Targets Failed", self.failed)
+        PhantomUI.data("Elapsed", f"{elapsed:.1f}s")
+        if elapsed > 0:
+            PhantomUI.data("Throughput", f"{self.completed / elapsed:.2f} targets/s")
+        self.analyzer.report_pool()
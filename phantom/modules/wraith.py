@@ -1,13 +1,91 @@
-import requests
 import re
 import json
 import os
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
+import codecs
+import hashlib
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
 from phantom.utils.ui import PhantomUI
+from phantom.utils.findings import Finding
+from phantom.utils.http import HttpPool
+from phantom.utils.html import HtmlDocument, LinkExtractor, parse_html
+from phantom.utils.scheduler import TaskGraph, DependencyError, TaskCancelled
+from phantom.utils.cvedb import CveIndex
+from phantom.utils.store import open_index
+from phantom.modules.arachnid import ArachnidCrawler
+from phantom.modules.hunter import SecretMatcher
+from phantom.modules.entropy import EntropyScanner, RULE_NAMES as ENTROPY_RULES
+from phantom.modules.assets import AssetFetcher, scoped_urls
+from phantom.utils.sitemap import SitemapReader, parse_robots
+from phantom.utils.state import Baseline, FetchLog, UrlState
+
+# Regex patterns for API endpoints
+VORTEX_PATTERNS = [
+    re.compile(r'/api/v\d+/'),
+    re.compile(r'/graphql'),
+    re.compile(r'/swagger'),
+    re.compile(r'\.json')
+]
+
+def _link_group(finding):
+    """First path segment of a link, e.g. '/docs/' for /docs/a/b.html."""
+    parts = urlparse(finding.value).path.lstrip('/').split('/', 1)
+    return f"/{parts[0]}/" if len(parts) > 1 else "/"
+
+
+class RobotsTxt:
+    __slots__ = ('url', 'status', 'disallowed', 'sitemaps')
+
+    def __init__(self, url, status):
+        self.url = url
+        self.status = status
+        self.disallowed = []
+        self.sitemaps = []
+
+
+def _secret_severity(name):
+    # Entropy hits are likelier to be hashes or IDs than a rule match is to be noise
+    return 'medium' if name in ENTROPY_RULES.values() else 'high'
+
+
+# Fields that identify a finding when diffing runs (offsets, counts etc. may move)
+FINDING_IDENTITY = ('module', 'kind', 'target', 'title', 'value')
+
+# Selectable modules, in the order they are planned
+MODULES = ('spider', 'vortex', 'hunter', 'assets', 'droid')
+
+# Conditional requests in flight while an incremental run revalidates known URLs
+REVALIDATE_WORKERS = 8
+
 
 class WraithAnalyzer:
-    def __init__(self):
+    def __init__(self, pool=None, state=None):
+        # Shared keep-alive client; pass one in to reuse connections across runs
+        self.pool = pool or HttpPool()
+
+        # StateStore for -incremental runs: targets with no changed URL are skipped
+        self.state = state
+        self.changes = {'new': 0, 'changed': 0, 'unchanged': 0, 'removed': 0}
+        self._changes_lock = threading.Lock()
+
+        # Prefer the compiled, memory-mapped index from `phantom db build`,
+        # unless its sources changed since it was built
+        store, stale = open_index()
+        if store is not None:
+            self.cve_index = store
+            self.secrets_db = store.secrets()
+        else:
+            if stale:
+                PhantomUI.alert(f"Index out of date ({', '.join(stale)}); using the JSON files. Run `phantom db build` to refresh it.")
+            self._load_json_sources()
+
+        # Compile the secrets pack once per analyzer, not once per scan; the
+        # entropy detector catches random-looking tokens no rule describes
+        self.hunter = SecretMatcher(self.secrets_db, entropy=EntropyScanner())
+
+    def _load_json_sources(self):
         # Resolve paths relative to this file's package location
         base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         
@@ -16,10 +94,10 @@ class WraithAnalyzer:
         
         try:
             with open(cve_path, 'r') as f:
-                self.cve_db = json.load(f)
+                cve_db = json.load(f)
         except FileNotFoundError:
             # Fallback for dev environment or missing file
-            self.cve_db = {}
+            cve_db = {}
             # Only alert if critical
             # PhantomUI.alert("CVE Database not found.")
 
@@ -29,37 +107,406 @@ class WraithAnalyzer:
         except FileNotFoundError:
              self.secrets_db = {}
 
-    def analyze(self, url, flags):
+        # Product -> version/range index over the CVE data
+        self.cve_index = CveIndex(cve_db)
+
+    def analyze(self, url, flags, summary=True, cancel=None):
+        """
+        Runs the selected modules; returns False if the target could not be fetched.
+        Setting `cancel` (a threading.Event, e.g. a shell job's) stops modules that
+        have not started and the spider's crawl; fetches already in flight finish.
+        """
         PhantomUI.section(f"Wraith Protocol Initiated: {url}")
-        
+        PhantomUI.info("Fetching target...")
+
+        if self.state is not None:
+            reached = self._analyze_incremental(url, flags, cancel)
+        else:
+            reached = self._run(url, flags, cancel=cancel)
+
+        if summary:
+            self.report_pool()
+        return reached
+
+    def _run(self, url, flags, pool=None, baseline=None, cancel=None):
+        graph = self._plan(url, flags, pool or self.pool, baseline, cancel)
+        futures = graph.run()
+
+        # Release the streamed connection back to the pool (no response: the
+        # page was unchanged since the last incremental run)
+        response = futures.get('response')
+        reached = response is None or response.exception() is None
+        if response is not None and reached:
+            response.result().close()
+
+        for name, future in futures.items():
+            error = future.exception()
+            if error is None or isinstance(error, (DependencyError, TaskCancelled)):
+                continue
+            if name in ('response', 'text'):
+                title = "Connection Failed"
+            else:
+                title = f"{name.capitalize()} Error"
+            PhantomUI.report(Finding(name, 'error', url, title, str(error), severity='error'))
+        return reached
+
+    def _profile(self, flags):
+        """Which modules run (and how far the spider goes): runs only diff against the same profile."""
+        names = [name for name in MODULES if flags.get(name) or flags.get('complete')]
+        if 'spider' in names:
+            names.append(f"depth={flags.get('depth', 2)}/pages={flags.get('max_pages', 500)}")
+        return ','.join(names)
+
+    def _count(self, change, n=1):
+        with self._changes_lock:
+            self.changes[change] += n
+
+    def _analyze_incremental(self, url, flags, cancel=None):
+        """
+        Revalidates every URL the last run of this target fetched (the page,
+        crawled pages, robots.txt, sitemaps, script bundles) with conditional
+        requests, and skips the target if none changed. Otherwise the modules
+        run again, but only changed and new URLs are downloaded and scanned:
+        unchanged pages are crawled through their stored links, unchanged
+        robots.txt and sitemaps through their stored entries, and the landing
+        page and bundles, if unchanged, keep their findings. The URLs and
+        findings added, changed or removed since the last run are reported.
+        """
+        profile = self._profile(flags)
+        previous = self.state.get(url, profile)
+        known = self.state.urls(url, profile) if previous else {}
+
+        unchanged = self._revalidate(known) if known else {}
+        if known and len(unchanged) == len(known):
+            self.state.put_urls(url, profile, unchanged)
+            self._count('unchanged', len(known))
+            PhantomUI.info(f"Unchanged since last run ({len(known)} URLs revalidated), skipped.")
+            return True
+
+        # Module text is dropped; the diff below is the output
+        log = FetchLog(self.pool)
+        baseline = Baseline(log, unchanged, previous.findings if previous else [])
+        findings = []
+        with PhantomUI.capture([]), PhantomUI.collect(findings):
+            reached = self._run(url, flags, pool=log, baseline=baseline, cancel=cancel)
+
+        errors = [f for f in findings if f.kind == 'error']
+        for finding in errors:
+            PhantomUI.report(finding)
+        if errors:
+            # Incomplete scan: keep the old baseline
+            return reached
+
+        page = log.fetched.get(url)
+        if page is not None and page.status in (404, 410):
+            if previous:
+                self.state.delete(url, profile)
+                self._count('removed', len(known))
+                PhantomUI.info(f"Page removed ({page.status}).")
+                self._report_diff([], previous.findings, [('removed', u) for u in known])
+            else:
+                PhantomUI.info(f"Page not found ({page.status}).")
+            return True
+
+        fetched = log.urls()
+        urls = []
+        for u, state in fetched.items():
+            old = known.get(u)
+            if state.status != 200:
+                continue
+            if old is None or old.status != 200:
+                urls.append(('new', u))
+            elif old.digest != state.digest:
+                urls.append(('changed', u))
+        urls.extend(('removed', u) for u, old in known.items()
+                    if old.status == 200 and getattr(fetched.get(u), 'status', None) != 200)
+        for change, _ in urls:
+            self._count(change)
+        live = sum(1 for state in fetched.values() if state.status == 200)
+        self._count('unchanged', live - sum(1 for change, _ in urls if change != 'removed'))
+
+        current = [f.to_dict() for f in findings]
+        self._report_diff(current, previous.findings if previous else [], urls)
+        page = fetched.get(url) or UrlState(None, None, None, None)
+        self.state.put(url, profile, page.etag, page.last_modified, page.digest, current)
+        self.state.put_urls(url, profile, fetched)
+        return True
+
+    def _revalidate(self, known):
+        """Conditional GET of every known URL; returns {url: UrlState} for those unchanged."""
+        def check(item):
+            u, old = item
+            try:
+                res = self.pool.get(u, stream=True, headers=self.state.conditional_headers(old))
+            except Exception:
+                return u, None
+            try:
+                etag = res.headers.get('ETag') or old.etag
+                last_modified = res.headers.get('Last-Modified') or old.last_modified
+                if res.status_code == 304:
+                    return u, UrlState(old.status, etag, last_modified, old.digest, old.data)
+                # No validators, or the server ignores them: compare bodies
+                if res.status_code == old.status and hashlib.sha256(res.content).hexdigest() == old.digest:
+                    return u, UrlState(old.status, etag, last_modified, old.digest, old.data)
+                return u, None
+            finally:
+                res.close()
+
+        with ThreadPoolExecutor(max_workers=REVALIDATE_WORKERS) as executor:
+            return {u: state for u, state in executor.map(check, known.items()) if state is not None}
+
+    def _report_diff(self, current, previous, urls=()):
+        """
+        Reports the URLs new, changed or removed since the previous run, then
+        the findings added and removed (as multisets).
+        """
+        def identity(record):
+            return tuple(record.get(field) for field in FINDING_IDENTITY)
+
+        old = Counter(identity(record) for record in previous)
+        new = Counter(identity(record) for record in current)
+        added = new - old
+        removed = old - new
+        added_count, removed_count = sum(added.values()), sum(removed.values())
+
+        PhantomUI.section("Incremental Diff")
+        signs = {'new': ('+', PhantomUI.NEON_GREEN), 'changed': ('~', PhantomUI.NEON_PURPLE),
+                 'removed': ('-', PhantomUI.ALERT_RED)}
+        for change, u in urls:
+            if PhantomUI.structured():
+                PhantomUI.report(Finding('incremental', 'url', u, f"URL {change}", u, change=change))
+            else:
+                sign, color = signs[change]
+                PhantomUI.write(f"  {color}{sign} URL {change}: {u}{PhantomUI.RESET}")
+
+        for change, records, pending, sign, color in (
+            ('added', current, added, '+', PhantomUI.NEON_GREEN),
+            ('removed', previous, removed, '-', PhantomUI.ALERT_RED)
+        ):
+            for record in records:
+                key = identity(record)
+                if not pending[key]:
+                    continue
+                pending[key] -= 1
+                if PhantomUI.structured():
+                    fields = dict(record, change=change)
+                    PhantomUI.report(Finding(**fields))
+                else:
+                    PhantomUI.write(
+                        f"  {color}{sign} [{record['module']}] {record['title']}: {record['value']}{PhantomUI.RESET}"
+                    )
+
+        if added_count or removed_count:
+            PhantomUI.data("Findings Added", added_count)
+            PhantomUI.data("Findings Removed", removed_count)
+        else:
+            PhantomUI.info("Content changed, findings did not.")
+
+    def _plan(self, url, flags, pool, baseline=None, cancel=None):
+        """
+        Declares what each selected module needs (response headers, full text,
+        parsed document, or nothing but the URL) so the scheduler can start it
+        the moment those inputs exist. Droid's robots.txt fetch starts at once,
+        alongside the target fetch; with the spider on, its Sitemap: entries
+        also seed the crawl. Every fetch goes through `pool`; `baseline`
+        (incremental runs) supplies what is unchanged since the last run;
+        `cancel` stops the graph and the crawl.
+        """
+        def selected(flag):
+            return bool(flags.get(flag) or flags.get('complete'))
+
+        spider, vortex, hunter = selected('spider'), selected('vortex'), selected('hunter')
+        assets, droid = selected('assets'), selected('droid')
+        parser = flags.get('parser', 'auto')
+
+        graph = TaskGraph(cancel)
+
+        landing = baseline.get(url) if baseline is not None else None
+        if landing is not None and landing.status == 200 and (
+                not (spider or assets) or (landing.data and 'links' in landing.data)):
+            self._plan_unchanged(graph, url, flags, pool, baseline, landing, cancel)
+            return graph
+
+        # Inputs. The body is streamed: headers are enough for Spectrum, and when
+        # no module needs the full text, Hunter scans chunks as they arrive.
+        # A streamed response holds one of the host's concurrency slots until
+        # its body is read or closed, so with no module reading it, it is closed now
+        need_text = spider or vortex
+        reads_body = need_text or hunter or assets
+        graph.add('response', lambda: self._fetch_target(pool, url, reads_body))
+        if need_text:
+            graph.add('text', lambda res: res.text, needs=('response',))
+        if spider or (assets and need_text):
+            # Parsing is deferred to the modules that need markup structure
+            graph.add('doc', lambda text: self._parse_page(url, text, parser, baseline), needs=('text',))
+        if droid:
+            graph.add('robots', lambda: self._fetch_robots(url, pool, baseline))
+
+        # Modules, in report order
+        graph.add('spectrum', lambda res: self._scan_spectrum(url, res), needs=('response',), report=True)
+
+        self._plan_arachnid(graph, url, flags, pool, baseline, cancel, spider, droid)
+
+        if vortex:
+            graph.add('vortex', lambda text: self._scan_vortex(url, text, flags), needs=('text',), report=True)
+
+        # Without a parsed page, script srcs are extracted from the streamed chunks
+        collector = LinkExtractor() if assets and not need_text else None
+
+        if hunter:
+            if need_text:
+                graph.add('hunter', lambda text: self._scan_hunter(url, [text]), needs=('text',), report=True)
+            else:
+                graph.add(
+                    'hunter',
+                    lambda res: self._scan_hunter(url, self._feed(self._iter_text(res), collector)),
+                    needs=('response',), report=True
+                )
+
+        if assets:
+            if need_text:
+                self._plan_assets(graph, url, flags, pool, baseline, spider)
+            else:
+                if not hunter:
+                    graph.add('hunter', lambda res: self._drain(self._feed(self._iter_text(res), collector)),
+                              needs=('response',))
+
+                def scan_collected(_):
+                    self._note_page(baseline, url, url, collector.links, collector.scripts)
+                    self._scan_assets(url, collector.scripts, flags, pool, baseline)
+                graph.add('assets', scan_collected, needs=('hunter',), report=True)
+
+        self._plan_droid(graph, url, flags, pool, baseline, spider, droid)
+        return graph
+
+    def _plan_unchanged(self, graph, url, flags, pool, baseline, landing, cancel):
+        """
+        Incremental run, landing page unchanged: it is not fetched again. Its
+        header and text scans replay their findings, and the spider and asset
+        stage start from its stored links and scripts.
+        """
+        def selected(flag):
+            return bool(flags.get(flag) or flags.get('complete'))
+
+        def replay(module, title):
+            # Disabled-rule notices belong to the run whose scan tripped them
+            graph.add(module, lambda: self._replay(baseline, title, lambda r: (
+                r['module'] == module and r['target'] == url and r['kind'] != 'rule_disabled'
+            )), report=True)
+
+        spider, vortex, hunter = selected('spider'), selected('vortex'), selected('hunter')
+        assets, droid = selected('assets'), selected('droid')
+        baseline.keep(url, landing)
+        if spider or assets:
+            data = landing.data
+            graph.add('doc', lambda: HtmlDocument(None, data['links'], data['scripts']))
+        if droid:
+            graph.add('robots', lambda: self._fetch_robots(url, pool, baseline))
+
+        replay('spectrum', "Spectrum Analysis (Headers)")
+        self._plan_arachnid(graph, url, flags, pool, baseline, cancel, spider, droid)
+        if vortex:
+            replay('vortex', "Vortex Module (API Discovery)")
+        if hunter:
+            replay('hunter', "Hunter Module (Secrets)")
+        if assets:
+            self._plan_assets(graph, url, flags, pool, baseline, spider)
+        self._plan_droid(graph, url, flags, pool, baseline, spider, droid)
+
+    def _plan_arachnid(self, graph, url, flags, pool, baseline, cancel, spider, droid):
+        if spider and droid:
+            graph.add('arachnid',
+                      lambda doc, robots: self._scan_arachnid(url, doc, flags, pool, robots, cancel, baseline),
+                      needs=('doc', 'robots'), report=True)
+        elif spider:
+            graph.add('arachnid', lambda doc: self._scan_arachnid(url, doc, flags, pool, None, cancel, baseline),
+                      needs=('doc',), report=True)
+
+    def _plan_assets(self, graph, url, flags, pool, baseline, spider):
+        if spider:
+            # Bundles linked from every crawled page, not just the landing page
+            graph.add('assets',
+                      lambda doc, crawled: self._scan_assets(url, doc.scripts, flags, pool, baseline, crawled),
+                      needs=('doc', 'arachnid'), report=True)
+        else:
+            graph.add('assets', lambda doc: self._scan_assets(url, doc.scripts, flags, pool, baseline),
+                      needs=('doc',), report=True)
+
+    def _plan_droid(self, graph, url, flags, pool, baseline, spider, droid):
+        if droid:
+            graph.add('droid', lambda robots: self._scan_droid(url, robots, flags, pool, spider, baseline),
+                      needs=('robots',), report=True)
+
+    def _parse_page(self, url, text, parser, baseline):
+        doc = parse_html(text, parser)
+        self._note_page(baseline, url, url, doc.links, doc.scripts)
+        return doc
+
+    def _note_page(self, baseline, url, final_url, links, scripts):
+        """Keeps a page's links and scripts for the next incremental run."""
+        if baseline is not None:
+            baseline.note(url, {'url': final_url, 'links': list(links), 'scripts': list(scripts)})
+
+    def _replay(self, baseline, title, keep):
+        """Reports the previous run's findings of a module whose input is unchanged."""
+        PhantomUI.section(title)
+        for record in baseline.records(keep):
+            PhantomUI.report(Finding(**record))
+
+    def _fetch_target(self, pool, url, reads_body):
+        res = pool.get(url, stream=True)
+        if not reads_body:
+            # Headers stay readable after close
+            res.close()
+        return res
+
+    def _iter_text(self, res, chunk_size=65536):
+        """Decodes a streamed response body chunk by chunk."""
         try:
-            # 1. Core / Spectrum (Always Run)
-            PhantomUI.info("Fetching target...")
-            res = requests.get(url, timeout=10)
-            soup = BeautifulSoup(res.text, 'html.parser')
-            
-            self._scan_spectrum(res)
-            
-            # 2. Arachnid (Spider)
-            if flags.get('spider') or flags.get('complete'):
-                self._scan_arachnid(url, soup)
-                
-            # 3. Vortex (API)
-            if flags.get('vortex') or flags.get('complete'):
-                self._scan_vortex(soup)
-                
-            # 4. Hunter (Secrets)
-            if flags.get('hunter') or flags.get('complete'):
-                self._scan_hunter(res.text)
-
-            # 5. Droid (Robots.txt)
-            if flags.get('droid') or flags.get('complete'):
-                self._scan_droid(url)
-
-        except Exception as e:
-            PhantomUI.alert(f"Connection Failed: {e}")
-
-    def _scan_spectrum(self, res):
+            decoder = codecs.getincrementaldecoder(res.encoding or 'utf-8')(errors='replace')
+        except LookupError:
+            decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+        for chunk in res.iter_content(chunk_size):
+            yield decoder.decode(chunk)
+        yield decoder.decode(b'', final=True)
+
+    def _feed(self, chunks, collector):
+        """Passes chunks through unchanged, feeding them to the HTML collector on the way."""
+        for chunk in chunks:
+            if collector:
+                collector.feed(chunk)
+            yield chunk
+
+    def _drain(self, chunks):
+        for chunk in chunks:
+            pass
+
+    def report_pool(self):
+        if self.state is not None:
+            c = self.changes
+            PhantomUI.info(
+                f"Incremental: {c['new']} new, {c['changed']} changed, {c['unchanged']} unchanged, "
+                f"{c['removed']} removed URLs"
+            )
+        stats = self.pool.stats()
+        PhantomUI.info(
+            f"HTTP Pool: {stats['requests']} requests over {stats['connections']} connections "
+            f"({stats['reused']} reused)"
+        )
+        if stats['backoffs']:
+            PhantomUI.info(
+                f"Throttle: backed off {stats['backoffs']} times on 429/503/timeouts/latency "
+                f"(at most {stats['peak']} requests in flight per host, concurrency limit now {stats['limit']})"
+            )
+        if self.pool.cache is not None:
+            cache = self.pool.cache.stats()
+            PhantomUI.info(
+                f"HTTP Cache: {cache['hits']} hits / {cache['hits'] + cache['misses']} fetches "
+                f"({cache['hit_rate']:.0%} revalidated with 304), {cache['bytes'] / 1024 / 1024:.1f} MB on disk"
+            )
+
+    def _scan_spectrum(self, url, res):
         """Standard Header & Tech Analysis"""
         PhantomUI.section("Spectrum Analysis (Headers)")
         
@@ -75,93 +522,224 @@ class WraithAnalyzer:
         
         for header, alert_msg in security_headers.items():
             if header not in headers:
-                PhantomUI.alert(alert_msg)
+                PhantomUI.report(Finding('spectrum', 'missing_header', url, alert_msg, header, severity='medium'))
             else:
-                PhantomUI.data(header, "Present")
+                PhantomUI.report(Finding('spectrum', 'header', url, header, "Present"))
 
         # Server Fingerprinting & CVEs
         server = headers.get('Server', 'Unknown')
-        PhantomUI.data("Server Technology", server)
+        PhantomUI.report(Finding('spectrum', 'technology', url, "Server Technology", server))
+        if 'X-Powered-By' in headers:
+            PhantomUI.report(Finding('spectrum', 'technology', url, "Powered By", headers['X-Powered-By']))
         
-        # Simple string match for CVE lookup
-        for software, cves in self.cve_db.items():
-            if software in server:
-                for cve in cves:
-                    PhantomUI.alert(f"VULNERABILITY DETECTED: {cve}")
-
-    def _scan_arachnid(self, base_url, soup):
-        """Spider: Find Internal Links"""
+        # Indexed lookup of every product/version token in the banners
+        for product, version, cves in self.cve_index.match_headers(headers):
+            for cve in cves:
+                PhantomUI.report(Finding(
+                    'spectrum', 'cve', url, f"{product} {version}", cve, severity='high',
+                    product=product, version=version
+                ))
+
+    def _scan_arachnid(self, base_url, doc, flags, pool, robots=None, cancel=None, baseline=None):
+        """Spider: Crawl Internal Links (plus the pages robots.txt sitemaps list)"""
         PhantomUI.section("Arachnid Module (Spider)")
-        links = set()
-        for a_tag in soup.find_all('a', href=True):
-            href = a_tag['href']
-            full_url = urljoin(base_url, href)
-            # Only internal links
-            if base_url in full_url:
-                links.add(full_url)
-        
-        PhantomUI.data("Internal Links Found", len(links))
-        PhantomUI.data("Internal Links Found", len(links))
+        crawler = ArachnidCrawler(
+            max_depth=flags.get('depth', 2),
+            max_pages=flags.get('max_pages', 500),
+            max_inflight=flags.get('inflight', 16),
+            pool=pool,
+            parser=flags.get('parser', 'auto'),
+            cancel=cancel,
+            baseline=baseline
+        )
+        sitemaps = robots.sitemaps if robots else None
+        discovered = crawler.crawl(base_url, seed_links=doc.links, sitemaps=sitemaps)
+
+        PhantomUI.data("Pages Crawled", crawler.pages_fetched)
+        if crawler.errors:
+            PhantomUI.data("Pages Failed", crawler.errors)
+            if flags.get('verbose'):
+                PhantomUI.report_many(
+                    (Finding('arachnid', 'crawl_error', link, f"Crawl Failed: {link}", reason, severity='medium')
+                     for link, reason in crawler.failures),
+                    top=flags.get('top', 100), group=lambda finding: finding.value
+                )
+            else:
+                PhantomUI.info("Run with -verbose to list the failed pages.")
+        if crawler.sitemap:
+            PhantomUI.data("Sitemap URLs Read",
+                           f"{crawler.sitemap.urls_read} from {crawler.sitemap.sitemaps_read} sitemap(s)")
+        # Everything but the start page
+        PhantomUI.data("Internal Links Found", len(discovered) - 1)
+        if crawler.scripts:
+            PhantomUI.data("Scripts Linked", len(crawler.scripts))
         
-        # Display all detected internal links
-        for link in links:
-            print(f"  {PhantomUI.DATA_WHITE}- {link}{PhantomUI.RESET}")
+        # Display detected internal links, streamed off disk; big crawls collapse into per-directory counts
+        PhantomUI.report_many(
+            (Finding('arachnid', 'link', base_url, "Internal Link", link, depth=depth)
+             for link, depth in discovered.items() if depth > 0),
+            top=flags.get('top', 100), group=_link_group
+        )
+        discovered.close()
+        return crawler.scripts
+
+    def _vortex_matches(self, text):
+        matches = set()
+        for pattern in VORTEX_PATTERNS:
+            matches.update(pattern.findall(text))
+        return matches
 
-    def _scan_vortex(self, soup):
+    def _scan_vortex(self, url, text, flags):
         """API Discovery"""
         PhantomUI.section("Vortex Module (API Discovery)")
-        input_string = str(soup)
-        
-        # Regex patterns for API endpoints
-        patterns = [
-            r'/api/v\d+/',
-            r'/graphql',
-            r'/swagger',
-            r'\.json'
-        ]
-        
-        found = False
-        for pattern in patterns:
-            matches = re.findall(pattern, input_string)
-            if matches:
-                found = True
-                unique_matches = set(matches)
-                for m in unique_matches:
-                     PhantomUI.data("API Endpoint Potential", m)
+        matches = self._vortex_matches(text)
+
+        PhantomUI.report_many(
+            [Finding('vortex', 'api_endpoint', url, "API Endpoint Potential", m) for m in matches],
+            top=flags.get('top', 100)
+        )
         
-        if not found:
+        if not matches:
             PhantomUI.info("No obvious API endpoints found in HTML.")
 
-    def _scan_hunter(self, text):
-        """Secrets Scanner"""
+    def _scan_assets(self, base_url, srcs, flags, pool, baseline=None, crawled=None):
+        """Linked JS: fetch same-scope bundles concurrently, run Vortex + Hunter on each"""
+        PhantomUI.section("Asset Stage (Linked Scripts)")
+        # Script URL -> the page it was first seen on; `crawled` comes from the spider
+        pages = dict.fromkeys(scoped_urls(base_url, srcs), base_url)
+        for asset_url, page in (crawled or {}).items():
+            pages.setdefault(asset_url, page)
+        urls = list(pages)
+        PhantomUI.data("Same-Scope Scripts", len(urls))
+
+        if baseline is not None:
+            # Incremental run: bundles unchanged since the last run keep their findings
+            kept = []
+            for asset_url in urls:
+                state = baseline.get(asset_url)
+                if state is not None and state.status == 200:
+                    baseline.keep(asset_url, state)
+                    kept.append(asset_url)
+            for record in baseline.records(lambda r: r['module'] == 'assets' and r['target'] in kept):
+                PhantomUI.report(Finding(**record))
+            urls = [u for u in urls if u not in kept]
+            if kept:
+                PhantomUI.data("Unchanged Bundles Skipped", len(kept))
+
+        # A fresh fetcher per run: bundles are deduplicated within one analyze, never
+        # across commands, or a second run of the same target would scan nothing
+        fetcher = AssetFetcher(pool)
+        scanned = 0
+        for asset_url, text in fetcher.fetch(urls):
+            scanned += 1
+            endpoints = self._vortex_matches(text)
+            leaks = {}
+            for name, value, offset in self.hunter.scan(text):
+                leaks.setdefault(name, (value, offset))
+
+            if not endpoints and not leaks:
+                continue
+            PhantomUI.info(f"Asset: {asset_url}")
+            for m in endpoints:
+                PhantomUI.report(Finding('assets', 'api_endpoint', asset_url, "API Endpoint Potential", m,
+                                         page=pages[asset_url]))
+            for name, (value, offset) in leaks.items():
+                PhantomUI.report(Finding('assets', 'secret', asset_url, name, value[:4] + "...",
+                                         severity=_secret_severity(name), page=pages[asset_url], offset=offset))
+
+        PhantomUI.data("Unique Bundles Scanned", scanned)
+        if fetcher.duplicates:
+            PhantomUI.data("Duplicate Bundles Skipped", fetcher.duplicates)
+        if fetcher.errors:
+            PhantomUI.data("Bundles Failed", fetcher.errors)
+            if flags.get('verbose'):
+                PhantomUI.report_many(
+                    (Finding('assets', 'asset_error', link, f"Bundle Failed: {link}", reason, severity='medium')
+                     for link, reason in fetcher.failures),
+                    top=flags.get('top', 100), group=lambda finding: finding.value
+                )
+            else:
+                PhantomUI.info("Run with -verbose to list the failed bundles.")
+        self._report_disabled_rules(base_url)
+
+    def _scan_hunter(self, url, chunks):
+        """Secrets Scanner (streams over text chunks)"""
         PhantomUI.section("Hunter Module (Secrets)")
-        found = False
-        for name, pattern in self.secrets_db.items():
-            matches = re.findall(pattern, text)
-            if matches:
-                found = True
-                PhantomUI.alert(f"POTENTIAL LEAK: {name}")
-                # Print first match (truncated for safety)
-                masked = matches[0][:4] + "..."
-                print(f"    Match: {masked}")
+        counts = {}
+        for name, value, offset in self.hunter.scan_stream(chunks):
+            counts[name] = counts.get(name, 0) + 1
+            # Reported as found, before the body finishes downloading; values truncated for safety
+            PhantomUI.report(Finding(
+                'hunter', 'secret', url, name, value[:4] + "...", severity=_secret_severity(name),
+                offset=offset, occurrence=counts[name]
+            ))
+
+        for name, count in counts.items():
+            if count > 1:
+                PhantomUI.data(f"{name} Hits", count)
         
-        if not found:
+        if not counts:
             PhantomUI.info("No hardcoded secrets found in response text.")
+        self._report_disabled_rules(url)
 
-    def _scan_droid(self, base_url):
-        """Robots.txt Analysis"""
-        PhantomUI.section("Droid Module (Robots.txt)")
+    def _report_disabled_rules(self, url):
+        # Each rule is reported once, by the scan that tripped its budget
+        for name, reason in self.hunter.take_disabled():
+            PhantomUI.report(Finding('hunter', 'rule_disabled', url, f"Rule Disabled: {name}", reason,
+                                     severity='medium'))
+
+    def _fetch_robots(self, base_url, pool, baseline=None):
+        """robots.txt for the target's host, or None if it could not be fetched."""
         parsed = urlparse(base_url)
         robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
-        
+        if baseline is not None:
+            state = baseline.get(robots_url)
+            if state is not None and state.data is not None:
+                baseline.keep(robots_url, state)
+                robots = RobotsTxt(robots_url, state.status)
+                robots.disallowed, robots.sitemaps = state.data['disallowed'], state.data['sitemaps']
+                return robots
         try:
-            res = requests.get(robots_url, timeout=5)
-            if res.status_code == 200:
-                PhantomUI.info(f"Found robots.txt at {robots_url}")
-                for line in res.text.splitlines():
-                    if "Disallow" in line:
-                         PhantomUI.data("Disallowed Path", line.split(': ')[1].strip())
-            else:
-                PhantomUI.info("No robots.txt found (404).")
-        except:
+            res = pool.get(robots_url)
+        except Exception:
+            return None
+
+        robots = RobotsTxt(robots_url, res.status_code)
+        if res.status_code == 200:
+            robots.disallowed, robots.sitemaps = parse_robots(res.text)
+        if baseline is not None:
+            baseline.note(robots_url, {'disallowed': robots.disallowed, 'sitemaps': robots.sitemaps})
+        return robots
+
+    def _scan_droid(self, base_url, robots, flags, pool, crawl=False, baseline=None):
+        """Robots.txt Analysis (and the sitemaps it points to)"""
+        PhantomUI.section("Droid Module (Robots.txt)")
+
+        if robots is None:
             PhantomUI.info("Could not fetch robots.txt")
+            return
+        if robots.status != 200:
+            PhantomUI.info(f"No robots.txt found ({robots.status}).")
+            return
+
+        PhantomUI.info(f"Found robots.txt at {robots.url}")
+        for path in robots.disallowed:
+            PhantomUI.report(Finding('droid', 'disallowed_path', base_url, "Disallowed Path", path))
+        for sitemap in robots.sitemaps:
+            PhantomUI.report(Finding('droid', 'sitemap', base_url, "Sitemap", sitemap))
+
+        if not robots.sitemaps:
+            return
+        if crawl:
+            # Arachnid reads them into its frontier; no need to download them twice
+            PhantomUI.info("Sitemap URLs are fed to the Arachnid crawl.")
+            return
+
+        reader = SitemapReader(pool, baseline=baseline)
+        PhantomUI.report_many(
+            (Finding('droid', 'sitemap_url', base_url, "Sitemap URL", url) for url in reader.urls(robots.sitemaps)),
+            top=flags.get('top', 100), group=_link_group
+        )
+        PhantomUI.data("Sitemap URLs Read", f"{reader.urls_read} from {reader.sitemaps_read} sitemap(s)")
+        if reader.errors:
+            PhantomUI.data("Sitemaps Unreadable", reader.errors)
@@ -8,6 +8,7 @@ setup(
         "requests",
         "beautifulsoup4",
         "colorama",
+        "regex",
     ],
     entry_points={
         "console_scripts": [
@@ -0,0 +1,39 @@
+class WatchedBody:
+    """
+    Stands in for a streamed response's raw body so its download can be
+    followed as the caller reads it: `on_chunk(data)` sees every chunk, and
+    `on_close(outcome)` runs once, with 'eof' when the body was read to the
+    end, 'error' when reading it failed, or 'closed' when it was closed first.
+    """
+
+    def __init__(self, raw, on_chunk=None, on_close=None):
+        self.raw = raw
+        self.on_chunk = on_chunk
+        self.on_close = on_close
+        # urllib3 bodies are asked for decoded data, like iter_content does
+        self._read = (lambda amt: raw.read(amt, decode_content=True)) if hasattr(raw, 'stream') else raw.read
+
+    def read(self, amt=None, *args, **kwargs):
+        try:
+            data = self._read(amt)
+        except Exception:
+            self._finish('error')
+            raise
+        if not data:
+            self._finish('eof')
+        elif self.on_chunk is not None:
+            self.on_chunk(data)
+        return data
+
+    def _finish(self, outcome):
+        if self.on_close is not None:
+            on_close, self.on_close = self.on_close, None
+            on_close(outcome)
+
+    def close(self):
+        self._finish('closed')
+        self.raw.close()
+
+    def release_conn(self):
+        if hasattr(self.raw, 'release_conn'):
+            self.raw.release_conn()
@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+# Headers describing the stored (already decoded) body rather than the wire format
+_DROP_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding', 'connection')
+
+
+def default_cache_dir():
+    return os.path.join(os.path.expanduser('~'), '.cache', 'phantom')
+
+
+class ResponseCache:
+    """
+    On-disk cache for GET responses that carry an ETag or Last-Modified.
+
+    Bodies live in one file per URL; a small SQLite table keeps validators,
+    headers, size and last access time. Every reuse is revalidated with a
+    conditional request, so an unchanged page costs a 304 instead of a full
+    download. Least recently used entries are evicted once the cache grows
+    past max_bytes.
+    """
+
+    def __init__(self, directory=None, max_bytes=512 * 1024 * 1024):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(self.directory, 'index.sqlite3'), check_same_thread=False)
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            ' url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT,'
+            ' headers TEXT, size INTEGER, last_access REAL)'
+        )
+        self._db.commit()
+        self.total_bytes = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+
+        self.hits = 0         # revalidated with 304, served from disk
+        self.misses = 0       # downloaded in full
+        self.evictions = 0
+
+    def _body_path(self, url):
+        return os.path.join(self.directory, hashlib.sha256(url.encode('utf-8')).hexdigest())
+
+    def lookup(self, url):
+        """Returns (etag, last_modified, headers) for a stored URL, or None."""
+        with self._lock:
+            row = self._db.execute(
+                'SELECT etag, last_modified, headers FROM entries WHERE url = ?', (url,)
+            ).fetchone()
+        if row is None or not os.path.exists(self._body_path(url)):
+            return None
+        return row[0], row[1], json.loads(row[2])
+
+    def conditional_headers(self, entry):
+        etag, last_modified, _ = entry
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        return headers
+
+    def open_body(self, url, entry, fresh_headers):
+        """Marks a 304 as a hit and returns (headers, body file) for the stored copy."""
+        etag, last_modified, headers = entry
+        # A 304 may carry updated validators
+        headers.update({k: v for k, v in fresh_headers.items() if k.lower() not in _DROP_HEADERS})
+        with self._lock:
+            self.hits += 1
+            self._db.execute(
+                'UPDATE entries SET etag = ?, last_modified = ?, headers = ?, last_access = ? WHERE url = ?',
+                (headers.get('ETag', etag), headers.get('Last-Modified', last_modified),
+                 json.dumps(headers), time.time(), url)
+            )
+            self._db.commit()
+        return headers, open(self._body_path(url), 'rb')
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def cacheable(self, headers):
+        if 'no-store' in headers.get('Cache-Control', ''):
+            return False
+        return bool(headers.get('ETag') or headers.get('Last-Modified'))
+
+    def writer(self, url, headers):
+        """Starts writing a body for url; call commit() once it is complete."""
+        return _BodyWriter(self, url, headers)
+
+    def _store(self, url, headers, tmp_path, size):
+        stored = {k: v for k, v in headers.items() if k.lower() not in _DROP_HEADERS}
+        with self._lock:
+            previous = self._db.execute('SELECT size FROM entries WHERE url = ?', (url,)).fetchone()
+            os.replace(tmp_path, self._body_path(url))
+            self._db.execute(
+                'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)',
+                (url, headers.get('ETag'), headers.get('Last-Modified'), json.dumps(stored), size, time.time())
+            )
+            self.total_bytes += size - (previous[0] if previous else 0)
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        # Oldest access first until back under budget
+        if self.total_bytes <= self.max_bytes:
+            return
+        rows = self._db.execute('SELECT url, size FROM entries ORDER BY last_access').fetchall()
+        for url, size in rows:
+            if self.total_bytes <= self.max_bytes:
+                break
+            self._db.execute('DELETE FROM entries WHERE url = ?', (url,))
+            try:
+                os.remove(self._body_path(url))
+            except OSError:
+                pass
+            self.total_bytes -= size
+            self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'bytes': self.total_bytes
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class _BodyWriter:
+    def __init__(self, cache, url, headers):
+        self.cache = cache
+        self.url = url
+        self.headers = headers
+        self.size = 0
+        fd, self.tmp_path = tempfile.mkstemp(dir=cache.directory, suffix='.part')
+        self.file = os.fdopen(fd, 'wb')
+
+    def write(self, data):
+        self.file.write(data)
+        self.size += len(data)
+
+    def commit(self):
+        self.file.close()
+        self.cache._store(self.url, self.headers, self.tmp_path, self.size)
+
+    def discard(self):
+        self.file.close()
+        try:
+            os.remove(self.tmp_path)
+        except OSError:
+            pass
@@ -0,0 +1,179 @@
+import re
+from bisect import bisect_right
+
+# Product/version tokens in Server-style banners:
+# "Apache/2.4.49 (Unix) OpenSSL/1.1.1k" -> apache 2.4.49, openssl 1.1.1k
+BANNER_TOKEN = re.compile(r'([A-Za-z][\w.+-]*?)/(\d[\w.+-]*)')
+# Numeric parts plus an OpenSSL-style letter suffix: 1.0.1f -> 1, 0, 1, f
+VERSION_PART = re.compile(r'(\d+)([a-z](?![a-z0-9]))?')
+COMPARATOR = re.compile(r'^(>=|<=|>|<|==|=)?\s*(.+)$')
+
+# Headers that carry product banners, and the product implied by bare-version ones
+BANNER_HEADERS = ('Server', 'X-Powered-By')
+VERSION_HEADERS = {'X-AspNet-Version': 'asp.net', 'X-AspNetMvc-Version': 'asp.net-mvc'}
+
+# Open upper bound; compares greater than any parsed version tuple
+UNBOUNDED = (float('inf'),)
+
+
+def parse_version(text):
+    """
+    '2.4.49' -> (2, 4, 49), '1.0.1f' -> (1, 0, 1, 6); trailing zeros are
+    dropped so 10.0 == 10.
+    """
+    parts = []
+    for number, letter in VERSION_PART.findall(text.lower()):
+        parts.append(int(number))
+        if letter:
+            parts.append(ord(letter) - ord('a') + 1)
+    while parts and parts[-1] == 0:
+        parts.pop()
+    return tuple(parts)
+
+
+def banner_tokens(headers):
+    """
+    Extracts (product, version) pairs from response headers, product lowercased.
+    """
+    tokens = []
+    for header in BANNER_HEADERS:
+        value = headers.get(header)
+        if value:
+            found = BANNER_TOKEN.findall(value)
+            if not found:
+                # Versionless banner ("nginx", "cloudflare"): only "*" entries can match
+                found = [(value.split()[0], '')]
+            for product, version in found:
+                tokens.append((product.lower(), version))
+    for header, product in VERSION_HEADERS.items():
+        value = headers.get(header)
+        if value:
+            tokens.append((product, value.strip()))
+    return tokens
+
+
+class _Range:
+    __slots__ = ('lo', 'lo_inclusive', 'hi', 'hi_inclusive', 'cves')
+
+    def __init__(self, lo, lo_inclusive, hi, hi_inclusive, cves):
+        self.lo = lo
+        self.lo_inclusive = lo_inclusive
+        self.hi = hi
+        self.hi_inclusive = hi_inclusive
+        self.cves = cves
+
+    def contains(self, version):
+        if version < self.lo or (version == self.lo and not self.lo_inclusive):
+            return False
+        if version > self.hi or (version == self.hi and not self.hi_inclusive):
+            return False
+        return True
+
+
+class ProductEntries:
+    __slots__ = ('exact', 'ranges', 'los', 'max_hi', 'dirty')
+
+    def __init__(self):
+        self.exact = {}     # version tuple -> cves
+        self.ranges = []
+        self.los = []
+        self.max_hi = []    # running max of hi over ranges sorted by lo
+        self.dirty = False
+
+    def add(self, spec, cves):
+        spec = spec.strip()
+        if spec and spec[0].isdigit() and ',' not in spec:
+            version = parse_version(spec)
+            self.exact.setdefault(version, []).extend(cves)
+            return
+
+        lo, lo_inclusive, hi, hi_inclusive = (), True, UNBOUNDED, True
+        for bound in filter(None, (b.strip() for b in spec.split(','))):
+            if bound == '*':
+                continue
+            op, value = COMPARATOR.match(bound).groups()
+            version = parse_version(value)
+            if op in ('>=', '>'):
+                lo, lo_inclusive = version, op == '>='
+            elif op in ('<=', '<'):
+                hi, hi_inclusive = version, op == '<='
+            else:
+                lo = hi = version
+                lo_inclusive = hi_inclusive = True
+        self.ranges.append(_Range(lo, lo_inclusive, hi, hi_inclusive, list(cves)))
+        self.dirty = True
+
+    def finalize(self):
+        self.ranges.sort(key=lambda r: r.lo)
+        self.los = [r.lo for r in self.ranges]
+        self.max_hi = []
+        running = ()
+        for r in self.ranges:
+            running = max(running, r.hi)
+            self.max_hi.append(running)
+        self.dirty = False
+
+    def lookup(self, version):
+        if self.dirty:
+            self.finalize()
+
+        if not version:
+            return [cve for r in self.ranges if r.lo == () and r.hi == UNBOUNDED for cve in r.cves]
+
+        found = list(self.exact.get(version, ()))
+        # Ranges with lo <= version, walked back only while one could still reach it
+        i = bisect_right(self.los, version) - 1
+        while i >= 0 and self.max_hi[i] >= version:
+            r = self.ranges[i]
+            if r.contains(version):
+                found.extend(r.cves)
+            i -= 1
+        return found
+
+
+class CveIndex:
+    """
+    CVE data indexed by product name.
+
+    Keys follow the cve_db.json format "Product/spec", where spec is either an
+    exact version ("Apache/2.4.49"), a comma-separated range
+    ("OpenSSL/>=1.0.1,<=1.0.1f") or "*" for every version. Lookups are a dict
+    hit per product plus a binary search over that product's ranges.
+    """
+
+    def __init__(self, entries=None):
+        self.products = {}
+        self.size = 0
+        for key, cves in (entries or {}).items():
+            self.add(key, cves)
+        self.finalize()
+
+    def add(self, key, cves):
+        product, _, spec = key.partition('/')
+        entries = self.products.setdefault(product.strip().lower(), ProductEntries())
+        entries.add(spec, cves)
+        self.size += 1
+
+    def finalize(self):
+        """Sorts range entries; call after a batch of add() before sharing across threads."""
+        for entries in self.products.values():
+            if entries.dirty:
+                entries.finalize()
+
+    def lookup(self, product, version):
+        entries = self.products.get(product.lower())
+        if entries is None:
+            return []
+        return entries.lookup(parse_version(version))
+
+    def match_headers(self, headers):
+        """Returns [(product, version, cves)] for every banner token with known CVEs."""
+        hits = []
+        for product, version in banner_tokens(headers):
+            cves = self.lookup(product, version)
+            if cves:
+                hits.append((product, version, cves))
+        return hits
+
+    def __len__(self):
+        return self.size
@@ -0,0 +1,68 @@
+import json
+import sys
+import threading
+
+OUTPUT_MODES = ('text', 'json', 'ndjson')
+
+
+class Finding:
+    """
+    One typed result from a module. Modules hand these to PhantomUI.report,
+    which renders them as text or streams them as JSON.
+    """
+    __slots__ = ('module', 'kind', 'target', 'title', 'value', 'severity', 'extra')
+
+    def __init__(self, module, kind, target, title, value=None, severity='info', **extra):
+        self.module = module
+        self.kind = kind
+        self.target = target
+        self.title = title
+        self.value = value
+        self.severity = severity
+        self.extra = extra
+
+    def to_dict(self):
+        record = {
+            'module': self.module,
+            'kind': self.kind,
+            'target': self.target,
+            'title': self.title,
+            'value': self.value,
+            'severity': self.severity
+        }
+        record.update(self.extra)
+        return record
+
+
+class FindingWriter:
+    """
+    Writes findings the moment they are reported: one JSON object per line
+    (ndjson) or the elements of a single JSON array (json). Every record is
+    flushed immediately so downstream consumers see it without delay.
+    """
+
+    def __init__(self, mode, stream=None):
+        self.mode = mode
+        self.stream = stream or sys.stdout
+        self.count = 0
+        self._lock = threading.Lock()
+        if mode == 'json':
+            self.stream.write('[')
+            self.stream.flush()
+
+    def write(self, finding):
+        line = json.dumps(finding.to_dict(), separators=(',', ':'), default=str)
+        with self._lock:
+            if self.mode == 'json':
+                line = ('\n' if not self.count else ',\n') + line
+            else:
+                line += '\n'
+            self.stream.write(line)
+            self.stream.flush()
+            self.count += 1
+
+    def close(self):
+        with self._lock:
+            if self.mode == 'json':
+                self.stream.write('\n]\n' if self.count else ']\n')
+                self.stream.flush()
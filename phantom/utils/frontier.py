@@ -0,0 +1,256 @@
+import hashlib
+import re
+import tempfile
+from array import array
+from collections import deque
+
+DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
+# scheme://netloc path ?query #fragment
+_URL = re.compile(r'([A-Za-z][A-Za-z0-9+.-]*)://([^/?#]*)([^?#]*)(?:\?([^#]*))?')
+
+
+def canonicalize(url):
+    """
+    Normal form used to spot duplicate URLs: lowercase scheme and host, no
+    default port, no fragment, '/' for an empty path and query parameters
+    sorted by name (values keep their order and encoding).
+    """
+    # One regex instead of urlsplit/urlunsplit: this runs for every link found
+    match = _URL.match(url)
+    if match is None:
+        return url.partition('#')[0]
+    scheme, netloc, path, query = match.groups()
+    scheme = scheme.lower()
+
+    userinfo, at, hostport = netloc.rpartition('@')
+    hostport = hostport.lower()
+    port = DEFAULT_PORTS.get(scheme)
+    if port and hostport.endswith(':' + port):
+        hostport = hostport[:-len(port) - 1]
+
+    if query and '&' in query:
+        query = '&'.join(sorted((p for p in query.split('&') if p), key=lambda p: p.split('=', 1)[0]))
+
+    url = f"{scheme}://{userinfo}{at}{hostport}{path or '/'}"
+    return f"{url}?{query}" if query else url
+
+
+def url_key(url):
+    """Non-zero 64-bit digest of a canonical URL; /docs and /docs/ share a key."""
+    base, sep, query = url.partition('?')
+    if base.endswith('/') and base.count('/') > 3:
+        base = base[:-1]
+    digest = hashlib.blake2b((base + sep + query).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') or 1
+
+
+class KeySet:
+    """
+    Open-addressing hash set of 64-bit URL keys in one flat array, with the
+    shallowest depth each key was offered at in a parallel byte array: 9
+    bytes per slot and no per-URL objects, kept between 1/3 and 2/3 full,
+    so a seen URL costs 14-27 bytes whatever its length. With 64-bit keys a
+    collision (a page wrongly skipped) is ~1e-8 likely at a million URLs.
+    """
+
+    def __init__(self, capacity=1 << 16):
+        self.slots = array('Q', bytes(8 * capacity))   # 0 marks an empty slot
+        self.depths = array('B', bytes(capacity))
+        self.mask = capacity - 1
+        self.count = 0
+
+    def __contains__(self, key):
+        slots, mask = self.slots, self.mask
+        i = key & mask
+        while True:
+            k = slots[i]
+            if k == key:
+                return True
+            if k == 0:
+                return False
+            i = (i + 1) & mask
+
+    def add(self, key, depth=0):
+        """Returns True if the key had not been seen."""
+        return self.offer(key, depth) is None
+
+    def offer(self, key, depth=0):
+        """
+        Adds the key at `depth`. Returns None if it is new, else the shallowest
+        depth it was offered at before; the stored depth keeps the minimum.
+        """
+        depth = min(depth, 255)
+        slots, mask = self.slots, self.mask
+        i = key & mask
+        while True:
+            k = slots[i]
+            if k == key:
+                previous = self.depths[i]
+                if depth < previous:
+                    self.depths[i] = depth
+                return previous
+            if k == 0:
+                break
+            i = (i + 1) & mask
+        slots[i] = key
+        self.depths[i] = depth
+        self.count += 1
+        if self.count * 3 > len(slots) * 2:
+            self._grow()
+        return None
+
+    def _grow(self):
+        old, old_depths = self.slots, self.depths
+        self.slots = array('Q', bytes(16 * len(old)))
+        self.depths = array('B', bytes(2 * len(old)))
+        self.mask = len(self.slots) - 1
+        self.count = 0
+        for key, depth in zip(old, old_depths):
+            if key:
+                self.offer(key, depth)
+
+    def __len__(self):
+        return self.count
+
+    def nbytes(self):
+        return len(self.slots) * self.slots.itemsize + len(self.depths)
+
+
+class SpillQueue:
+    """
+    FIFO of (url, depth) holding at most about 2 * memory_items entries in
+    memory. Once the in-memory tail fills up it is appended to a temp file;
+    the head refills from that file in order.
+    """
+
+    def __init__(self, memory_items=10000):
+        self.memory_items = memory_items
+        self.head = deque()
+        self.tail = deque()
+        self.file = None
+        self.read_pos = 0
+        self.spilled = 0      # entries in the file not yet read back
+        self.length = 0
+
+    def push(self, url, depth):
+        self.length += 1
+        if not self.spilled and not self.tail and len(self.head) < self.memory_items:
+            self.head.append((url, depth))
+            return
+        self.tail.append((url, depth))
+        if len(self.tail) >= self.memory_items:
+            self._spill()
+
+    def _spill(self):
+        if self.file is None:
+            self.file = tempfile.TemporaryFile()
+        self.file.seek(0, 2)
+        self.file.write(''.join(f"{depth}\t{url}\n" for url, depth in self.tail).encode('utf-8'))
+        self.spilled += len(self.tail)
+        self.tail.clear()
+
+    def pop(self):
+        if not self.head:
+            self._refill()
+        self.length -= 1
+        return self.head.popleft()
+
+    def _refill(self):
+        if not self.spilled:
+            self.head, self.tail = self.tail, self.head
+            return
+        self.file.seek(self.read_pos)
+        count = min(self.memory_items, self.spilled)
+        for _ in range(count):
+            depth, url = self.file.readline().decode('utf-8').rstrip('\n').split('\t', 1)
+            self.head.append((url, int(depth)))
+        self.spilled -= count
+        self.read_pos = self.file.tell()
+        if not self.spilled:
+            # Everything read back; reuse the file from the start
+            self.file.seek(0)
+            self.file.truncate()
+            self.read_pos = 0
+
+    def __len__(self):
+        return self.length
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class LinkLog:
+    """Append-only record of (url, depth) for every discovered link, kept on disk."""
+
+    def __init__(self):
+        self.file = tempfile.TemporaryFile()
+        self.count = 0
+
+    def add(self, url, depth):
+        self.file.write(f"{depth}\t{url}\n".encode('utf-8'))
+        self.count += 1
+
+    def items(self):
+        self.file.seek(0)
+        try:
+            for line in self.file:
+                depth, url = line.decode('utf-8').rstrip('\n').split('\t', 1)
+                yield url, int(depth)
+        finally:
+            self.file.seek(0, 2)
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self.file.close()
+
+
+class Frontier:
+    """
+    Crawl frontier for Arachnid. URLs are added in canonical form; a URL
+    whose key was seen before is dropped, so each page is fetched once, but
+    the shallowest depth it was offered at is kept (see offer()).
+    Seen URLs are kept only as 64-bit keys, and both the pending queue and
+    the list of discovered links spill to disk, so memory per URL is a small
+    constant.
+    """
+
+    def __init__(self, memory_items=10000):
+        self.seen = KeySet()
+        self.pending = SpillQueue(memory_items)
+        self.discovered = LinkLog()
+
+    def add(self, url, depth):
+        """Records a canonical URL; returns False if it was already known."""
+        return self.offer(url, depth) is None
+
+    def offer(self, url, depth):
+        """
+        Records a canonical URL at `depth`. Returns None if it is new, else the
+        shallowest depth it was known at before, so a caller can still follow
+        a link first seen too deep to be followed.
+        """
+        previous = self.seen.offer(url_key(url), depth)
+        if previous is None:
+            self.discovered.add(url, depth)
+        return previous
+
+    def mark(self, url):
+        """Marks a canonical URL as seen without reporting it (e.g. a redirect target)."""
+        self.seen.add(url_key(url))
+
+    def push(self, url, depth):
+        self.pending.push(url, depth)
+
+    def pop(self):
+        return self.pending.pop()
+
+    def __len__(self):
+        return len(self.pending)
+
+    def close(self):
+        self.pending.close()
@@ -0,0 +1,89 @@
+from html.parser import HTMLParser
+
+# Parser backends, fastest first. 'auto' picks lxml when it is installed.
+BACKENDS = ('auto', 'sax', 'lxml', 'soup')
+
+
+class HtmlDocument:
+    """The parts of a page Wraith modules use: raw markup, <a href> and <script src> values."""
+    __slots__ = ('text', 'links', 'scripts')
+
+    def __init__(self, text, links, scripts):
+        self.text = text
+        self.links = links
+        self.scripts = scripts
+
+
+class LinkExtractor(HTMLParser):
+    """
+    SAX-style extractor on the stdlib parser: no tree is built, only hrefs and
+    script srcs are kept. Can be fed a page incrementally.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.links = []
+        self.scripts = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            for name, value in attrs:
+                if name == 'href' and value:
+                    self.links.append(value)
+        elif tag == 'script':
+            for name, value in attrs:
+                if name == 'src' and value:
+                    self.scripts.append(value)
+
+
+def _parse_sax(text):
+    extractor = LinkExtractor()
+    extractor.feed(text)
+    extractor.close()
+    return extractor.links, extractor.scripts
+
+
+def _parse_lxml(text):
+    import lxml.html
+    if not text.strip():
+        return [], []
+    parser = lxml.html.HTMLParser(encoding='utf-8')
+    root = lxml.html.document_fromstring(text.encode('utf-8', 'replace'), parser=parser)
+    links = [href for href in root.xpath('//a/@href') if href]
+    scripts = [src for src in root.xpath('//script/@src') if src]
+    return links, scripts
+
+
+def _parse_soup(text):
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(text, 'html.parser')
+    links = [tag['href'] for tag in soup.find_all('a', href=True)]
+    scripts = [tag['src'] for tag in soup.find_all('script', src=True)]
+    return links, scripts
+
+
+def lxml_available():
+    try:
+        import lxml.html  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def resolve_backend(backend):
+    if backend not in _PARSERS:
+        backend = 'auto'
+    if backend == 'auto':
+        return 'lxml' if lxml_available() else 'sax'
+    if backend == 'lxml' and not lxml_available():
+        # Requested but not installed; the stdlib extractor gives the same answers
+        return 'sax'
+    return backend
+
+
+_PARSERS = {'sax': _parse_sax, 'lxml': _parse_lxml, 'soup': _parse_soup}
+
+
+def parse_html(text, backend='auto'):
+    links, scripts = _PARSERS[resolve_backend(backend)](text)
+    return HtmlDocument(text, links, scripts)
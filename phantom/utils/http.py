@@ -0,0 +1,228 @@
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+from urllib.parse import urlparse
+from phantom.utils.body import WatchedBody
+from phantom.utils.throttle import HostThrottle, retry_after
+
+
+class _ConnectCounter:
+    """
+    Counts real socket connects. urllib3's num_connections misses reconnects
+    of a pooled connection the server closed, which would overstate reuse.
+    """
+    num_connects = 0
+
+    def _new_conn(self):
+        conn = super()._new_conn()
+        connect = conn.connect
+
+        def counted_connect():
+            self.num_connects += 1
+            connect()
+
+        conn.connect = counted_connect
+        return conn
+
+
+class _CountingHTTPPool(_ConnectCounter, HTTPConnectionPool):
+    pass
+
+
+class _CountingHTTPSPool(_ConnectCounter, HTTPSConnectionPool):
+    pass
+
+
+class _CountingAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _CountingHTTPPool,
+            'https': _CountingHTTPSPool
+        }
+
+
+class HttpPool:
+    """
+    Keep-alive HTTP client shared by every Wraith module.
+
+    Holds one requests.Session per host so TCP/TLS connections are reused
+    across modules (target page, robots.txt, crawler) and across commands
+    in a single shell session. Each host also gets a HostThrottle: requests
+    wait for a token (`rate` per second, 0 = unlimited) and for a slot under
+    an AIMD concurrency limit of at most `pool_size`; a streamed response
+    keeps its slot until the body is read or closed, unless the caller
+    passes hold_slot=False for a long-lived stream (a sitemap read in
+    batches between other requests to the host). Every request gets
+    `timeout`; slow responses lower the host's concurrency instead.
+    """
+
+    def __init__(self, pool_size=16, keep_alive=True, retries=2, backoff=0.3, timeout=10, cache=None, rate=0):
+        # Optional ResponseCache for conditional revalidation of repeat fetches
+        self.cache = cache
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.rate = rate
+
+        self._sessions = {}
+        self._throttles = {}
+        self._lock = threading.Lock()
+
+    def _host_key(self, url):
+        parsed = urlparse(url)
+        return (parsed.scheme, parsed.netloc.lower())
+
+    def session_for(self, url):
+        """Returns the pooled session for the host of `url`, creating it on first use."""
+        key = self._host_key(url)
+
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._new_session()
+                self._sessions[key] = session
+            return session
+
+    def throttle_for(self, url):
+        key = self._host_key(url)
+        with self._lock:
+            throttle = self._throttles.get(key)
+            if throttle is None:
+                throttle = HostThrottle(self.rate, self.pool_size, self.timeout)
+                self._throttles[key] = throttle
+            return throttle
+
+    def _new_session(self):
+        session = requests.Session()
+        retry = Retry(
+            total=self.retries,
+            backoff_factor=self.backoff,
+            status_forcelist=(429, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD'])
+        )
+        adapter = _CountingAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=retry)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        if not self.keep_alive:
+            session.headers['Connection'] = 'close'
+        return session
+
+    def get(self, url, hold_slot=True, **kwargs):
+        throttle = self.throttle_for(url)
+        controller = throttle.controller
+        kwargs.setdefault('timeout', controller.timeout)
+
+        controller.acquire()
+        try:
+            throttle.bucket.acquire()
+            start = time.monotonic()
+            res = self._get(url, **kwargs)
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError, requests.exceptions.RetryError):
+            # Timeouts, dropped connections and exhausted 429/503 retries all mean "slow down"
+            controller.release(None, True)
+            raise
+        except BaseException:
+            controller.release()
+            raise
+
+        if res.status_code in (429, 503):
+            delay = retry_after(res.headers)
+            if delay:
+                throttle.bucket.pause(delay)
+            controller.release(None, True)
+        elif kwargs.get('stream') and hold_slot:
+            # The caller downloads the body; the slot (and latency sample) wait for it.
+            # A failed read counts as congestion; a body closed unread gives no sample
+            def release(outcome):
+                latency = time.monotonic() - start if outcome == 'eof' else None
+                controller.release(latency, outcome == 'error')
+            res.raw = WatchedBody(res.raw, on_close=release)
+        else:
+            controller.release(time.monotonic() - start)
+        return res
+
+    def _get(self, url, **kwargs):
+        session = self.session_for(url)
+        if self.cache is None:
+            return session.get(url, **kwargs)
+
+        entry = self.cache.lookup(url)
+        headers = dict(kwargs.pop('headers', None) or {})
+        if entry:
+            headers.update(self.cache.conditional_headers(entry))
+        stream = kwargs.pop('stream', False)
+
+        res = session.get(url, headers=headers, stream=True, **kwargs)
+        if res.status_code == 304 and entry:
+            return self._cached_response(res, url, entry)
+
+        self.cache.record_miss()
+        if res.status_code == 200 and self.cache.cacheable(res.headers):
+            # Copy the body into the cache as the caller streams it; only a
+            # body read to the end is committed
+            writer = self.cache.writer(url, res.headers)
+            res.raw = WatchedBody(res.raw, writer.write,
+                                  lambda outcome: writer.commit() if outcome == 'eof' else writer.discard())
+        if not stream:
+            res.content
+        return res
+
+    def _cached_response(self, res, url, entry):
+        headers, body = self.cache.open_body(url, entry, res.headers)
+        res.close()
+
+        cached = requests.Response()
+        cached.status_code = 200
+        cached.reason = 'OK'
+        cached.headers = CaseInsensitiveDict(headers)
+        cached.encoding = get_encoding_from_headers(cached.headers)
+        cached.raw = body
+        cached.url = url
+        cached.request = res.request
+        cached.elapsed = res.elapsed
+        cached.from_cache = True
+        return cached
+
+    def stats(self):
+        """Connection reuse counters summed over every host pool."""
+        connections = 0
+        requests_sent = 0
+        with self._lock:
+            sessions = list(self._sessions.values())
+
+        for session in sessions:
+            for adapter in set(session.adapters.values()):
+                pools = adapter.poolmanager.pools
+                for key in pools.keys():
+                    pool = pools[key]
+                    connections += getattr(pool, 'num_connects', pool.num_connections)
+                    requests_sent += pool.num_requests
+
+        with self._lock:
+            throttles = list(self._throttles.values())
+
+        return {
+            'hosts': len(sessions),
+            'connections': connections,
+            'requests': requests_sent,
+            'reused': max(requests_sent - connections, 0),
+            'backoffs': sum(t.controller.backoffs for t in throttles),
+            'limit': max((int(t.controller.limit) for t in throttles), default=0),
+            'peak': max((t.controller.peak for t in throttles), default=0)
+        }
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+        if self.cache is not None:
+            self.cache.close()
@@ -0,0 +1,110 @@
+import os
+import re
+
+# Version-control metadata is never worth scanning
+ALWAYS_SKIPPED = frozenset(('.git', '.hg', '.svn'))
+
+
+def _translate(glob):
+    """gitignore glob -> regex source, matched against a '/'-separated relative path."""
+    out = []
+    i = 0
+    while i < len(glob):
+        char = glob[i]
+        if glob.startswith('**/', i):
+            out.append('(?:.*/)?')
+            i += 3
+            continue
+        if glob.startswith('/**', i) and i + 3 == len(glob):
+            out.append('/.*')
+            i += 3
+            continue
+        if char == '*':
+            out.append('.*' if glob.startswith('**', i) else '[^/]*')
+            i += 2 if glob.startswith('**', i) else 1
+            continue
+        if char == '?':
+            out.append('[^/]')
+        elif char == '[':
+            end = glob.find(']', i + 2)
+            if end == -1:
+                out.append(re.escape(char))
+            else:
+                body = glob[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                out.append(f"[{body.replace(chr(92), chr(92) * 2)}]")
+                i = end
+        elif char == '\\' and i + 1 < len(glob):
+            i += 1
+            out.append(re.escape(glob[i]))
+        else:
+            out.append(re.escape(char))
+        i += 1
+    return ''.join(out)
+
+
+class IgnorePattern:
+    __slots__ = ('regex', 'negated', 'dir_only')
+
+    def __init__(self, line):
+        self.negated = line.startswith('!')
+        if self.negated:
+            line = line[1:]
+        self.dir_only = line.endswith('/')
+        line = line.rstrip('/')
+        # A slash anywhere but the end ties the pattern to the .gitignore's directory
+        anchored = '/' in line
+        line = line.lstrip('/')
+        source = _translate(line)
+        if not anchored:
+            source = '(?:.*/)?' + source
+        self.regex = re.compile(source + r'\Z', re.DOTALL)
+
+
+class IgnoreRules:
+    """
+    The .gitignore files that apply to one directory of the walk: its own
+    plus every parent's, each matched against the path relative to the
+    directory that holds it. The last matching pattern decides, so deeper
+    files and later lines override earlier ones, as in git.
+    """
+
+    def __init__(self, levels=()):
+        self.levels = levels     # (directory, [IgnorePattern]) from the root down
+
+    def descend(self, directory):
+        """Rules for a subdirectory, adding its .gitignore if it has one."""
+        patterns = []
+        try:
+            with open(os.path.join(directory, '.gitignore'), 'r', encoding='utf-8', errors='replace') as f:
+                for line in f:
+                    line = line.rstrip('\n').rstrip('\r')
+                    if not line.strip() or line.startswith('#'):
+                        continue
+                    # Trailing spaces are ignored unless escaped
+                    if not line.endswith('\\ '):
+                        line = line.rstrip(' ')
+                    try:
+                        patterns.append(IgnorePattern(line))
+                    except re.error:
+                        continue
+        except OSError:
+            pass
+        if not patterns:
+            return self
+        return IgnoreRules(self.levels + ((directory, patterns),))
+
+    def ignored(self, path, is_dir):
+        if os.path.basename(path) in ALWAYS_SKIPPED:
+            return True
+        ignored = False
+        for directory, patterns in self.levels:
+            # Walk paths are built by joining onto these directories
+            relative = path[len(directory) + 1:].replace(os.sep, '/')
+            for pattern in patterns:
+                if pattern.dir_only and not is_dir:
+                    continue
+                if pattern.regex.match(relative):
+                    ignored = not pattern.negated
+        return ignored
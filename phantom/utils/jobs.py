@@ -0,0 +1,125 @@
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from phantom.utils.ui import PhantomUI
+
+
+class JobCancelled(Exception):
+    """Raised on a cancelled job's thread the next time it writes output."""
+
+
+class _JobBuffer:
+    """Capture buffer for a job; doubles as the job's cancellation point."""
+    __slots__ = ('job',)
+
+    def __init__(self, job):
+        self.job = job
+
+    def append(self, line):
+        if self.job.cancel_event.is_set():
+            raise JobCancelled()
+        self.job.lines.append(line)
+
+
+class Job:
+    __slots__ = ('id', 'command', 'state', 'lines', 'future', 'cancel_event',
+                 'submitted', 'started', 'finished', 'announced')
+
+    def __init__(self, job_id, command, cancel_event=None):
+        self.id = job_id
+        self.command = command
+        self.state = 'queued'      # queued, running, done, failed, cancelled
+        self.lines = []
+        self.future = None
+        self.cancel_event = cancel_event or threading.Event()
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.announced = False
+
+    @property
+    def active(self):
+        return self.state in ('queued', 'running')
+
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+
+class JobManager:
+    """
+    Runs shell commands on a small executor so the prompt stays responsive.
+
+    Each job's output is captured into its own buffer instead of the
+    terminal; `results` shows it (partially, while the job still runs).
+    Threads can't be killed: a running job ends at its next line of output
+    after it is cancelled, and only stops its work sooner if `fn` watches
+    the event passed to submit() (scan commands, crawls and modules not
+    yet started do). A queued job is dropped before it starts.
+    """
+
+    def __init__(self, workers=4):
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.jobs = {}
+        self._ids = itertools.count(1)
+
+    def submit(self, command, fn, cancel_event=None):
+        """Queues fn(); `cancel_event`, if given, is the one `cancel` sets, so fn can watch it."""
+        job = Job(next(self._ids), command, cancel_event)
+        self.jobs[job.id] = job
+        job.future = self.executor.submit(self._run, job, fn)
+        return job
+
+    def _run(self, job, fn):
+        if job.cancel_event.is_set():
+            # Cancelled after the executor picked it up, before it started
+            job.state = 'cancelled'
+            job.finished = time.time()
+            return
+        job.state = 'running'
+        job.started = time.time()
+        try:
+            with PhantomUI.capture(_JobBuffer(job)):
+                fn()
+            # fn may watch the event and return early
+            job.state = 'cancelled' if job.cancel_event.is_set() else 'done'
+        except JobCancelled:
+            job.state = 'cancelled'
+        except Exception as e:
+            job.state = 'failed'
+            job.lines.append(f"{PhantomUI.ALERT_RED}[!] CRITICAL: {e}{PhantomUI.RESET}")
+        finally:
+            job.finished = time.time()
+
+    def get(self, job_id):
+        try:
+            return self.jobs.get(int(job_id))
+        except ValueError:
+            return None
+
+    def cancel(self, job):
+        job.cancel_event.set()
+        if job.future.cancel():
+            # Never started
+            job.state = 'cancelled'
+            job.finished = time.time()
+
+    def wait(self, jobs):
+        wait([job.future for job in jobs])
+
+    def newly_finished(self):
+        """Jobs that finished since the last call, for the shell to announce."""
+        finished = []
+        for job in self.jobs.values():
+            if not job.active and not job.announced:
+                job.announced = True
+                finished.append(job)
+        return finished
+
+    def shutdown(self):
+        for job in self.jobs.values():
+            if job.active:
+                self.cancel(job)
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,70 @@
+from concurrent.futures import ThreadPoolExecutor, wait
+from phantom.utils.ui import PhantomUI, OrderedOutput
+
+
+class DependencyError(Exception):
+    """Raised in a task whose input failed; the input's own error is the one to report."""
+
+
+class TaskCancelled(Exception):
+    """Raised in a task that had not started when the graph was cancelled."""
+
+
+class TaskGraph:
+    """
+    Runs tasks as soon as the tasks they depend on have finished.
+
+    Every task gets its own worker, so network-bound work (robots.txt, asset
+    fetches, crawling) overlaps CPU-bound scanning and the wall clock tracks
+    the slowest dependency chain rather than the sum of all tasks. Tasks
+    marked `report` write through an OrderedOutput slot, so their sections
+    still print in the order they were added. Findings follow the calling
+    thread's PhantomUI.collect() list into every task. Once the optional
+    `cancel` event is set, tasks that have not started fail with TaskCancelled.
+    """
+
+    def __init__(self, cancel=None):
+        self.tasks = []   # (name, fn, needs, report)
+        self.cancel = cancel
+
+    def add(self, name, fn, needs=(), report=False):
+        """
+        Adds a task. fn receives the results of `needs` as positional args;
+        every name in `needs` must already have been added.
+        """
+        self.tasks.append((name, fn, tuple(needs), report))
+
+    def run(self):
+        """Runs every task and returns {name: future}."""
+        slots = {}
+        for name, fn, needs, report in self.tasks:
+            if report:
+                slots[name] = len(slots)
+        output = OrderedOutput(len(slots))
+        collector = PhantomUI.current_collector()
+
+        futures = {}
+        with ThreadPoolExecutor(max_workers=max(len(self.tasks), 1)) as executor:
+            for name, fn, needs, report in self.tasks:
+                inputs = [futures[need] for need in needs]
+                futures[name] = executor.submit(self._run_task, fn, inputs, output, slots.get(name), collector)
+            wait(futures.values())
+        return futures
+
+    def _run_task(self, fn, inputs, output, slot, collector):
+        try:
+            try:
+                args = [future.result() for future in inputs]
+            except Exception as e:
+                raise DependencyError(e)
+            if self.cancel is not None and self.cancel.is_set():
+                raise TaskCancelled()
+
+            with PhantomUI.collect(collector):
+                if slot is None:
+                    return fn(*args)
+                with PhantomUI.capture(output.sink(slot)):
+                    return fn(*args)
+        finally:
+            if slot is not None:
+                output.close(slot)
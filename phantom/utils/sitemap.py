@@ -0,0 +1,207 @@
+import zlib
+from collections import deque
+from xml.parsers import expat
+
+# Sitemap protocol limit for one uncompressed file; also caps gzip bombs
+MAX_SITEMAP_BYTES = 50 * 1024 * 1024
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+def parse_robots(text):
+    """Returns (disallowed paths, sitemap URLs) from a robots.txt body."""
+    disallowed = []
+    sitemaps = []
+    for line in text.splitlines():
+        field, sep, value = line.partition(':')
+        if not sep:
+            continue
+        field = field.strip().lower()
+        value = value.split('#', 1)[0].strip()
+        if field == 'disallow' and value:
+            disallowed.append(value)
+        elif field == 'sitemap' and value:
+            sitemaps.append(value)
+    return disallowed, sitemaps
+
+
+class _SitemapParser:
+    """
+    Incremental parser for one sitemap file. Bytes go in through feed();
+    <loc> values come out in `urls` (from a <urlset>) or `sitemaps` (from a
+    <sitemapindex>). No tree is built, so memory does not grow with the file.
+    """
+
+    def __init__(self):
+        self.urls = []
+        self.sitemaps = []
+        self._text_mode = None    # decided on the first non-blank byte
+        self._text_tail = b''
+
+        self._parser = expat.ParserCreate(namespace_separator=' ')
+        self._parser.SetParamEntityParsing(expat.XML_PARAM_ENTITY_PARSING_NEVER)
+        self._parser.StartElementHandler = self._start
+        self._parser.EndElementHandler = self._end
+        self._parser.CharacterDataHandler = self._chars
+        self._parent = None       # 'url' or 'sitemap' while inside one
+        self._in_loc = False
+        self._loc = []
+
+    def feed(self, data):
+        if self._text_mode is None:
+            stripped = data.lstrip()
+            if not stripped:
+                return
+            # Plain-text sitemaps are also allowed: one URL per line
+            self._text_mode = not stripped.startswith(b'<')
+
+        if self._text_mode:
+            lines = (self._text_tail + data).split(b'\n')
+            self._text_tail = lines.pop()
+            self.urls.extend(u for u in (l.strip().decode('utf-8', 'replace') for l in lines) if u)
+        else:
+            self._parser.Parse(data, False)
+
+    def close(self):
+        if self._text_mode:
+            tail = self._text_tail.strip().decode('utf-8', 'replace')
+            if tail:
+                self.urls.append(tail)
+        elif self._text_mode is False:
+            self._parser.Parse(b'', True)
+
+    def _start(self, name, attrs):
+        name = name.rpartition(' ')[2]
+        if name in ('url', 'sitemap'):
+            self._parent = name
+        elif name == 'loc' and self._parent:
+            self._in_loc = True
+            self._loc = []
+
+    def _end(self, name):
+        name = name.rpartition(' ')[2]
+        if name == 'loc' and self._in_loc:
+            self._in_loc = False
+            loc = ''.join(self._loc).strip()
+            if loc:
+                (self.urls if self._parent == 'url' else self.sitemaps).append(loc)
+        elif name in ('url', 'sitemap'):
+            self._parent = None
+
+    def _chars(self, text):
+        if self._in_loc:
+            self._loc.append(text)
+
+
+class SitemapReader:
+    """
+    Streams page URLs out of sitemaps, following sitemap indexes and
+    unpacking gzipped files as they download. Only one chunk of parsed
+    URLs is held at a time, so a sitemap index listing millions of pages
+    is read in constant memory (apart from the set of sitemap URLs seen).
+    With a `baseline` (incremental runs) each file's entries are kept for
+    the next run, and files unchanged since the last one are replayed from
+    it instead of downloaded.
+    """
+
+    def __init__(self, pool, max_sitemaps=1000, max_urls=1000000, chunk_size=65536, baseline=None):
+        self.pool = pool
+        self.baseline = baseline
+        self.max_sitemaps = max_sitemaps
+        self.max_urls = max_urls
+        self.chunk_size = chunk_size
+
+        self.sitemaps_read = 0
+        self.urls_read = 0
+        self.errors = 0
+
+    def urls(self, sitemap_urls):
+        """Yields page URLs from the given sitemaps (and any sitemaps they index)."""
+        pending = deque(sitemap_urls)
+        seen = set(pending)
+        while pending and self.sitemaps_read < self.max_sitemaps:
+            sitemap_url = pending.popleft()
+            self.sitemaps_read += 1
+            for kind, loc in self._read(sitemap_url):
+                if kind == 'sitemap':
+                    if loc not in seen:
+                        seen.add(loc)
+                        pending.append(loc)
+                    continue
+                if self.urls_read >= self.max_urls:
+                    return
+                self.urls_read += 1
+                yield loc
+
+    def _read(self, sitemap_url):
+        if self.baseline is not None:
+            state = self.baseline.get(sitemap_url)
+            if state is not None and state.data is not None:
+                self.baseline.keep(sitemap_url, state)
+                for loc in state.data['sitemaps']:
+                    yield 'sitemap', loc
+                for loc in state.data['urls']:
+                    yield 'url', loc
+                return
+        # Entries of this file, kept for the next incremental run
+        entries = {'sitemaps': [], 'urls': []} if self.baseline is not None else None
+        try:
+            # The stream stays open between batches of URLs, while the crawl
+            # fetches pages from the same host: it must not hold one of its slots
+            res = self.pool.get(sitemap_url, stream=True, hold_slot=False)
+        except Exception:
+            self.errors += 1
+            return
+        try:
+            if res.status_code != 200:
+                self.errors += 1
+                return
+            parser = _SitemapParser()
+            for data in self._inflate(res.iter_content(self.chunk_size)):
+                parser.feed(data)
+                yield from self._take(parser, entries)
+            parser.close()
+            yield from self._take(parser, entries)
+            if entries is not None:
+                self.baseline.note(sitemap_url, entries)
+        except Exception:
+            # Broken XML or connection: keep what was parsed so far
+            self.errors += 1
+        finally:
+            res.close()
+
+    def _inflate(self, chunks):
+        """
+        Body bytes, gunzipped if the file is a .gz served as-is (not with
+        Content-Encoding), in pieces of at most chunk_size and stopping at
+        MAX_SITEMAP_BYTES, so one compressed chunk can't expand into a
+        large batch of URLs.
+        """
+        decompressor = None
+        size = 0
+        for data in chunks:
+            if not data:
+                continue
+            if size == 0 and decompressor is None and data.startswith(GZIP_MAGIC):
+                decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+            while data:
+                if decompressor is not None:
+                    piece = decompressor.decompress(data, self.chunk_size)
+                    data = decompressor.unconsumed_tail
+                else:
+                    piece, data = data, b''
+                size += len(piece)
+                if size > MAX_SITEMAP_BYTES:
+                    return
+                yield piece
+
+    def _take(self, parser, entries=None):
+        urls, parser.urls = parser.urls, []
+        sitemaps, parser.sitemaps = parser.sitemaps, []
+        if entries is not None:
+            entries['urls'].extend(urls)
+            entries['sitemaps'].extend(sitemaps)
+        for loc in sitemaps:
+            yield 'sitemap', loc
+        for loc in urls:
+            yield 'url', loc
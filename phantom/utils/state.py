@@ -0,0 +1,209 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from phantom.utils.body import WatchedBody
+from phantom.utils.cache import default_cache_dir
+
+
+class PageState:
+    __slots__ = ('etag', 'last_modified', 'content_hash', 'findings')
+
+    def __init__(self, etag, last_modified, content_hash, findings):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content_hash = content_hash
+        self.findings = findings     # list of Finding.to_dict() records
+
+
+class UrlState:
+    """
+    Validators and body digest of one URL fetched during a run, plus what
+    the run derived from the body (`data`: a page's links and scripts,
+    robots.txt rules, sitemap entries) so a later run can skip the fetch.
+    """
+    __slots__ = ('status', 'etag', 'last_modified', 'digest', 'data')
+
+    def __init__(self, status, etag, last_modified, digest, data=None):
+        self.status = status
+        self.etag = etag
+        self.last_modified = last_modified
+        self.digest = digest
+        self.data = data
+
+
+class StateStore:
+    """
+    What `analyze -incremental` remembers about each target between runs:
+    validators, a hash of the body and the findings it produced.
+
+    Entries are keyed by URL and by the module profile (which modules ran,
+    with which crawl limits), so a -hunter run and a -complete run of the
+    same page keep separate baselines. Besides the target's own entry, every
+    URL a run fetched (crawled pages, robots.txt, sitemaps, script bundles)
+    is kept with its validators, digest and derived data under the target's key.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or default_cache_dir()
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(self.directory, 'state.sqlite3'), check_same_thread=False)
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS pages ('
+            ' url TEXT, profile TEXT, etag TEXT, last_modified TEXT,'
+            ' content_hash TEXT, findings TEXT, checked REAL,'
+            ' PRIMARY KEY (url, profile))'
+        )
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS urls ('
+            ' target TEXT, profile TEXT, url TEXT, status INTEGER,'
+            ' etag TEXT, last_modified TEXT, digest TEXT, data TEXT,'
+            ' PRIMARY KEY (target, profile, url))'
+        )
+        columns = [row[1] for row in self._db.execute('PRAGMA table_info(urls)')]
+        if 'data' not in columns:
+            # State written before derived data was kept
+            self._db.execute('ALTER TABLE urls ADD COLUMN data TEXT')
+        self._db.commit()
+
+    def get(self, url, profile):
+        with self._lock:
+            row = self._db.execute(
+                'SELECT etag, last_modified, content_hash, findings FROM pages WHERE url = ? AND profile = ?',
+                (url, profile)
+            ).fetchone()
+        if row is None:
+            return None
+        return PageState(row[0], row[1], row[2], json.loads(row[3]))
+
+    def conditional_headers(self, state):
+        headers = {}
+        if state.etag:
+            headers['If-None-Match'] = state.etag
+        if state.last_modified:
+            headers['If-Modified-Since'] = state.last_modified
+        return headers
+
+    def put(self, url, profile, etag, last_modified, content_hash, findings):
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (url, profile, etag, last_modified, content_hash, json.dumps(findings), time.time())
+            )
+            self._db.commit()
+
+    def delete(self, url, profile):
+        with self._lock:
+            self._db.execute('DELETE FROM pages WHERE url = ? AND profile = ?', (url, profile))
+            self._db.execute('DELETE FROM urls WHERE target = ? AND profile = ?', (url, profile))
+            self._db.commit()
+
+    def urls(self, target, profile):
+        """{url: UrlState} for every URL the last run of target fetched."""
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT url, status, etag, last_modified, digest, data FROM urls WHERE target = ? AND profile = ?',
+                (target, profile)
+            ).fetchall()
+        return {row[0]: UrlState(*row[1:5], json.loads(row[5]) if row[5] else None) for row in rows}
+
+    def put_urls(self, target, profile, urls):
+        """Replaces the URLs recorded for target with `urls` ({url: UrlState})."""
+        with self._lock:
+            self._db.execute('DELETE FROM urls WHERE target = ? AND profile = ?', (target, profile))
+            self._db.executemany(
+                'INSERT INTO urls VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                [(target, profile, url, s.status, s.etag, s.last_modified, s.digest,
+                  None if s.data is None else json.dumps(s.data, separators=(',', ':')))
+                 for url, s in urls.items()]
+            )
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class FetchLog:
+    """
+    Stands in for the HttpPool during an incremental run and records every
+    URL fetched through it: status, validators and a digest of the body
+    (taken as a streamed body is read, so streaming is kept). URLs the run
+    skips can be carried over from the previous run with keep().
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.fetched = {}    # url -> UrlState
+        self._lock = threading.Lock()
+
+    def get(self, url, **kwargs):
+        res = self.pool.get(url, **kwargs)
+        state = UrlState(res.status_code, res.headers.get('ETag'), res.headers.get('Last-Modified'), None)
+        with self._lock:
+            if url in self.fetched:
+                return res
+            self.fetched[url] = state
+
+        if not kwargs.get('stream'):
+            state.digest = hashlib.sha256(res.content).hexdigest()
+        else:
+            # Hashed as the caller reads; only a body read to the end gets a digest
+            digest = hashlib.sha256()
+
+            def done(outcome):
+                if outcome == 'eof':
+                    state.digest = digest.hexdigest()
+            res.raw = WatchedBody(res.raw, digest.update, done)
+        return res
+
+    def keep(self, url, state):
+        with self._lock:
+            self.fetched.setdefault(url, state)
+
+    def note(self, url, data):
+        """Attaches what the run derived from url's body, for the next run to reuse."""
+        with self._lock:
+            state = self.fetched.get(url)
+            if state is not None:
+                state.data = data
+
+    def urls(self):
+        """
+        The URLs worth remembering: those whose body was read to the end.
+        Error pages are kept too, so a 404 that comes back is noticed.
+        """
+        with self._lock:
+            return {url: s for url, s in self.fetched.items() if s.digest}
+
+
+class Baseline:
+    """
+    What an incremental run may reuse from the previous one. A URL that
+    revalidated unchanged is not fetched again: get() returns its stored
+    UrlState (with the data derived from its body) and keep() carries it
+    into the FetchLog. Modules whose inputs all came back unchanged replay
+    their stored findings instead of scanning again.
+    """
+
+    def __init__(self, log, unchanged, findings):
+        self.log = log
+        self.unchanged = unchanged    # url -> UrlState
+        self.findings = findings      # previous run's Finding.to_dict() records
+
+    def get(self, url):
+        return self.unchanged.get(url)
+
+    def keep(self, url, state):
+        self.log.keep(url, state)
+
+    def note(self, url, data):
+        self.log.note(url, data)
+
+    def records(self, keep):
+        """The previous run's findings records for which keep(record) is true."""
+        return [record for record in self.findings if keep(record)]
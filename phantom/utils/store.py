@@ -0,0 +1,376 @@
+import gzip
+import hashlib
+import json
+import mmap
+import os
+import struct
+from phantom.utils.cvedb import CveIndex, ProductEntries
+
+# Compiled index layout (little endian):
+#   header    MAGIC, product count, entry count, directory offset, secrets offset/length,
+#             sources offset/length
+#   directory one fixed-size record per product, sorted by name bytes:
+#             name offset, name length, block offset, block length
+#   names     product names (utf-8)
+#   blocks    per product: JSON [[spec, [cves...]], ...]
+#   secrets   JSON pattern pack
+#   sources   JSON [{path, size, mtime_ns, sha256}, ...] of the files it was built from
+MAGIC = b'PHIDX002'
+HEADER = struct.Struct('<8sIQQQIQI')
+RECORD = struct.Struct('<QHQI')
+
+# CPE vendor/product -> the product name servers put in their banners
+CPE_PRODUCTS = {
+    ('apache', 'http_server'): 'apache',
+    ('f5', 'nginx'): 'nginx',
+    ('nginx', 'nginx'): 'nginx',
+    ('microsoft', 'internet_information_services'): 'microsoft-iis',
+    ('microsoft', 'iis'): 'microsoft-iis',
+    ('openssl', 'openssl'): 'openssl',
+    ('php', 'php'): 'php',
+    ('lighttpd', 'lighttpd'): 'lighttpd',
+    ('apache', 'tomcat'): 'apache-coyote',
+}
+
+
+def default_index_path():
+    """PHANTOM_DB if set, else phantom.idx next to the bundled JSON data."""
+    base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.environ.get('PHANTOM_DB') or os.path.join(base_path, 'data', 'phantom.idx')
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _source_record(path):
+    st = os.stat(path)
+    return {'path': os.path.abspath(path), 'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': _sha256(path)}
+
+
+def _source_changed(source):
+    """True if a recorded source file now differs; a deleted one is not counted (the index is its copy)."""
+    try:
+        st = os.stat(source['path'])
+    except OSError:
+        return False
+    if st.st_size != source['size']:
+        return True
+    if st.st_mtime_ns == source['mtime_ns']:
+        return False
+    # Touched but maybe not edited (e.g. a fresh checkout): compare contents
+    return _sha256(source['path']) != source['sha256']
+
+
+def open_index(path=None):
+    """
+    Opens the compiled index (default_index_path() if not given) if it is
+    current. Returns (store, stale): store is None when there is no usable
+    index, stale lists why an existing one was passed over (changed source
+    files, or a format older than this version).
+    """
+    path = path or default_index_path()
+    if not os.path.exists(path):
+        return None, []
+    try:
+        store = CveStore(path)
+    except ValueError as e:
+        return None, [str(e)]
+    changed = store.stale_sources()
+    if changed:
+        store.close()
+        return None, changed
+    return store, []
+
+
+class _JsonStream:
+    """
+    Minimal incremental JSON reader: walks one top-level object, decoding
+    values one at a time with raw_decode so multi-GB feeds never have to
+    fit in memory. Arrays under `array_keys` are yielded item by item.
+    """
+
+    def __init__(self, stream, chunk_size=1 << 20):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        chunk = self.stream.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _peek(self):
+        """Skips whitespace and returns the next character ('' at end of input)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise ValueError(f"Malformed feed: expected '{char}' at offset {self.pos}")
+        self.pos += 1
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # Value runs past the buffer; read more and retry
+                if not self._fill():
+                    raise
+                continue
+            # A number at the buffer edge may be cut short; make sure it ended
+            if end == len(self.buf) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def items(self, array_keys=()):
+        self._expect('{')
+        if self._peek() == '}':
+            return
+        while True:
+            key = self._value()
+            self._expect(':')
+            if key in array_keys and self._peek() == '[':
+                self.pos += 1
+                if self._peek() != ']':
+                    while True:
+                        yield key, self._value()
+                        if self._peek() != ',':
+                            break
+                        self.pos += 1
+                self._expect(']')
+            else:
+                yield key, self._value()
+
+            if self._peek() != ',':
+                break
+            self.pos += 1
+        self._expect('}')
+
+
+def _open_text(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def _cpe_spec(match):
+    """Turns an NVD cpe match into (product, spec), or None if it isn't vulnerable."""
+    if not match.get('vulnerable', True):
+        return None
+    uri = match.get('criteria') or match.get('cpe23Uri') or ''
+    parts = uri.split(':')
+    if len(parts) < 6:
+        return None
+    vendor, product, version = parts[3], parts[4], parts[5]
+    name = CPE_PRODUCTS.get((vendor, product), product)
+
+    if version not in ('*', '-', ''):
+        return name, version.replace('\\', '')
+
+    bounds = []
+    if match.get('versionStartIncluding'):
+        bounds.append('>=' + match['versionStartIncluding'])
+    if match.get('versionStartExcluding'):
+        bounds.append('>' + match['versionStartExcluding'])
+    if match.get('versionEndIncluding'):
+        bounds.append('<=' + match['versionEndIncluding'])
+    if match.get('versionEndExcluding'):
+        bounds.append('<' + match['versionEndExcluding'])
+    return name, ','.join(bounds) or '*'
+
+
+def _walk_nodes(nodes):
+    for node in nodes:
+        yield from node.get('cpe_match', ()) or node.get('cpeMatch', ())
+        yield from _walk_nodes(node.get('children', ()))
+
+
+def _nvd_entries(item):
+    """Yields (product, spec, cve_id) from an NVD 1.1 CVE_Items or 2.0 vulnerabilities item."""
+    cve = item.get('cve', {})
+    cve_id = cve.get('id') or cve.get('CVE_data_meta', {}).get('ID')
+    if not cve_id:
+        return
+
+    configurations = item.get('configurations') or cve.get('configurations') or {}
+    if isinstance(configurations, dict):
+        node_lists = [configurations.get('nodes', ())]
+    else:
+        node_lists = [config.get('nodes', ()) for config in configurations]
+
+    for nodes in node_lists:
+        for match in _walk_nodes(nodes):
+            spec = _cpe_spec(match)
+            if spec:
+                yield spec[0], spec[1], cve_id
+
+
+def iter_feed(path):
+    """
+    Streams (product, spec, cve) entries from a CVE source: Phantom's own
+    "Product/spec": [cves] format or an NVD 1.1 / 2.0 JSON feed, optionally gzipped.
+    """
+    with _open_text(path) as stream:
+        for key, value in _JsonStream(stream).items(array_keys=('CVE_Items', 'vulnerabilities')):
+            if key in ('CVE_Items', 'vulnerabilities'):
+                yield from _nvd_entries(value)
+            elif '/' in key and isinstance(value, list):
+                product, _, spec = key.partition('/')
+                for cve in value:
+                    yield product.strip().lower(), spec.strip(), cve
+
+
+def build_index(cve_paths, secrets_path, out_path):
+    """Compiles CVE sources and a secrets pack into one memory-mappable index file."""
+    products = {}   # product -> {spec: [cves]}
+    entries = 0
+    for path in cve_paths:
+        for product, spec, cve in iter_feed(path):
+            cves = products.setdefault(product.lower(), {}).setdefault(spec, [])
+            if cve not in cves:
+                cves.append(cve)
+                entries += 1
+
+    with open(secrets_path, 'r') as f:
+        secrets = json.dumps(json.load(f), separators=(',', ':')).encode('utf-8')
+    sources = json.dumps(
+        [_source_record(path) for path in list(cve_paths) + [secrets_path]], separators=(',', ':')
+    ).encode('utf-8')
+
+    names = sorted(name.encode('utf-8') for name in products)
+    dir_offset = HEADER.size
+    names_offset = dir_offset + RECORD.size * len(names)
+
+    tmp_path = out_path + '.tmp'
+    with open(tmp_path, 'wb') as out:
+        out.seek(names_offset)
+        name_offsets = []
+        for name in names:
+            name_offsets.append(out.tell())
+            out.write(name)
+
+        records = []
+        for name, name_off in zip(names, name_offsets):
+            block = json.dumps(
+                list(products[name.decode('utf-8')].items()), separators=(',', ':')
+            ).encode('utf-8')
+            records.append(RECORD.pack(name_off, len(name), out.tell(), len(block)))
+            out.write(block)
+
+        secrets_offset = out.tell()
+        out.write(secrets)
+        sources_offset = out.tell()
+        out.write(sources)
+
+        out.seek(0)
+        out.write(HEADER.pack(MAGIC, len(names), entries, dir_offset, secrets_offset, len(secrets),
+                              sources_offset, len(sources)))
+        out.write(b''.join(records))
+    os.replace(tmp_path, out_path)
+
+    return {'products': len(names), 'entries': entries, 'bytes': os.path.getsize(out_path)}
+
+
+class _LazyProducts:
+    """Product lookups straight off the mapped directory, decoded on first use."""
+
+    def __init__(self, store):
+        self.store = store
+        self.cache = {}
+
+    def get(self, product):
+        if product in self.cache:
+            return self.cache[product]
+        entries = self.store._load_product(product)
+        self.cache[product] = entries
+        return entries
+
+
+class CveStore(CveIndex):
+    """
+    Read-only CveIndex backed by a compiled, memory-mapped index file.
+
+    Opening it reads only the header; a product's entries are decoded the
+    first time a banner names that product, so startup time and RSS do not
+    grow with the size of the database.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic = self.mm[:len(MAGIC)]
+        if magic != MAGIC:
+            self.mm.close()
+            if magic[:5] == MAGIC[:5]:
+                raise ValueError(f"{path} was built by an older version")
+            raise ValueError(f"{path} is not a Phantom index")
+        (_, count, entries, dir_offset, secrets_offset, secrets_len,
+         sources_offset, sources_len) = HEADER.unpack_from(self.mm, 0)
+
+        self.count = count
+        self.size = entries
+        self.dir_offset = dir_offset
+        self.secrets_offset = secrets_offset
+        self.secrets_len = secrets_len
+        self.sources_offset = sources_offset
+        self.sources_len = sources_len
+        self.products = _LazyProducts(self)
+
+    def secrets(self):
+        start = self.secrets_offset
+        return json.loads(self.mm[start:start + self.secrets_len].decode('utf-8'))
+
+    def sources(self):
+        """The files the index was compiled from, as recorded at build time."""
+        start = self.sources_offset
+        return json.loads(self.mm[start:start + self.sources_len].decode('utf-8'))
+
+    def stale_sources(self):
+        """Paths of source files changed since the index was built."""
+        return [source['path'] for source in self.sources() if _source_changed(source)]
+
+    def _record(self, i):
+        return RECORD.unpack_from(self.mm, self.dir_offset + i * RECORD.size)
+
+    def _load_product(self, product):
+        key = product.encode('utf-8')
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            name_off, name_len, block_off, block_len = self._record(mid)
+            name = self.mm[name_off:name_off + name_len]
+            if name < key:
+                lo = mid + 1
+            elif name > key:
+                hi = mid
+            else:
+                entries = ProductEntries()
+                for spec, cves in json.loads(self.mm[block_off:block_off + block_len].decode('utf-8')):
+                    entries.add(spec, cves)
+                entries.finalize()
+                return entries
+        return None
+
+    def close(self):
+        self.mm.close()
@@ -0,0 +1,141 @@
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+# Longest Retry-After we honour before the next request to a host
+MAX_RETRY_AFTER = 60.0
+
+
+def retry_after(headers):
+    """Seconds from a Retry-After header (delta or HTTP date), or None."""
+    value = headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+class TokenBucket:
+    """
+    Allows `rate` requests per second with bursts of up to `burst`
+    (rate 0 = unlimited). pause() holds every request back, e.g. for a
+    Retry-After.
+    """
+
+    def __init__(self, rate=0, burst=None):
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.not_before = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = self.not_before - now
+                if wait <= 0:
+                    if not self.rate:
+                        return
+                    self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        with self._lock:
+            self.not_before = max(self.not_before, time.monotonic() + seconds)
+
+
+class AimdController:
+    """
+    Concurrency limit for one host, adjusted the way TCP adjusts its window.
+
+    The limit doubles per round of successes (slow start) until the first
+    sign of trouble, then grows by one per round. A 429/503, a timeout or
+    connection failure, a smoothed latency well above the fastest seen, or
+    one response slower than the retransmission-style estimate (srtt +
+    4 * rttvar) halves it, at most once per round trip. Latency only ever
+    lowers concurrency: requests always get the configured `timeout`.
+    """
+
+    def __init__(self, initial=2, maximum=16, timeout=10):
+        self.maximum = maximum
+        self.limit = float(min(initial, maximum))
+        self.ssthresh = float(maximum)
+        self.timeout = timeout
+
+        self.inflight = 0
+        self.peak = 0          # most requests actually in flight at once
+        self.srtt = None       # smoothed latency
+        self.rttvar = 0.0
+        self.base = None       # fastest latency seen, drifting slowly upward
+        self.last_decrease = 0.0
+        self.backoffs = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.inflight >= int(self.limit):
+                self._cond.wait()
+            self.inflight += 1
+            self.peak = max(self.peak, self.inflight)
+
+    def release(self, latency=None, congested=False):
+        with self._cond:
+            self.inflight -= 1
+            if congested:
+                self._decrease()
+            elif latency is not None:
+                self._sample(latency)
+            self._cond.notify_all()
+
+    def _sample(self, latency):
+        slow = False
+        if self.srtt is None:
+            self.srtt = self.base = latency
+            self.rttvar = latency / 2
+        else:
+            # A straggler well past the usual spread is an early sign of overload
+            slow = latency > self.srtt + 4 * self.rttvar + 0.02
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - latency)
+            self.srtt = 0.875 * self.srtt + 0.125 * latency
+            self.base = min(latency, self.base + (latency - self.base) * 0.005)
+
+        # Queueing at the server shows up as latency before it shows up as errors
+        if slow or self.srtt > 2 * self.base + 0.02:
+            self._decrease()
+        elif self.limit < self.ssthresh:
+            self.limit = min(self.limit + 1, self.maximum)
+        else:
+            self.limit = min(self.limit + 1 / self.limit, self.maximum)
+
+    def _decrease(self):
+        now = time.monotonic()
+        if now - self.last_decrease < (self.srtt or 0):
+            # Responses already in flight reflect the old limit
+            return
+        self.last_decrease = now
+        self.limit = max(1.0, self.limit / 2)
+        self.ssthresh = self.limit
+        self.backoffs += 1
+
+
+
+class HostThrottle:
+    """Token bucket plus AIMD controller for one host."""
+    __slots__ = ('bucket', 'controller')
+
+    def __init__(self, rate, maximum, timeout):
+        self.bucket = TokenBucket(rate)
+        self.controller = AimdController(maximum=maximum, timeout=timeout)
@@ -1,19 +1,104 @@
+import atexit
+import os
 import sys
 import time
 import random
-from colorama import init, Fore, Style
+import threading
+from contextlib import contextmanager
+from phantom.utils.findings import FindingWriter
 
-# Initialize Colorama
-init(autoreset=True)
+# Per-thread output capture (bulk and background runs)
+_local = threading.local()
+
+# Active FindingWriter when --output is json/ndjson; None renders findings as text
+_findings = None
+
+
+class Renderer:
+    """
+    Batches output lines into a few large writes instead of one print per
+    line. A full batch is written at once; anything smaller is pushed out by
+    a background flusher after `delay` seconds, so a section that is still
+    working shows its progress without costing a syscall per line.
+    """
+
+    def __init__(self, stream_name, batch_bytes=1 << 16, delay=0.05):
+        self.stream_name = stream_name     # looked up on every flush, in case sys.stdout is swapped
+        self.batch_bytes = batch_bytes
+        self.delay = delay
+        self.pending = []
+        self.size = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._flusher = None
+
+    def write(self, line):
+        with self._lock:
+            self.pending.append(line)
+            self.size += len(line)
+            if self.size >= self.batch_bytes:
+                self._flush_locked()
+                return
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._run, daemon=True)
+                self._flusher.start()
+                atexit.register(self.flush)
+        if not self._wake.is_set():
+            self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            time.sleep(self.delay)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self.pending:
+            return
+        stream = getattr(sys, self.stream_name)
+        self.pending.append('')
+        stream.write('\n'.join(self.pending))
+        stream.flush()
+        self.pending = []
+        self.size = 0
+
+
+_renderers = {'stdout': Renderer('stdout'), 'stderr': Renderer('stderr')}
 
 class PhantomUI:
-    # Color Palette
-    NEON_GREEN = Fore.GREEN + Style.BRIGHT
-    NEON_PURPLE = Fore.MAGENTA + Style.BRIGHT
-    NEON_YELLOW = Fore.YELLOW + Style.BRIGHT # Brown-ish
-    ALERT_RED = Fore.RED + Style.BRIGHT
-    DATA_WHITE = Fore.WHITE + Style.BRIGHT
-    RESET = Style.RESET_ALL
+    # Color Palette (plain ANSI; colorama is only loaded on Windows consoles)
+    NEON_GREEN = '\033[32m\033[1m'
+    NEON_PURPLE = '\033[35m\033[1m'
+    NEON_YELLOW = '\033[33m\033[1m' # Brown-ish
+    ALERT_RED = '\033[31m\033[1m'
+    DATA_WHITE = '\033[37m\033[1m'
+    RESET = '\033[0m'
+
+    # Sword animations and screen clearing; off when stdout isn't a terminal
+    interactive = True
+
+    @staticmethod
+    def setup_console(stream=None):
+        """
+        Colors and animations for terminals only. Piped or redirected output
+        gets plain text and no sleeps, so scripted runs start instantly.
+        NO_COLOR (https://no-color.org) also selects plain text.
+        """
+        stream = stream or sys.stdout
+        if stream.isatty() and not os.environ.get('NO_COLOR'):
+            if os.name == 'nt':
+                from colorama import init
+                init(autoreset=True)
+            return
+
+        PhantomUI.interactive = stream.isatty()
+        for name in ('NEON_GREEN', 'NEON_PURPLE', 'NEON_YELLOW', 'ALERT_RED', 'DATA_WHITE', 'RESET'):
+            setattr(PhantomUI, name, '')
 
     @staticmethod
     def _print_sword_frame(stage="sheathed"):
@@ -95,7 +180,8 @@ class PhantomUI:
         s6 = f"{tip_col}{tip_sub}{r}"
 
         # Clear Screen (ANSI)
-        print("\033[H\033[J", end="")
+        if PhantomUI.interactive:
+            print("\033[H\033[J", end="")
         
         # Print Lines
         print(f"{g}{l1}{s1}{g}{o1}{r}")
@@ -111,6 +197,9 @@ class PhantomUI:
         """
         Animates the sword Unsheathing (Purple -> White).
         """
+        if not PhantomUI.interactive:
+            PhantomUI._print_sword_frame("full")
+            return
         frames = ["sheathed", "drawing_1", "full"]
         for stage in frames:
             PhantomUI._print_sword_frame(stage)
@@ -134,6 +223,8 @@ class PhantomUI:
         """
         Animates the sword Sheathing (White -> Purple).
         """
+        if not PhantomUI.interactive:
+            return
         frames = ["full", "drawing_1", "sheathed"]
         for stage in frames:
             PhantomUI._print_sword_frame(stage)
@@ -141,6 +232,8 @@ class PhantomUI:
     
     @staticmethod
     def typewriter(text, color=None, speed=0.01):
+        if not PhantomUI.interactive:
+            speed = 0
         if color:
             sys.stdout.write(color)
         for char in text:
@@ -149,17 +242,176 @@ class PhantomUI:
             time.sleep(speed)
         sys.stdout.write(PhantomUI.RESET + "\n")
 
+    @staticmethod
+    def emit(line):
+        """
+        Prints a line of human-readable output. While findings are streamed as
+        JSON on stdout, text goes to stderr so the stream stays parseable.
+        """
+        _renderers['stderr' if _findings is not None else 'stdout'].write(line)
+
+    @staticmethod
+    def flush():
+        """Writes out anything the renderers still hold (before a prompt, at exit)."""
+        for renderer in _renderers.values():
+            renderer.flush()
+
+    @staticmethod
+    def write(line):
+        """
+        Prints a line, or appends it to this thread's capture buffer if one is active.
+        """
+        buffer = getattr(_local, 'buffer', None)
+        if buffer is not None:
+            buffer.append(line)
+        else:
+            PhantomUI.emit(line)
+
+    @staticmethod
+    def set_output(mode):
+        """Selects how findings are reported: 'text' (default), 'json' or 'ndjson'."""
+        global _findings
+        PhantomUI.finish_output()
+        if mode != 'text':
+            _findings = FindingWriter(mode)
+
+    @staticmethod
+    def finish_output():
+        global _findings
+        PhantomUI.flush()
+        if _findings is not None:
+            _findings.close()
+            _findings = None
+
+    @staticmethod
+    def structured():
+        return _findings is not None
+
+    @staticmethod
+    def report(finding):
+        """
+        Reports a Finding. Structured modes write it to stdout immediately,
+        bypassing any capture buffer; text mode renders it like any other line.
+        Inside collect() it is only appended to the collecting list.
+        """
+        collector = getattr(_local, 'collector', None)
+        if collector is not None:
+            collector.append(finding)
+            return
+
+        if _findings is not None:
+            _findings.write(finding)
+            return
+
+        kind = finding.kind
+        if kind == 'wifi_network':
+            PhantomUI.wifi_entry(**finding.extra)
+        elif kind == 'link':
+            PhantomUI.write(f"  {PhantomUI.DATA_WHITE}- {finding.value}{PhantomUI.RESET}")
+        elif kind == 'cve':
+            PhantomUI.alert(f"VULNERABILITY DETECTED: {finding.value}")
+        elif kind == 'secret':
+            # Text mode shows each rule once; the count follows as a summary line
+            if finding.extra.get('occurrence', 1) == 1:
+                PhantomUI.alert(f"POTENTIAL LEAK: {finding.title}")
+                PhantomUI.write(f"    Match: {finding.value}")
+        elif kind == 'wifi_event':
+            PhantomUI.wifi_event(finding.extra['event'], finding.title, finding.target, finding.value,
+                                 finding.extra.get('time'))
+        elif kind == 'file_secret':
+            PhantomUI.alert(f"POTENTIAL LEAK: {finding.title}")
+            PhantomUI.write(f"    {finding.target}:{finding.extra.get('line')}  Match: {finding.value}")
+        elif kind in ('error', 'rule_disabled', 'crawl_error', 'asset_error'):
+            PhantomUI.alert(f"{finding.title}: {finding.value}")
+        elif finding.severity != 'info':
+            PhantomUI.alert(finding.title)
+        else:
+            PhantomUI.data(finding.title, finding.value)
+
+    @staticmethod
+    def report_many(findings, top=0, group=None):
+        """
+        Reports a result set (any iterable, consumed once). In text mode the
+        first `top` entries (0 = no limit) are shown and the rest collapse
+        into one count per group (group(finding), default the title), largest
+        first. Structured output always gets every record.
+        """
+        if _findings is not None or not top:
+            for finding in findings:
+                PhantomUI.report(finding)
+            return
+
+        shown = 0
+        counts = {}
+        for finding in findings:
+            if shown < top:
+                PhantomUI.report(finding)
+                shown += 1
+                continue
+            key = group(finding) if group else finding.title
+            counts[key] = counts.get(key, 0) + 1
+
+        hidden = sum(counts.values())
+        if not hidden:
+            return
+        PhantomUI.write(f"  {PhantomUI.NEON_PURPLE}[+] {hidden} more not shown (-top 0 lists all){PhantomUI.RESET}")
+        groups = sorted(counts.items(), key=lambda item: item[1], reverse=True)
+        for key, count in groups[:top]:
+            PhantomUI.write(f"      {PhantomUI.DATA_WHITE}{count:>8}  {key}{PhantomUI.RESET}")
+        if len(groups) > top:
+            PhantomUI.write(f"      {PhantomUI.DATA_WHITE}{'...':>8}  {len(groups) - top} smaller groups{PhantomUI.RESET}")
+
+    @staticmethod
+    @contextmanager
+    def capture(buffer=None):
+        """
+        Collects everything written on the current thread into a list (or any
+        object with append) instead of printing it, so concurrent runs can be
+        flushed one block at a time.
+        """
+        previous = getattr(_local, 'buffer', None)
+        if buffer is None:
+            buffer = []
+        _local.buffer = buffer
+        try:
+            yield buffer
+        finally:
+            _local.buffer = previous
+
+    @staticmethod
+    @contextmanager
+    def collect(findings):
+        """
+        Gathers findings reported on the current thread into a list instead of
+        rendering them (None restores normal reporting).
+        """
+        previous = getattr(_local, 'collector', None)
+        _local.collector = findings
+        try:
+            yield findings
+        finally:
+            _local.collector = previous
+
+    @staticmethod
+    def current_collector():
+        return getattr(_local, 'collector', None)
+
+    @staticmethod
+    def current_buffer():
+        """The capture buffer active on this thread, or None when writing to stdout."""
+        return getattr(_local, 'buffer', None)
+
     @staticmethod
     def alert(msg):
-        print(f"{PhantomUI.ALERT_RED}[!] CRITICAL: {msg}{PhantomUI.RESET}")
+        PhantomUI.write(f"{PhantomUI.ALERT_RED}[!] CRITICAL: {msg}{PhantomUI.RESET}")
 
     @staticmethod
     def info(msg):
-        print(f"{PhantomUI.NEON_GREEN}[*] {msg}{PhantomUI.RESET}")
+        PhantomUI.write(f"{PhantomUI.NEON_GREEN}[*] {msg}{PhantomUI.RESET}")
     
     @staticmethod
     def data(label, value):
-        print(f"{PhantomUI.NEON_GREEN}  > {label}: {PhantomUI.DATA_WHITE}{value}{PhantomUI.RESET}")
+        PhantomUI.write(f"{PhantomUI.NEON_GREEN}  > {label}: {PhantomUI.DATA_WHITE}{value}{PhantomUI.RESET}")
 
     @staticmethod
     def wifi_entry(ssid, bssid, signal, security, channel="?", band="?"):
@@ -168,9 +420,74 @@ class PhantomUI:
             sec_color = PhantomUI.ALERT_RED
         
         # Clean channel/band if unknown
+        signal = "?" if signal is None else signal
+        channel = "?" if channel is None else channel
         details = f"MAC: {bssid} | Sig: {signal}% | Ch: {channel} | {sec_color}{security}{PhantomUI.RESET}"
-        print(f"{PhantomUI.NEON_PURPLE}[WIFI] {ssid:<20} {PhantomUI.DATA_WHITE}{details}")
+        PhantomUI.write(f"{PhantomUI.NEON_PURPLE}[WIFI] {ssid:<20} {PhantomUI.DATA_WHITE}{details}{PhantomUI.RESET}")
+
+    @staticmethod
+    def wifi_event(event, ssid, bssid, detail, when=None):
+        sign, color = {'appear': ('+', PhantomUI.NEON_GREEN), 'disappear': ('-', PhantomUI.ALERT_RED)}.get(
+            event, ('~', PhantomUI.NEON_PURPLE))
+        stamp = time.strftime('%H:%M:%S', time.localtime(when)) if when else '--:--:--'
+        PhantomUI.write(f"{PhantomUI.DATA_WHITE}[{stamp}] {color}{sign} {ssid:<20}{PhantomUI.RESET} "
+                        f"{PhantomUI.DATA_WHITE}{bssid} {detail}{PhantomUI.RESET}")
 
     @staticmethod
     def section(title):
-        print(f"\n{PhantomUI.NEON_PURPLE}=== {title} ==={PhantomUI.RESET}")
+        PhantomUI.write(f"\n{PhantomUI.NEON_PURPLE}=== {title} ==={PhantomUI.RESET}")
+
+
+class OrderedOutput:
+    """
+    Keeps the output of concurrently running sections in a fixed order.
+
+    Each section writes through its own slot. The earliest unfinished slot
+    writes straight through (so long-running sections still stream); later
+    slots are buffered and flushed the moment every slot before them closes.
+    Output goes to whatever the creating thread was writing to.
+    """
+
+    def __init__(self, slots):
+        self.parent = PhantomUI.current_buffer()
+        self.buffers = [[] for _ in range(slots)]
+        self.closed = [False] * slots
+        self.head = 0
+        self._lock = threading.Lock()
+
+    def sink(self, slot):
+        return _SlotSink(self, slot)
+
+    def write(self, slot, line):
+        with self._lock:
+            if slot == self.head:
+                self._emit(line)
+            else:
+                self.buffers[slot].append(line)
+
+    def close(self, slot):
+        with self._lock:
+            self.closed[slot] = True
+            while self.head < len(self.closed) and self.closed[self.head]:
+                self.head += 1
+                if self.head < len(self.buffers):
+                    for line in self.buffers[self.head]:
+                        self._emit(line)
+                    self.buffers[self.head] = []
+
+    def _emit(self, line):
+        if self.parent is not None:
+            self.parent.append(line)
+        else:
+            PhantomUI.emit(line)
+
+
+class _SlotSink:
+    __slots__ = ('output', 'slot')
+
+    def __init__(self, output, slot):
+        self.output = output
+        self.slot = slot
+
+    def append(self, line):
+        self.output.write(self.slot, line)
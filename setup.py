@@ -12,7 +12,15 @@ setup(
         "requests",
         "beautifulsoup4",
         "colorama",
+        # Per-rule timeouts for Hunter; plain `re` cannot be interrupted
+        "regex",
     ],
+    extras_require={
+        # Faster HTML link extraction for Arachnid / asset discovery
+        "fast": ["lxml"],
+        # Batch entropy scoring for Hunter's high-entropy token detector
+        "entropy": ["numpy"],
+    },
     entry_points={
         "console_scripts": [
             "phantom=phantom.main:entry_point",
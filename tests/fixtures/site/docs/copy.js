@@ -0,0 +1 @@
+fetch("/api/v1/users");
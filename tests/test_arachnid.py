@@ -0,0 +1,76 @@
+from phantom.modules.arachnid import ArachnidCrawler
+from phantom.utils.http import HttpPool
+
+
+def crawl(site, **options):
+    crawler = ArachnidCrawler(pool=HttpPool(retries=0), **options)
+    links = dict(crawler.crawl(site).items())
+    return crawler, {url[len(site):]: depth for url, depth in links.items()}
+
+
+def test_depth_limits_what_is_followed(site):
+    crawler, links = crawl(site, max_depth=2)
+    assert links == {
+        '': 0,
+        'about.html': 1,
+        'docs/a.html': 1,
+        'missing.html': 1,
+        'docs/b.html': 2,
+        'deep/one.html': 2,
+    }
+    # index, about and docs/a are fetched; missing.html fails
+    assert crawler.pages_fetched == 3
+    assert crawler.errors == 1
+    assert crawler.failures == [(site + 'missing.html', 'HTTP 404')]
+
+
+def test_deeper_crawl_reaches_every_page(site):
+    crawler, links = crawl(site, max_depth=3)
+    # Pages at max depth are reported, not fetched
+    assert links['deep/two.html'] == 3
+    assert crawler.pages_fetched == 5
+    assert crawler.errors == 1
+
+
+def test_page_budget(site):
+    crawler, links = crawl(site, max_depth=3, max_pages=2)
+    assert crawler.pages_fetched + crawler.errors == 2
+    assert 'deep/two.html' not in links
+
+
+def test_sitemap_seeds_the_crawl(site):
+    crawler = ArachnidCrawler(pool=HttpPool(retries=0), max_depth=2)
+    links = {url[len(site):]: depth for url, depth in crawler.crawl(site, sitemaps=[site + 'sitemap.xml']).items()}
+    assert links['hidden.html'] == 1
+    # Listed in the sitemap, so fetched at depth 1 and its link followed
+    assert links['deep/two.html'] == 1
+    assert crawler.sitemap.urls_read == 4
+    assert crawler.errors == 1
+
+
+def test_sitemap_reading_stops_at_the_page_budget(site):
+    crawler = ArachnidCrawler(pool=HttpPool(retries=0), max_depth=2, max_pages=1)
+    crawler.SITEMAP_BATCH = 1
+    crawler.crawl(site, sitemaps=[site + 'sitemap.xml'])
+    assert crawler.sitemap.urls_read == 1
+
+
+def test_sitemap_batches_run_while_fetches_are_blocked(site):
+    # One slot for the host and every crawl worker waiting on it: the
+    # sitemap must still be read on its own thread
+    pool = HttpPool(retries=0)
+    pool.throttle_for(site).controller.limit = 1.0
+    crawler = ArachnidCrawler(pool=pool, max_depth=2, max_inflight=4)
+    crawler.SITEMAP_BATCH = 1
+    crawler.crawl(site, sitemaps=[site + 'sitemap.xml'])
+    assert crawler.sitemap.urls_read == 4
+    assert crawler.pages_fetched == 6
+
+
+def test_scripts_are_collected_from_every_crawled_page(site):
+    crawler, _ = crawl(site, max_depth=2)
+    assert crawler.scripts == {
+        site + 'app.js': site + 'about.html',
+        site + 'docs/copy.js': site + 'docs/a.html',
+        site + 'docs/gone.js': site + 'docs/a.html',
+    }
@@ -0,0 +1,19 @@
+from phantom.modules.assets import AssetFetcher, scoped_urls
+from phantom.utils.http import HttpPool
+
+
+def test_scoped_urls(site):
+    srcs = ['app.js', '/app.js#x', 'https://cdn.example.com/lib.js', 'docs/copy.js']
+    assert scoped_urls(site, srcs) == [site + 'app.js', site + 'docs/copy.js']
+
+
+def test_bundles_are_deduplicated_by_content(site):
+    fetcher = AssetFetcher(HttpPool(retries=0))
+    # app.js and docs/copy.js are the same file under two URLs
+    scanned = list(fetcher.fetch([site + 'app.js', site + 'docs/copy.js', site + 'docs/gone.js']))
+    assert len(scanned) == 1
+    assert 'fetch(' in scanned[0][1]
+    assert fetcher.fetched == 2
+    assert fetcher.duplicates == 1
+    assert fetcher.errors == 1
+    assert fetcher.failures == [(site + 'docs/gone.js', 'HTTP 404')]
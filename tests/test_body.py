@@ -0,0 +1,42 @@
+import io
+
+import pytest
+
+from phantom.utils.body import WatchedBody
+
+
+class FailingRaw(io.BytesIO):
+    def read(self, amt=None):
+        raise OSError("connection reset")
+
+
+def watch(raw):
+    chunks, outcomes = [], []
+    return WatchedBody(raw, chunks.append, outcomes.append), chunks, outcomes
+
+
+def test_chunks_then_eof():
+    body, chunks, outcomes = watch(io.BytesIO(b'abcdef'))
+    while body.read(4):
+        pass
+    body.read(4)
+    body.close()
+    assert chunks == [b'abcd', b'ef']
+    # Reported once, however often the caller reads or closes after the end
+    assert outcomes == ['eof']
+
+
+def test_closed_before_the_end():
+    body, chunks, outcomes = watch(io.BytesIO(b'abcdef'))
+    body.read(2)
+    body.close()
+    body.close()
+    assert outcomes == ['closed']
+
+
+def test_read_error():
+    body, chunks, outcomes = watch(FailingRaw())
+    with pytest.raises(OSError):
+        body.read(4)
+    body.close()
+    assert chunks == [] and outcomes == ['error']
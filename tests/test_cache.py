@@ -0,0 +1,58 @@
+from phantom.utils.cache import ResponseCache
+from phantom.utils.http import HttpPool
+
+
+def cached_pool(tmp_path, **options):
+    cache = ResponseCache(str(tmp_path), **options)
+    return HttpPool(retries=0, cache=cache), cache
+
+
+def test_repeat_fetch_is_served_from_disk(site, tmp_path):
+    pool, cache = cached_pool(tmp_path)
+    first = pool.get(site + 'about.html')
+    assert not getattr(first, 'from_cache', False)
+
+    second = pool.get(site + 'about.html')
+    assert second.from_cache
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+
+def test_streamed_body_is_stored_once_read(site, tmp_path):
+    pool, cache = cached_pool(tmp_path)
+    res = pool.get(site + 'about.html', stream=True)
+    assert cache.lookup(site + 'about.html') is None
+    body = b''.join(res.iter_content(16))
+    assert cache.lookup(site + 'about.html') is not None
+    assert cache.total_bytes == len(body)
+
+
+def test_body_closed_early_is_discarded(site, tmp_path):
+    pool, cache = cached_pool(tmp_path)
+    res = pool.get(site + 'about.html', stream=True)
+    res.raw.read(8)
+    res.close()
+    assert cache.lookup(site + 'about.html') is None
+    assert cache.total_bytes == 0
+    # Only the SQLite index is left behind, no partial bodies
+    assert [p.name for p in tmp_path.iterdir()] == ['index.sqlite3']
+
+
+def test_only_validated_responses_are_cacheable(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    assert cache.cacheable({'ETag': '"x"'})
+    assert cache.cacheable({'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT'})
+    assert not cache.cacheable({})
+    assert not cache.cacheable({'ETag': '"x"', 'Cache-Control': 'private, no-store'})
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=10)
+    for url in ('a', 'b'):
+        writer = cache.writer(url, {'ETag': url})
+        writer.write(b'x' * 6)
+        writer.commit()
+    assert cache.lookup('a') is None
+    assert cache.lookup('b') is not None
+    assert cache.total_bytes == 6 and cache.evictions == 1
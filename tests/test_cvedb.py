@@ -0,0 +1,42 @@
+import pytest
+
+from phantom.utils.cvedb import CveIndex, banner_tokens, parse_version
+
+ENTRIES = {
+    "Apache/2.4.49": ["CVE-2021-41773", "CVE-2021-42013"],
+    "Apache/2.4.50": ["CVE-2021-42013"],
+    "OpenSSL/>=1.0.1,<=1.0.1f": ["CVE-2014-0160"],
+    "nginx/<1.20.1": ["CVE-2021-23017"],
+    "lighttpd/*": ["CVE-ANY"],
+}
+
+LOOKUPS = [
+    ("apache", "2.4.49", ["CVE-2021-41773", "CVE-2021-42013"]),
+    ("Apache", "2.4.50", ["CVE-2021-42013"]),
+    ("apache", "2.4.51", []),
+    ("openssl", "1.0.1", ["CVE-2014-0160"]),
+    ("openssl", "1.0.1f", ["CVE-2014-0160"]),
+    ("openssl", "1.0.1g", []),
+    ("nginx", "1.18.0", ["CVE-2021-23017"]),
+    ("nginx", "1.20.1", []),
+    ("lighttpd", "1.4.59", ["CVE-ANY"]),
+    ("lighttpd", "", ["CVE-ANY"]),
+    ("iis", "10.0", []),
+]
+
+
+def test_parse_version():
+    assert parse_version("2.4.49") == (2, 4, 49)
+    assert parse_version("1.0.1f") == (1, 0, 1, 6)
+    assert parse_version("10.0") == parse_version("10")
+
+
+def test_banner_tokens():
+    headers = {'Server': "Apache/2.4.49 (Unix) OpenSSL/1.0.1f", 'X-AspNet-Version': "4.0.30319"}
+    assert banner_tokens(headers) == [("apache", "2.4.49"), ("openssl", "1.0.1f"), ("asp.net", "4.0.30319")]
+
+
+@pytest.mark.parametrize('product, version, expected', LOOKUPS)
+def test_index_lookup(product, version, expected):
+    assert sorted(CveIndex(ENTRIES).lookup(product, version)) == expected
+
@@ -0,0 +1,12 @@
+from phantom.modules.entropy import EntropyScanner
+
+
+def test_entropy_skips_certificates_and_hashes():
+    scanner = EntropyScanner()
+    body = "MIIDdzCCAl+gAwIBAgIEAgAAuTANBgkqhkiG9w0BAQUFADBaMQswCQYDVQQGEwJJ\n" * 3
+    certificate = "-----BEGIN CERTIFICATE-----\n" + body + "-----END CERTIFICATE-----\n"
+    comment = "# fixed upstream in 3f2a9c1d8e7b6a5f4c3d2e1f0a9b8c7d6e5f4a3b\n"
+    alphabet = "ALPHABET = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789'\n"
+    assert scanner.scan(certificate + comment + alphabet) == []
+    # The same base64 outside a certificate is still reported
+    assert scanner.scan(body)
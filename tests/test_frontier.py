@@ -0,0 +1,66 @@
+import random
+from collections import deque
+
+from phantom.utils.frontier import Frontier, KeySet, SpillQueue, canonicalize, url_key
+
+
+def test_canonicalize():
+    assert canonicalize('HTTP://Example.COM:80') == 'http://example.com/'
+    assert canonicalize('https://example.com:443/a#frag') == 'https://example.com/a'
+    assert canonicalize('https://example.com:8443/a') == 'https://example.com:8443/a'
+    assert canonicalize('http://example.com/p?b=2&a=1&b=1') == 'http://example.com/p?a=1&b=2&b=1'
+    assert canonicalize('http://User@Example.com/Path') == 'http://User@example.com/Path'
+    assert canonicalize('mailto:x@example.com#y') == 'mailto:x@example.com'
+
+
+def test_url_key_ignores_a_trailing_slash():
+    assert url_key('http://example.com/docs') == url_key('http://example.com/docs/')
+    assert url_key('http://example.com/docs') != url_key('http://example.com/docs?x=1')
+    assert url_key('http://example.com/') != 0
+
+
+def test_key_set_grows_and_keeps_the_shallowest_depth():
+    keys = KeySet(capacity=8)
+    for key in range(1, 1001):
+        assert keys.add(key, depth=5)
+    assert len(keys) == 1000
+    assert len(keys.slots) >= 1500
+    assert all(key in keys for key in range(1, 1001))
+    assert 1001 not in keys
+
+    assert keys.offer(7, 3) == 5
+    assert keys.offer(7, 9) == 3
+    assert keys.offer(7, 300) == 3
+
+
+def test_spill_queue_stays_in_order():
+    queue = SpillQueue(memory_items=3)
+    expected = deque()
+    rng = random.Random(1)
+    n = 0
+    for _ in range(500):
+        if expected and rng.random() < 0.4:
+            assert queue.pop() == expected.popleft()
+        else:
+            item = (f"http://example.com/{n}", n % 7)
+            queue.push(*item)
+            expected.append(item)
+            n += 1
+        assert len(queue) == len(expected)
+        # Never much more than 2 * memory_items held in memory
+        assert len(queue.head) + len(queue.tail) <= 6
+    assert queue.file is not None
+    while expected:
+        assert queue.pop() == expected.popleft()
+    queue.close()
+
+
+def test_frontier_reports_each_url_once():
+    frontier = Frontier()
+    assert frontier.add('http://example.com/', 0)
+    assert frontier.offer('http://example.com/a', 2) is None
+    assert frontier.offer('http://example.com/a/', 1) == 2
+    frontier.mark('http://example.com/redirected')
+    assert not frontier.add('http://example.com/redirected', 1)
+    assert list(frontier.discovered.items()) == [('http://example.com/', 0), ('http://example.com/a', 2)]
+    frontier.close()
@@ -0,0 +1,39 @@
+import threading
+
+from phantom.utils.http import HttpPool
+from phantom.utils.sitemap import SitemapReader
+
+
+def within(seconds, fn):
+    """Runs fn on a thread; returns its result, or None if it did not finish in time."""
+    result = []
+    thread = threading.Thread(target=lambda: result.append(fn()), daemon=True)
+    thread.start()
+    thread.join(seconds)
+    return result[0] if result else None
+
+
+def test_streamed_body_holds_its_slot_until_read(site):
+    pool = HttpPool(retries=0)
+    controller = pool.throttle_for(site).controller
+    res = pool.get(site + 'about.html', stream=True)
+    assert controller.inflight == 1
+    res.content
+    assert controller.inflight == 0
+
+    res = pool.get(site + 'about.html', stream=True)
+    res.close()
+    assert controller.inflight == 0
+
+
+def test_open_sitemap_does_not_hold_a_slot(site):
+    pool = HttpPool(retries=0)
+    controller = pool.throttle_for(site).controller
+    controller.limit = 1.0
+    stream = SitemapReader(pool, chunk_size=16).urls([site + 'sitemap.xml'])
+    assert next(stream) == 'about.html'
+
+    # With the sitemap still open, the host's only slot must be free for pages
+    res = within(5, lambda: pool.get(site + 'about.html'))
+    assert res is not None and res.status_code == 200
+    assert list(stream) == ['docs/b.html', 'deep/two.html', 'hidden.html']
@@ -0,0 +1,87 @@
+import threading
+
+from phantom.utils.jobs import Job, JobManager
+from phantom.utils.ui import PhantomUI
+
+
+def test_output_is_captured_per_job():
+    manager = JobManager(workers=2)
+    job = manager.submit('one', lambda: PhantomUI.info("hello"))
+    manager.wait([job])
+    assert job.state == 'done'
+    assert any('hello' in line for line in job.lines)
+    assert manager.newly_finished() == [job]
+    assert manager.newly_finished() == []
+    manager.shutdown()
+
+
+def test_failed_job():
+    def fail():
+        raise ValueError("boom")
+
+    manager = JobManager(workers=1)
+    job = manager.submit('fail', fail)
+    manager.wait([job])
+    assert job.state == 'failed'
+    assert 'boom' in job.lines[-1]
+    manager.shutdown()
+
+
+def test_queued_job_is_dropped():
+    manager = JobManager(workers=1)
+    release = threading.Event()
+    ran = []
+    blocker = manager.submit('block', release.wait)
+    queued = manager.submit('queued', lambda: ran.append(True))
+
+    manager.cancel(queued)
+    assert queued.state == 'cancelled' and queued.finished is not None
+    release.set()
+    manager.wait([blocker])
+    assert blocker.state == 'done'
+    assert ran == []
+    manager.shutdown()
+
+
+def test_cancelled_before_it_starts():
+    # Cancelled after the executor dequeued it, too late for future.cancel()
+    job = Job(1, 'late')
+    job.cancel_event.set()
+    JobManager(workers=1)._run(job, lambda: None)
+    assert job.state == 'cancelled'
+    assert job.started is None and job.finished is not None
+    assert not job.active
+
+
+def test_running_job_stops_at_its_next_output():
+    manager = JobManager(workers=1)
+    started = threading.Event()
+
+    def chatty():
+        started.set()
+        while True:
+            PhantomUI.info("working")
+
+    job = manager.submit('chatty', chatty)
+    started.wait(5)
+    manager.cancel(job)
+    manager.wait([job])
+    assert job.state == 'cancelled'
+    manager.shutdown()
+
+
+def test_job_watching_the_event_ends_cancelled():
+    manager = JobManager(workers=1)
+    event = threading.Event()
+    started = threading.Event()
+
+    def watcher():
+        started.set()
+        event.wait(5)
+
+    job = manager.submit('watch', watcher, cancel_event=event)
+    started.wait(5)
+    manager.cancel(job)
+    manager.wait([job])
+    assert job.state == 'cancelled'
+    manager.shutdown()
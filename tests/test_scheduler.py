@@ -0,0 +1,92 @@
+import threading
+import time
+
+import pytest
+
+from phantom.utils.findings import Finding
+from phantom.utils.scheduler import DependencyError, TaskCancelled, TaskGraph
+from phantom.utils.ui import OrderedOutput, PhantomUI
+
+
+def test_tasks_receive_their_inputs():
+    graph = TaskGraph()
+    graph.add('a', lambda: 2)
+    graph.add('b', lambda: 3)
+    graph.add('sum', lambda a, b: a + b, needs=('a', 'b'))
+    assert graph.run()['sum'].result() == 5
+
+
+def test_independent_tasks_overlap():
+    graph = TaskGraph()
+    for name in ('a', 'b', 'c'):
+        graph.add(name, lambda: time.sleep(0.2))
+    start = time.monotonic()
+    graph.run()
+    assert time.monotonic() - start < 0.5
+
+
+def test_failed_input_fails_its_dependents():
+    def fail():
+        raise ValueError("boom")
+
+    graph = TaskGraph()
+    graph.add('a', fail)
+    graph.add('b', lambda a: a, needs=('a',))
+    graph.add('c', lambda: 'ok')
+    futures = graph.run()
+    with pytest.raises(ValueError):
+        futures['a'].result()
+    with pytest.raises(DependencyError):
+        futures['b'].result()
+    assert futures['c'].result() == 'ok'
+
+
+def test_cancelled_graph_starts_nothing_new():
+    cancel = threading.Event()
+    graph = TaskGraph(cancel)
+    graph.add('a', cancel.set)
+    graph.add('b', lambda a: 'ran', needs=('a',))
+    futures = graph.run()
+    with pytest.raises(TaskCancelled):
+        futures['b'].result()
+
+
+def test_reports_print_in_the_order_they_were_added():
+    graph = TaskGraph()
+
+    def slow():
+        time.sleep(0.2)
+        PhantomUI.write("slow")
+
+    graph.add('slow', slow, report=True)
+    graph.add('fast', lambda: PhantomUI.write("fast"), report=True)
+    with PhantomUI.capture() as lines:
+        graph.run()
+    assert lines.index("slow") < lines.index("fast")
+
+
+def test_findings_reach_the_caller():
+    graph = TaskGraph()
+    graph.add('a', lambda: PhantomUI.report(Finding('hunter', 'secret', 'u', 'n', 'v')), report=True)
+    findings = []
+    with PhantomUI.capture(), PhantomUI.collect(findings):
+        graph.run()
+    assert [f.module for f in findings] == ['hunter']
+
+
+def test_ordered_output():
+    lines = []
+    with PhantomUI.capture(lines):
+        output = OrderedOutput(3)
+    output.write(2, "c")
+    output.write(1, "b")
+    output.write(0, "a1")
+    assert lines == ["a1"]
+    output.close(1)
+    assert lines == ["a1"]
+    output.write(0, "a2")
+    output.close(0)
+    # Slot 1 closed already; slot 2 is now the head and writes through
+    assert lines == ["a1", "a2", "b", "c"]
+    output.write(2, "c2")
+    assert lines[-1] == "c2"
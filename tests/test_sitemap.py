@@ -0,0 +1,122 @@
+import gzip
+import io
+
+from phantom.utils.sitemap import SitemapReader, parse_robots
+from phantom.utils.state import Baseline, FetchLog
+
+INDEX = b"""<?xml version="1.0"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>http://x/pages.xml</loc></sitemap>
+  <sitemap><loc>http://x/more.txt.gz</loc></sitemap>
+  <sitemap><loc>http://x/index.xml</loc></sitemap>
+  <sitemap><loc>http://x/gone.xml</loc></sitemap>
+</sitemapindex>
+"""
+
+PAGES = b"""<?xml version="1.0"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>http://x/a</loc><lastmod>2024-01-01</lastmod></url>
+  <url><loc>
+    http://x/b?q=1&amp;r=2
+  </loc></url>
+</urlset>
+"""
+
+
+class StubResponse:
+    """The parts of a streamed requests.Response the reader and FetchLog use."""
+
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.headers = {}
+        self.raw = io.BytesIO(body)
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        while True:
+            data = self.raw.read(chunk_size)
+            if not data:
+                return
+            yield data
+
+    def close(self):
+        self.closed = True
+        self.raw.close()
+
+
+class StubPool:
+    def __init__(self, files):
+        self.files = files
+        self.requested = []
+
+    def get(self, url, **kwargs):
+        self.requested.append(url)
+        if url not in self.files:
+            return StubResponse(404, b'')
+        return StubResponse(200, self.files[url])
+
+
+FILES = {
+    'http://x/index.xml': INDEX,
+    'http://x/pages.xml': PAGES,
+    'http://x/more.txt.gz': gzip.compress(b"http://x/c\r\n\r\nhttp://x/d"),
+}
+
+
+def test_index_is_followed(tmp_path):
+    pool = StubPool(FILES)
+    reader = SitemapReader(pool, chunk_size=7)
+    assert list(reader.urls(['http://x/index.xml'])) == ['http://x/a', 'http://x/b?q=1&r=2', 'http://x/c', 'http://x/d']
+    # The index lists itself; it is read once
+    assert pool.requested.count('http://x/index.xml') == 1
+    assert reader.sitemaps_read == 4
+    assert reader.urls_read == 4
+    assert reader.errors == 1
+
+
+def test_limits():
+    reader = SitemapReader(StubPool(FILES), max_urls=3)
+    assert len(list(reader.urls(['http://x/index.xml']))) == 3
+    reader = SitemapReader(StubPool(FILES), max_sitemaps=2)
+    assert list(reader.urls(['http://x/index.xml'])) == ['http://x/a', 'http://x/b?q=1&r=2']
+
+
+def test_broken_file_keeps_what_was_parsed():
+    broken = PAGES.replace(b'</url>\n  <url>', b'</url>\n  <url><oops>', 1)
+    reader = SitemapReader(StubPool({'http://x/pages.xml': broken}), chunk_size=16)
+    assert list(reader.urls(['http://x/pages.xml'])) == ['http://x/a']
+    assert reader.errors == 1
+
+
+def test_closing_the_stream_closes_the_response():
+    pool = StubPool(FILES)
+    responses = []
+    get = pool.get
+    pool.get = lambda url, **kwargs: responses.append(get(url, **kwargs)) or responses[-1]
+    stream = SitemapReader(pool, chunk_size=16).urls(['http://x/pages.xml'])
+    assert next(stream) == 'http://x/a'
+    stream.close()
+    assert responses[0].closed
+
+
+def test_unchanged_sitemaps_are_replayed():
+    first = FetchLog(StubPool(FILES))
+    urls = list(SitemapReader(first, baseline=Baseline(first, {}, [])).urls(['http://x/index.xml']))
+    stored = first.urls()
+    assert stored['http://x/pages.xml'].data == {'sitemaps': [], 'urls': ['http://x/a', 'http://x/b?q=1&r=2']}
+
+    pool = StubPool(FILES)
+    log = FetchLog(pool)
+    unchanged = {u: s for u, s in stored.items() if u != 'http://x/more.txt.gz'}
+    reader = SitemapReader(log, baseline=Baseline(log, unchanged, []))
+    assert list(reader.urls(['http://x/index.xml'])) == urls
+    # Only the changed file and the missing one are requested again
+    assert sorted(pool.requested) == ['http://x/gone.xml', 'http://x/more.txt.gz']
+
+
+def test_parse_robots():
+    disallowed, sitemaps = parse_robots(
+        "User-agent: *\nDisallow: /admin\nDisallow:\n# Disallow: /x\nsitemap: http://x/index.xml\n"
+    )
+    assert disallowed == ['/admin']
+    assert sitemaps == ['http://x/index.xml']
@@ -0,0 +1,60 @@
+from phantom.modules.spectral import detect_format, parse_netsh, parse_nmcli
+
+NMCLI = [
+    'Home\\:Net:AA\\:BB\\:CC\\:DD\\:EE\\:01:80:WPA2:6:2437 MHz\n',
+    'Cafe:AA\\:BB\\:CC\\:DD\\:EE\\:02:55::36:5180 MHz\n',
+    'Back\\\\slash:AA\\:BB\\:CC\\:DD\\:EE\\:03:101:WPA3:--:\n',
+    'garbage line\n',
+]
+
+NETSH = """
+There are 2 networks currently visible.
+
+SSID 1 : Office
+    Network type            : Infrastructure
+    Authentication          : WPA2-Enterprise
+    Encryption              : CCMP
+    BSSID 1                 : aa:bb:cc:dd:ee:10
+         Signal             : 85%
+         Radio type         : 802.11ax
+         Band               : 5 GHz
+         Channel            : 44
+    BSSID 2                 : aa:bb:cc:dd:ee:11
+         Signal             : 40%
+         Radio type         : 802.11n
+         Channel            : 6
+
+SSID 2 :
+    Network type            : Infrastructure
+    Authentication          : Open
+    Encryption              : None
+    BSSID 1                 : aa:bb:cc:dd:ee:12
+         Signal             : 12%
+         Channel            : 11
+""".splitlines(keepends=True)
+
+
+def fields(ap):
+    return (ap.ssid, ap.bssid, ap.signal, ap.security, ap.channel, ap.band)
+
+
+def test_parse_nmcli():
+    assert [fields(ap) for ap in parse_nmcli(NMCLI)] == [
+        ("Home:Net", "AA:BB:CC:DD:EE:01", 80, "WPA2", 6, "2.4GHz"),
+        ("Cafe", "AA:BB:CC:DD:EE:02", 55, "Open", 36, "5GHz"),
+        ("Back\\slash", "AA:BB:CC:DD:EE:03", 100, "WPA3", None, None),
+    ]
+
+
+def test_parse_netsh():
+    assert [fields(ap) for ap in parse_netsh(NETSH)] == [
+        ("Office", "aa:bb:cc:dd:ee:10", 85, "WPA2-Enterprise", 44, "5 GHz"),
+        ("Office", "aa:bb:cc:dd:ee:11", 40, "WPA2-Enterprise", 6, "802.11n"),
+        ("Hidden Network", "aa:bb:cc:dd:ee:12", 12, "Open", 11, None),
+    ]
+
+
+def test_detect_format():
+    assert detect_format(NMCLI[0]) == 'nmcli'
+    assert detect_format("There are 2 networks currently visible.") == 'netsh'
+    assert detect_format("SSID 1 : Office") == 'netsh'
@@ -0,0 +1,93 @@
+import sqlite3
+
+from phantom.modules.arachnid import ArachnidCrawler
+from phantom.utils.http import HttpPool
+from phantom.utils.state import Baseline, FetchLog, StateStore, UrlState
+
+
+class CountingPool:
+    """HttpPool stand-in that records the URLs actually requested."""
+
+    def __init__(self):
+        self.pool = HttpPool(retries=0)
+        self.requested = []
+
+    def get(self, url, **kwargs):
+        self.requested.append(url)
+        return self.pool.get(url, **kwargs)
+
+
+def test_urls_round_trip(tmp_path):
+    store = StateStore(str(tmp_path))
+    store.put_urls('t', 'p', {
+        'a': UrlState(200, '"e1"', None, 'd1', {'links': ['b'], 'scripts': []}),
+        'b': UrlState(404, None, 'Mon, 01 Jan 2024 00:00:00 GMT', 'd2'),
+    })
+    urls = store.urls('t', 'p')
+    assert urls['a'].etag == '"e1"' and urls['a'].data == {'links': ['b'], 'scripts': []}
+    assert urls['b'].status == 404 and urls['b'].data is None
+    assert store.urls('t', 'other') == {}
+
+    # Replaced, not merged
+    store.put_urls('t', 'p', {'b': urls['b']})
+    assert list(store.urls('t', 'p')) == ['b']
+    store.close()
+
+
+def test_state_without_data_column_is_migrated(tmp_path):
+    db = sqlite3.connect(str(tmp_path / 'state.sqlite3'))
+    db.execute(
+        'CREATE TABLE urls (target TEXT, profile TEXT, url TEXT, status INTEGER,'
+        ' etag TEXT, last_modified TEXT, digest TEXT, PRIMARY KEY (target, profile, url))'
+    )
+    db.execute("INSERT INTO urls VALUES ('t', 'p', 'a', 200, NULL, NULL, 'd1')")
+    db.commit()
+    db.close()
+
+    store = StateStore(str(tmp_path))
+    assert store.urls('t', 'p')['a'].data is None
+    store.close()
+
+
+def test_fetch_log_keeps_only_fully_read_bodies(site):
+    log = FetchLog(HttpPool(retries=0))
+    log.get(site + 'about.html')
+    log.get(site + 'docs/a.html', stream=True).content
+    log.get(site + 'docs/b.html', stream=True).close()
+    log.get(site + 'missing.html')
+
+    urls = log.urls()
+    assert set(urls) == {site + 'about.html', site + 'docs/a.html', site + 'missing.html'}
+    # Streamed and plain reads of the same body digest alike
+    plain = FetchLog(HttpPool(retries=0))
+    plain.get(site + 'docs/a.html')
+    assert plain.urls()[site + 'docs/a.html'].digest == urls[site + 'docs/a.html'].digest
+    assert urls[site + 'missing.html'].status == 404
+
+    log.note(site + 'about.html', {'links': []})
+    assert urls[site + 'about.html'].data == {'links': []}
+
+
+def test_unchanged_pages_are_crawled_from_stored_links(site):
+    first = FetchLog(HttpPool(retries=0))
+    crawler = ArachnidCrawler(pool=first, max_depth=3, baseline=Baseline(first, {}, []))
+    discovered = dict(crawler.crawl(site).items())
+    stored = first.urls()
+
+    # Everything but docs/a.html revalidated unchanged
+    changed = site + 'docs/a.html'
+    unchanged = {url: state for url, state in stored.items() if url != changed}
+    pool = CountingPool()
+    log = FetchLog(pool)
+    crawler = ArachnidCrawler(pool=log, max_depth=3, baseline=Baseline(log, unchanged, []))
+    assert dict(crawler.crawl(site).items()) == discovered
+    assert pool.requested == [changed]
+    assert crawler.pages_reused == len(unchanged)
+    assert crawler.errors == 1
+    assert set(log.urls()) == set(stored)
+
+
+def test_baseline_records():
+    records = [{'module': 'assets', 'target': 'a'}, {'module': 'hunter', 'target': 'a'}]
+    baseline = Baseline(FetchLog(None), {}, records)
+    assert baseline.records(lambda r: r['module'] == 'assets') == records[:1]
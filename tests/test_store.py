@@ -0,0 +1,40 @@
+import json
+
+import pytest
+
+from phantom.utils.store import CveStore, build_index, open_index
+from test_cvedb import ENTRIES, LOOKUPS
+
+
+@pytest.fixture
+def compiled(tmp_path):
+    cve_path = tmp_path / "cve_db.json"
+    secrets_path = tmp_path / "secrets.json"
+    cve_path.write_text(json.dumps(ENTRIES))
+    secrets_path.write_text(json.dumps({"AWS Access Key": "AKIA[0-9A-Z]{16}"}))
+    out_path = str(tmp_path / "phantom.idx")
+    build_index([str(cve_path)], str(secrets_path), out_path)
+    return out_path, cve_path
+
+
+def test_compiled_index_matches(compiled):
+    store = CveStore(compiled[0])
+    try:
+        for product, version, expected in LOOKUPS:
+            assert sorted(store.lookup(product, version)) == expected
+        assert store.match_headers({'Server': "Apache/2.4.50"}) == [("apache", "2.4.50", ["CVE-2021-42013"])]
+        assert store.secrets() == {"AWS Access Key": "AKIA[0-9A-Z]{16}"}
+    finally:
+        store.close()
+
+
+def test_stale_index_is_passed_over(compiled):
+    out_path, cve_path = compiled
+    store, stale = open_index(out_path)
+    assert store is not None and stale == []
+    store.close()
+
+    cve_path.write_text(json.dumps(dict(ENTRIES, **{"PHP/7.4.0": ["CVE-2019-11043"]})))
+    store, stale = open_index(out_path)
+    assert store is None
+    assert stale == [str(cve_path)]
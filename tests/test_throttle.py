@@ -0,0 +1,106 @@
+import threading
+import time
+from email.utils import formatdate
+
+import pytest
+
+from phantom.utils.throttle import MAX_RETRY_AFTER, AimdController, TokenBucket, retry_after
+
+
+def test_retry_after():
+    assert retry_after({}) is None
+    assert retry_after({'Retry-After': '5'}) == 5.0
+    assert retry_after({'Retry-After': '-3'}) == 0.0
+    assert retry_after({'Retry-After': '86400'}) == MAX_RETRY_AFTER
+    assert retry_after({'Retry-After': 'soon'}) is None
+    assert retry_after({'Retry-After': formatdate(time.time() + 30, usegmt=True)}) == pytest.approx(30, abs=2)
+
+
+def test_unlimited_bucket_never_waits():
+    bucket = TokenBucket(0)
+    start = time.monotonic()
+    for _ in range(1000):
+        bucket.acquire()
+    assert time.monotonic() - start < 0.5
+
+
+def test_bucket_spaces_requests_after_the_burst():
+    bucket = TokenBucket(rate=20, burst=2)
+    start = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+    # Two from the burst, then one every 50ms
+    assert time.monotonic() - start >= 0.18
+
+
+def test_pause_holds_requests_back():
+    bucket = TokenBucket(0)
+    bucket.pause(0.2)
+    start = time.monotonic()
+    bucket.acquire()
+    assert time.monotonic() - start >= 0.18
+
+
+def succeed(controller, n, latency=0.01):
+    for _ in range(n):
+        controller.acquire()
+        controller.release(latency)
+
+
+def test_slow_start_then_additive_increase():
+    controller = AimdController(initial=2, maximum=16)
+    succeed(controller, 3)
+    assert controller.limit == 5
+
+    controller.acquire()
+    controller.release(None, True)
+    assert controller.limit == 2.5 and controller.ssthresh == 2.5
+    assert controller.backoffs == 1
+
+    # Past ssthresh, a round of `limit` successes adds one
+    succeed(controller, 3)
+    assert 3.4 < controller.limit < 3.6
+
+
+def test_limit_stays_within_bounds():
+    controller = AimdController(initial=2, maximum=4)
+    succeed(controller, 20)
+    assert controller.limit == 4
+    for _ in range(10):
+        controller.last_decrease = 0.0
+        controller.acquire()
+        controller.release(None, True)
+    assert controller.limit == 1.0
+
+
+def test_one_decrease_per_round_trip():
+    controller = AimdController(initial=8, maximum=16)
+    succeed(controller, 1, latency=10.0)
+    limit = controller.limit
+    for _ in range(3):
+        controller.acquire()
+        controller.release(None, True)
+    # Responses still reflecting the old limit don't halve it again
+    assert controller.limit == limit / 2
+    assert controller.backoffs == 1
+
+
+def test_latency_rise_lowers_the_limit():
+    controller = AimdController(initial=8, maximum=16)
+    succeed(controller, 20, latency=0.01)
+    limit = controller.limit
+    controller.last_decrease = 0.0
+    succeed(controller, 1, latency=1.0)
+    assert controller.limit == limit / 2
+
+
+def test_acquire_waits_for_a_slot():
+    controller = AimdController(initial=1, maximum=1)
+    controller.acquire()
+    acquired = threading.Event()
+    thread = threading.Thread(target=lambda: (controller.acquire(), acquired.set()), daemon=True)
+    thread.start()
+    assert not acquired.wait(0.1)
+    controller.release(0.01)
+    assert acquired.wait(5)
+    assert controller.peak == 1